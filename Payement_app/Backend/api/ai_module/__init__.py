@@ -1,2 +1,2 @@
 # from .rag import rag
-from api.ai_module.enquiry_ai.main import rag
+from api.ai_module.enquiry_ai.main import rag, arag
@@ -1,12 +1,15 @@
 from __future__ import annotations
 import re
 import json
+import asyncio
 from collections import defaultdict
-from typing import Any, Dict, Type, Callable, Optional, Sequence, Union, List
+from typing import Any, AsyncIterator, Dict, Iterator, Type, Callable, Optional, Sequence, Union, List
 from langchain_core.prompts import ChatPromptTemplate
 from langgraph.prebuilt import create_react_agent
+from langgraph.prebuilt.chat_agent_executor import AgentState
 from langchain_google_genai import ChatGoogleGenerativeAI
 from .context import ProjectContext
+from .key_scheduler import KeyScheduler, NoKeyAvailableError
 from .config import Config
 from .tools import register_tools
 from .db_manager import DBManager
@@ -26,12 +29,15 @@ _RE_429 = re.compile(r"\b(429|RESOURCE_EXHAUSTED)\b", re.IGNORECASE)
 
 class RotatingGeminiModel(BaseChatModel):
     _api_keys: List[str] = PrivateAttr()
-    _current_key_index: int = PrivateAttr()
+    _scheduler: KeyScheduler = PrivateAttr()
     _model_name: str = PrivateAttr()
     _temperature: float = PrivateAttr()
     _base_kwargs: Dict[str, Any] = PrivateAttr()
     _bound_tools: Optional[Sequence[ToolLike]] = PrivateAttr(default=None)
     _bound_kwargs: Dict[str, Any] = PrivateAttr(default_factory=dict)
+    _base_clients: Dict[int, ChatGoogleGenerativeAI] = PrivateAttr(default_factory=dict)
+    _clients: Dict[int, Any] = PrivateAttr(default_factory=dict)
+    _clients_lock: Any = PrivateAttr(default_factory=Lock)
 
     def __init__(
         self,
@@ -44,7 +50,12 @@ class RotatingGeminiModel(BaseChatModel):
         self._api_keys = list(api_keys)
         if not self._api_keys:
             raise ValueError("At least one API key is required.")
-        self._current_key_index = 0
+        self._scheduler = KeyScheduler(
+            len(self._api_keys),
+            default_cooldown=Config.AI_KEY_COOLDOWN_SECONDS,
+            max_wait=Config.AI_KEY_MAX_WAIT_SECONDS,
+            error_half_life=Config.AI_KEY_ERROR_HALF_LIFE_SECONDS,
+        )
         self._model_name = model_name
         self._temperature = temperature
         # Force minimal retries at underlying layer to avoid waiting on 429
@@ -56,15 +67,30 @@ class RotatingGeminiModel(BaseChatModel):
     def _llm_type(self) -> str:
         return "rotating-gemini-chat"
 
-    def _build_llm_for_index(self, idx: int) -> ChatGoogleGenerativeAI:
-        llm = ChatGoogleGenerativeAI(
-            model=self._model_name,
-            google_api_key=self._api_keys[idx],
-            temperature=self._temperature,
-            **self._base_kwargs,
-        )
-        if self._bound_tools is not None:
-            llm = llm.bind_tools(self._bound_tools, **self._bound_kwargs)
+    def _llm_for_index(self, idx: int):
+        """Cached client for key ``idx`` (with this model's tool binding), built on first use.
+
+        Unbound clients are shared with every bind_tools clone, so binding tools
+        only adds the binding, not a new client.
+        """
+        llm = self._clients.get(idx)
+        if llm is not None:
+            return llm
+        with self._clients_lock:
+            llm = self._clients.get(idx)
+            if llm is None:
+                base = self._base_clients.get(idx)
+                if base is None:
+                    base = self._base_clients[idx] = ChatGoogleGenerativeAI(
+                        model=self._model_name,
+                        google_api_key=self._api_keys[idx],
+                        temperature=self._temperature,
+                        **self._base_kwargs,
+                    )
+                llm = base
+                if self._bound_tools is not None:
+                    llm = base.bind_tools(self._bound_tools, **self._bound_kwargs)
+                self._clients[idx] = llm
         return llm
 
     def _extract_retry_after(self, e: Exception) -> Optional[int]:
@@ -94,89 +120,141 @@ class RotatingGeminiModel(BaseChatModel):
         # Default: do not rotate
         return False
 
-    def _next_index(self) -> int:
-        self._current_key_index = (self._current_key_index + 1) % len(self._api_keys)
-        return self._current_key_index
+    def _acquire_key(self, tried: set) -> int:
+        """Reserve the healthiest key not tried yet for this request."""
+        idx = self._scheduler.acquire(exclude=tried)
+        tried.add(idx)
+        return idx
+
+    def _record_failure(self, idx: int, e: Exception, prefix: str = "") -> None:
+        """Log a failed call and feed it to the scheduler (cooldown on 429)."""
+        if self._is_429(e):
+            ra = self._extract_retry_after(e)
+            logger.warning(f"⚠️ {prefix}429 quota hit on key #{idx + 1}{' (retry_after='+str(ra)+'s)' if ra is not None else ''}; switching keys immediately.")
+            self._scheduler.throttle(idx, ra)
+            self._scheduler.release(idx, error=True)
+        else:
+            logger.error(f"{prefix}Model error on key #{idx + 1}: {e}")
+            # Request errors (400/403/404) say nothing about the key's health.
+            self._scheduler.release(idx, error=True if self._should_rotate(e) else None)
 
-    def _generate(self, messages: List[BaseMessage], stop: Optional[Sequence[str]] = None, run_manager: Optional[Any] = None, **kwargs: Any) -> ChatResult:
+    def key_stats(self) -> Dict[int, dict]:
+        return self._scheduler.stats()
+
+    def _rotating(self, call: Callable[[Any], Any], prefix: str = "", stream: bool = False) -> Iterator[Any]:
+        """Run ``call(llm)`` on the healthiest key, rotating keys on 429s and transient errors.
+
+        Yields the call's result, or each of its chunks with ``stream``. The key
+        is released once the caller has consumed everything, or closed early.
+        """
         attempts = len(self._api_keys)
-        idx = self._current_key_index
+        tried: set = set()
         last_exc = None
 
         for attempt in range(attempts):
             try:
-                logger.info(f"🧩 Using Google API key #{idx + 1}")
-                llm = self._build_llm_for_index(idx)
-                ai_msg: BaseMessage = llm.invoke(messages, **({} if stop is None else {"stop": stop}), **kwargs)
-                return ChatResult(generations=[ChatGeneration(message=ai_msg)])
-            except Exception as e:
+                idx = self._acquire_key(tried)
+            except NoKeyAvailableError as e:
                 last_exc = e
-                if self._is_429(e):
-                    ra = self._extract_retry_after(e)
-                    logger.warning(f"⚠️ 429 quota hit on key #{idx + 1}{' (retry_after='+str(ra)+'s)' if ra is not None else ''}; switching keys immediately.")
+                logger.error(f"{prefix}{e}")
+                break
+            released = False
+            try:
+                logger.info(f"🧩 {prefix}Using Google API key #{idx + 1}")
+                llm = self._llm_for_index(idx)
+                if stream:
+                    yield from call(llm)
                 else:
-                    logger.error(f"Model error on key #{idx + 1}: {e}")
+                    yield call(llm)
+                released = True
+                self._scheduler.release(idx, error=False)
+                return
+            except Exception as e:
+                last_exc = e
+                released = True
+                self._record_failure(idx, e, prefix)
 
                 if attempt == attempts - 1 or not self._should_rotate(e):
                     break
 
-                idx = self._next_index()
-                logger.warning(f"🔄 Switching to Google API key #{idx + 1}")
+                logger.warning(f"🔄 {prefix}Switching to another Google API key")
+            finally:
+                # The consumer closed the stream early.
+                if not released:
+                    self._scheduler.release(idx)
 
         raise RuntimeError("All Gemini API keys exhausted or invalid.") from last_exc
 
-    def invoke(self, input: Any, config: Optional[dict] = None, **kwargs: Any) -> BaseMessage:
+    async def _arotating(self, call: Callable[[Any], Any], prefix: str = "", stream: bool = False) -> AsyncIterator[Any]:
+        """Async ``_rotating``: ``call(llm)`` returns an awaitable, or an async iterable with ``stream``."""
         attempts = len(self._api_keys)
-        idx = self._current_key_index
+        tried: set = set()
         last_exc = None
 
         for attempt in range(attempts):
             try:
-                logger.info(f"🧩 Using Google API key #{idx + 1}")
-                llm = self._build_llm_for_index(idx)
-                return llm.invoke(input, config=config, **kwargs)
-            except Exception as e:
+                idx = await self._aacquire_key(tried)
+            except NoKeyAvailableError as e:
                 last_exc = e
-                if self._is_429(e):
-                    ra = self._extract_retry_after(e)
-                    logger.warning(f"⚠️ 429 quota hit on key #{idx + 1}{' (retry_after='+str(ra)+'s)' if ra is not None else ''}; switching keys immediately.")
+                logger.error(f"{prefix}{e}")
+                break
+            released = False
+            try:
+                logger.info(f"🧩 {prefix}Using Google API key #{idx + 1}")
+                llm = self._llm_for_index(idx)
+                if stream:
+                    async for chunk in call(llm):
+                        yield chunk
                 else:
-                    logger.error(f"Model error on key #{idx + 1}: {e}")
+                    yield await call(llm)
+                released = True
+                self._scheduler.release(idx, error=False)
+                return
+            except Exception as e:
+                last_exc = e
+                released = True
+                self._record_failure(idx, e, prefix)
 
                 if attempt == attempts - 1 or not self._should_rotate(e):
                     break
 
-                idx = self._next_index()
-                logger.warning(f"🔄 Switching to Google API key #{idx + 1}")
+                logger.warning(f"🔄 {prefix}Switching to another Google API key")
+            finally:
+                # The consumer closed the stream early.
+                if not released:
+                    self._scheduler.release(idx)
 
         raise RuntimeError("All Gemini API keys exhausted or invalid.") from last_exc
 
-    def stream(self, input: Any, config: Optional[dict] = None, **kwargs: Any):
-        attempts = len(self._api_keys)
-        idx = self._current_key_index
-        last_exc = None
+    async def _aacquire_key(self, tried: set) -> int:
+        idx = await self._scheduler.aacquire(exclude=tried)
+        tried.add(idx)
+        return idx
 
-        for attempt in range(attempts):
-            try:
-                logger.info(f"🧩 (stream) Using Google API key #{idx + 1}")
-                llm = self._build_llm_for_index(idx)
-                yield from llm.stream(input, config=config, **kwargs)
-                return
-            except Exception as e:
-                last_exc = e
-                if self._is_429(e):
-                    ra = self._extract_retry_after(e)
-                    logger.warning(f"⚠️ (stream) 429 quota hit on key #{idx + 1}{' (retry_after='+str(ra)+'s)' if ra is not None else ''}; switching keys immediately.")
-                else:
-                    logger.error(f"(stream) Model error on key #{idx + 1}: {e}")
+    def _generate(self, messages: List[BaseMessage], stop: Optional[Sequence[str]] = None, run_manager: Optional[Any] = None, **kwargs: Any) -> ChatResult:
+        stop_kwargs = {} if stop is None else {"stop": stop}
+        (ai_msg,) = self._rotating(lambda llm: llm.invoke(messages, **stop_kwargs, **kwargs))
+        return ChatResult(generations=[ChatGeneration(message=ai_msg)])
 
-                if attempt == attempts - 1 or not self._should_rotate(e):
-                    break
+    def invoke(self, input: Any, config: Optional[dict] = None, **kwargs: Any) -> BaseMessage:
+        (result,) = self._rotating(lambda llm: llm.invoke(input, config=config, **kwargs))
+        return result
+
+    def stream(self, input: Any, config: Optional[dict] = None, **kwargs: Any):
+        yield from self._rotating(lambda llm: llm.stream(input, config=config, **kwargs), "(stream) ", stream=True)
 
-                idx = self._next_index()
-                logger.warning(f"🔄 (stream) Switching to Google API key #{idx + 1}")
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[Sequence[str]] = None, run_manager: Optional[Any] = None, **kwargs: Any) -> ChatResult:
+        stop_kwargs = {} if stop is None else {"stop": stop}
+        (ai_msg,) = [msg async for msg in self._arotating(lambda llm: llm.ainvoke(messages, **stop_kwargs, **kwargs), "(async) ")]
+        return ChatResult(generations=[ChatGeneration(message=ai_msg)])
 
-        raise RuntimeError("All Gemini API keys exhausted or invalid.") from last_exc
+    async def ainvoke(self, input: Any, config: Optional[dict] = None, **kwargs: Any) -> BaseMessage:
+        (result,) = [msg async for msg in self._arotating(lambda llm: llm.ainvoke(input, config=config, **kwargs), "(async) ")]
+        return result
+
+    async def astream(self, input: Any, config: Optional[dict] = None, **kwargs: Any):
+        async for chunk in self._arotating(lambda llm: llm.astream(input, config=config, **kwargs), "(astream) ", stream=True):
+            yield chunk
 
     def bind_tools(self, tools: Sequence[ToolLike], **kwargs: Any) -> "RotatingGeminiModel":
         clone = RotatingGeminiModel(
@@ -185,11 +263,82 @@ class RotatingGeminiModel(BaseChatModel):
             temperature=self._temperature,
             **self._base_kwargs,
         )
-        clone._current_key_index = self._current_key_index
+        clone._scheduler = self._scheduler
+        clone._base_clients = self._base_clients
+        clone._clients_lock = self._clients_lock
         clone._bound_tools = list(tools) if tools is not None else None
         clone._bound_kwargs = dict(kwargs or {})
         return clone
 
+class EnquiryAgentState(AgentState):
+    """Agent state carrying the per-user values AI_AGENT_PROMPT is filled with on every turn."""
+    user_id: str
+    user_role: str
+    top_tech: Any
+    top_domain: Any
+    tone: str
+    verbosity: str
+    last_query: Any
+    recent_queries: Any
+
+
+AGENT_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", AI_AGENT_PROMPT),
+    ("human", "{messages}"),
+])
+
+_shared_lock = Lock()
+_shared_model: Optional[RotatingGeminiModel] = None
+_shared_agent = None
+_shared_tools: list = []
+
+
+def get_shared_model() -> RotatingGeminiModel:
+    """Return the process-wide RotatingGeminiModel, creating it on first use."""
+    global _shared_model
+    with _shared_lock:
+        if _shared_model is None:
+            _shared_model = RotatingGeminiModel(
+                api_keys=[
+                    Config.GOOGLE_API_KEY_1,
+                    Config.GOOGLE_API_KEY_2,
+                    Config.GOOGLE_API_KEY_3,
+                ],
+                model_name="gemini-2.5-pro",
+                temperature=0.3,
+                max_output_tokens=2048,
+            )
+        return _shared_model
+
+
+def get_shared_agent(db_manager) -> tuple:
+    """Return the process-wide (tools, agent), compiling the agent graph on first use.
+
+    Personalization is not part of the compiled graph: AGENT_PROMPT reads it
+    from the EnquiryAgentState passed with each run.
+    """
+    global _shared_agent, _shared_tools
+    model = get_shared_model()
+    with _shared_lock:
+        if _shared_agent is None:
+            logger.info("Compiling shared Enquiry AI agent.")
+            _shared_tools = register_tools(
+                model=model,
+                vector_store=db_manager.vector_store,
+                recall_vector_store=db_manager.recall_vector_store,
+                engine=db_manager.engine,
+                db_manager=db_manager
+            )
+            _shared_agent = create_react_agent(
+                model=model,
+                tools=_shared_tools,
+                prompt=AGENT_PROMPT,
+                state_schema=EnquiryAgentState,
+                name="enquiry_ai"
+            )
+            logger.info("✅ Shared agent compiled.")
+        return _shared_tools, _shared_agent
+
     
 class EnquiryAI:
     def __init__(self,db_manager=None):
@@ -216,16 +365,7 @@ class EnquiryAI:
         self.recent_queries = None
         self.project_content = ProjectContext()
         self._async_initialized = False
-        self.model = RotatingGeminiModel(
-            api_keys=[
-                self.config.GOOGLE_API_KEY_1,
-                self.config.GOOGLE_API_KEY_2,
-                self.config.GOOGLE_API_KEY_3,
-            ],
-            model_name="gemini-2.5-pro",
-            temperature=0.3,
-            max_output_tokens=2048,  
-        )
+        self.model = get_shared_model()
 
 
 
@@ -286,6 +426,45 @@ class EnquiryAI:
             logger.error(f"Error cleaning JSON: {e}")
             return {}
 
+    def _features_chain(self, query: str):
+        """Prompt | model chain extracting technologies, domains, tone and verbosity."""
+        example_json = """
+                        {{
+                            "technologies": ["Python", "PostgreSQL"],
+                            "domains": ["technology"],
+                            "intent": "problem_solving",
+                            "tone": "neutral",
+                            "verbosity": "detailed"
+                            
+                        }}
+                        """
+        prompt_text = ANALYSE_BEHAVIOR_PROMPT.format(query=query,example_json=json.dumps(example_json, indent=4))
+        prompt = ChatPromptTemplate.from_messages([
+            (
+                "system",
+                "You are a hyper-analytical AI engine specializing in deep linguistic and technical feature extraction. Your purpose is to deconstruct a user query into a structured JSON object based on a rigorous set of rules."
+            ),
+            (
+                "human",prompt_text
+               
+            )
+        ])
+        return prompt | self.model
+
+    def _parse_features(self, content: str) -> dict:
+        parsed = self._clean_and_parse_json_async(content)
+        if isinstance(parsed, dict):
+            parsed["technologies"] = [t.lower() for t in parsed.get("technologies", []) if t]
+            parsed["domains"] = [d.lower() for d in parsed.get("domains", []) if d]
+            parsed["tone"] = parsed.get("tone", "neutral").lower()
+            parsed["verbosity"] = parsed.get("verbosity", "neutral").lower()
+            logger.info(f"✅ Extracted features: {parsed}")
+        else:
+            parsed = {"technologies": [], "domains": [], "tone": "neutral", "verbosity": "neutral"}
+            logger.warning("⚠️ Parsed features not a dict; defaulting to neutral/empty.")
+        logger.info(f"✅ Extracted features: {parsed}")
+        return parsed
+
     def _analyze_text_features(self, query: str) -> dict:
         """
         Extract technologies, domains, tone, and verbosity in a single non-blocking LLM call.
@@ -293,42 +472,18 @@ class EnquiryAI:
         """
         logger.info(f"🔄 Analyzing text features for query: {query}")
         try:
-            example_json = """
-                            {{
-                                "technologies": ["Python", "PostgreSQL"],
-                                "domains": ["technology"],
-                                "intent": "problem_solving",
-                                "tone": "neutral",
-                                "verbosity": "detailed"
-                                
-                            }}
-                            """
-            prompt_text = ANALYSE_BEHAVIOR_PROMPT.format(query=query,example_json=json.dumps(example_json, indent=4))
-            prompt = ChatPromptTemplate.from_messages([
-                (
-                    "system",
-                    "You are a hyper-analytical AI engine specializing in deep linguistic and technical feature extraction. Your purpose is to deconstruct a user query into a structured JSON object based on a rigorous set of rules."
-                ),
-                (
-                    "human",prompt_text
-                   
-                )
-            ])
-
-            chain = prompt | self.model
-            response = chain.invoke({"query": query})
-            parsed = self._clean_and_parse_json_async(response.content)
-            if isinstance(parsed, dict):
-                parsed["technologies"] = [t.lower() for t in parsed.get("technologies", []) if t]
-                parsed["domains"] = [d.lower() for d in parsed.get("domains", []) if d]
-                parsed["tone"] = parsed.get("tone", "neutral").lower()
-                parsed["verbosity"] = parsed.get("verbosity", "neutral").lower()
-                logger.info(f"✅ Extracted features: {parsed}")
-            else:
-                parsed = {"technologies": [], "domains": [], "tone": "neutral", "verbosity": "neutral"}
-                logger.warning("⚠️ Parsed features not a dict; defaulting to neutral/empty.")
-            logger.info(f"✅ Extracted features: {parsed}")
-            return parsed
+            response = self._features_chain(query).invoke({"query": query})
+            return self._parse_features(response.content)
+        except Exception as e:
+            logger.error(f"Text feature analysis failed: {e}")
+            return {"technologies": [], "domains": [], "tone": "neutral", "verbosity": "neutral"}
+
+    async def _aanalyze_text_features(self, query: str) -> dict:
+        """Async ``_analyze_text_features``."""
+        logger.info(f"🔄 Analyzing text features for query: {query}")
+        try:
+            response = await self._features_chain(query).ainvoke({"query": query})
+            return self._parse_features(response.content)
         except Exception as e:
             logger.error(f"Text feature analysis failed: {e}")
             return {"technologies": [], "domains": [], "tone": "neutral", "verbosity": "neutral"}
@@ -433,78 +588,79 @@ class EnquiryAI:
         try:
             logger.info(f"🔄 Background analysis for user {user_id} with query: {query}")
             with self._user_locks[user_id]:  # if using locks, make them sync locks
-                if user_id not in self.users:
-                    self.users[user_id] = self._create_profile(user_id)
-                profile = self.users[user_id]
-                profile["recent_query"].append(query)
-                if len(profile["recent_query"]) > self.config.MAX_RECENT_QUERIES:
-                    profile["recent_query"].pop(0)
-                
                 # Sync version of feature extraction
                 features = self._analyze_text_features(query)  # not async
-                classification = {"tone": features["tone"], "verbosity": features["verbosity"]}
-                extracted = {"technologies": features["technologies"], "domains": features["domains"]}
+                self._apply_features(user_id, query, features)
+        except Exception as e:
+            logger.error(f"Background analysis failed for user {user_id}: {e}")
+            if callback:
+                callback(user_id, None, error=e)
 
-                # Update scores
-                tone, tone_explicit = self._resolve_tone(
-                    query, classification.get("tone", "neutral"), profile["tone_score"]
-                )
-                verbosity, verb_explicit = self._resolve_verbosity(
-                    query, classification.get("verbosity", "neutral"), profile["verbosity_score"]
-                )
-                self._update_scores(profile["tone_score"], tone, self.config.TONE_INCREMENT, self.config.TONE_DECAY, tone_explicit)
-                self._update_scores(profile["verbosity_score"], verbosity, self.config.VERBOSITY_INCREMENT, self.config.VERBOSITY_DECAY, verb_explicit)
-                self._update_interest_scores(profile, extracted)
-                self.db_manager._save_profile_to_db(user_id, profile)
-                profile["top_technology"] = max(profile["technology_interest"], key=profile["technology_interest"].get, default="None")
-                profile["top_domain"] = max(profile["domain_interest"], key=profile["domain_interest"].get, default="None")
-               
+    async def aanalyze_and_update_background(self, user_id: str, query: str, callback=None):
+        """Async ``analyze_and_update_background``; the profile write runs in a worker thread."""
+        logger.info(f"Starting background analysis for user {user_id}.")
+        try:
+            logger.info(f"🔄 Background analysis for user {user_id} with query: {query}")
+            features = await self._aanalyze_text_features(query)
+            await asyncio.to_thread(self._apply_features_locked, user_id, query, features)
         except Exception as e:
             logger.error(f"Background analysis failed for user {user_id}: {e}")
             if callback:
                 callback(user_id, None, error=e)
 
+    def _apply_features_locked(self, user_id: str, query: str, features: dict):
+        with self._user_locks[user_id]:
+            self._apply_features(user_id, query, features)
+
+    def _apply_features(self, user_id: str, query: str, features: dict):
+        """Fold extracted features into the user's profile and save it."""
+        if user_id not in self.users:
+            self.users[user_id] = self._create_profile(user_id)
+        profile = self.users[user_id]
+        profile["recent_query"].append(query)
+        if len(profile["recent_query"]) > self.config.MAX_RECENT_QUERIES:
+            profile["recent_query"].pop(0)
+        
+        classification = {"tone": features["tone"], "verbosity": features["verbosity"]}
+        extracted = {"technologies": features["technologies"], "domains": features["domains"]}
+
+        # Update scores
+        tone, tone_explicit = self._resolve_tone(
+            query, classification.get("tone", "neutral"), profile["tone_score"]
+        )
+        verbosity, verb_explicit = self._resolve_verbosity(
+            query, classification.get("verbosity", "neutral"), profile["verbosity_score"]
+        )
+        self._update_scores(profile["tone_score"], tone, self.config.TONE_INCREMENT, self.config.TONE_DECAY, tone_explicit)
+        self._update_scores(profile["verbosity_score"], verbosity, self.config.VERBOSITY_INCREMENT, self.config.VERBOSITY_DECAY, verb_explicit)
+        self._update_interest_scores(profile, extracted)
+        self.db_manager._save_profile_to_db(user_id, profile)
+        profile["top_technology"] = max(profile["technology_interest"], key=profile["technology_interest"].get, default="None")
+        profile["top_domain"] = max(profile["domain_interest"], key=profile["domain_interest"].get, default="None")
+
     
 
     def init_agent(self,user_id):
-        """Initialize the LangGraph agent with tools."""
+        """Attach the shared, precompiled agent and its tools."""
         logger.info(f"Initializing agent for user {user_id}.")  
-        self.tools = register_tools(
-            model=self.model,
-            vector_store=self.vector_store,
-            recall_vector_store=self.recall_vector_store,
-            engine=self.engine,
-            db_manager=self.db_manager
-        )
-        
+        self.tools, self.agent = get_shared_agent(self.db_manager)
+        logger.info(f"✅ Agent initialized for user {user_id}.")
+
+    def agent_state(self, user_id):
+        """Per-user values for AI_AGENT_PROMPT, passed as agent state on each run."""
         last_query='**No queries yet**'   
         if self.recent_queries:
             last_query=self.recent_queries[-2:]
         logger.info(f"last_query is:{last_query}")
         logger.info(f"recent queries:{self.recent_queries}")
 
-        system_prompt=AI_AGENT_PROMPT.format(
-            user_id=user_id,
-            user_role=self.user_role,
-            top_tech=self.top_tech or "None",
-            top_domain=self.top_domain or "None",
-            tone=self.tone or "neutral",
-            verbosity=self.verbosity or "neutral",
-            last_query=last_query,
-            recent_queries=self.recent_queries or "None",
-            
-        )
-
-        prompt  = ChatPromptTemplate.from_messages([
-                    ("system",system_prompt),
-                    ("human", "{messages}"),
-                ])
-        
-        self.agent = create_react_agent(
-            model=self.model,
-            tools=self.tools,
-            prompt=prompt,
-            name="enquiry_ai"
-        )
-        logger.info(f"✅ Agent initialized for user {user_id}.")
- 
+        return {
+            "user_id": user_id,
+            "user_role": self.user_role,
+            "top_tech": self.top_tech or "None",
+            "top_domain": self.top_domain or "None",
+            "tone": self.tone or "neutral",
+            "verbosity": self.verbosity or "neutral",
+            "last_query": last_query,
+            "recent_queries": self.recent_queries or "None",
+        }
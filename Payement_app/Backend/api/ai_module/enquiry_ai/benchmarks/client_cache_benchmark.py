@@ -0,0 +1,66 @@
+"""Timing benchmark: per-call client construction vs cached per-key clients in RotatingGeminiModel.
+
+Usage:
+    python -m api.ai_module.enquiry_ai.benchmarks.client_cache_benchmark [--calls N] [--tools N] [--keys N]
+
+Run from the Backend directory. Only client construction and tool binding
+are timed, so fake API keys are used and no request leaves the machine.
+"""
+
+import time
+import argparse
+from langchain_core.tools import tool
+from langchain_google_genai import ChatGoogleGenerativeAI
+from api.ai_module.enquiry_ai.ai_engine import RotatingGeminiModel
+
+
+def _dummy_tools(count):
+    def make(n):
+        def lookup(query: str, limit: int = 5) -> str:
+            return query
+        lookup.__name__ = f"lookup_{n}"
+        return tool(lookup, description=f"Look up records of kind {n}.")
+    return [make(n) for n in range(count)]
+
+
+def _build_per_call(model, idx):
+    """The pre-cache behaviour: a new client, and a new tool binding, on every call."""
+    llm = ChatGoogleGenerativeAI(
+        model=model._model_name,
+        google_api_key=model._api_keys[idx],
+        temperature=model._temperature,
+        **model._base_kwargs,
+    )
+    if model._bound_tools is not None:
+        llm = llm.bind_tools(model._bound_tools, **model._bound_kwargs)
+    return llm
+
+
+def _measure(get_llm, calls, keys):
+    start = time.perf_counter()
+    for n in range(calls):
+        get_llm(n % keys)
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--tools", type=int, default=10)
+    parser.add_argument("--keys", type=int, default=3)
+    args = parser.parse_args()
+
+    model = RotatingGeminiModel(api_keys=[f"fake-key-{n}" for n in range(args.keys)], max_output_tokens=2048)
+    bound = model.bind_tools(_dummy_tools(args.tools))
+    results = {
+        "per-call build": _measure(lambda idx: _build_per_call(bound, idx), args.calls, args.keys),
+        "cached client": _measure(bound._llm_for_index, args.calls, args.keys),
+    }
+    print(f"{args.calls} calls, {args.keys} keys, {args.tools} bound tools")
+    baseline = results["per-call build"]
+    for name, seconds in results.items():
+        print(f"  {name:<15}: {seconds * 1e6:10.1f} us/call  speedup {baseline / seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
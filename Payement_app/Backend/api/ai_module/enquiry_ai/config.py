@@ -26,3 +26,9 @@ class Config:
     GOOGLE_API_KEY_3 = os.environ.get("GOOGLE_API_KEY_3")
     TEMPLATE_PATH = os.environ.get("PPT_TEMPLATE", "template.pptx")
     OUTPUT_FOLDER = os.environ.get("OUTPUT_FOLDER", "generated_ppts")
+    AI_CACHE_MAX_USERS = int(os.environ.get("AI_CACHE_MAX_USERS", 500))
+    AI_CACHE_MAX_THREADS_PER_USER = int(os.environ.get("AI_CACHE_MAX_THREADS_PER_USER", 20))
+    AI_CACHE_IDLE_TTL_SECONDS = int(os.environ.get("AI_CACHE_IDLE_TTL_SECONDS", 3600))
+    AI_KEY_COOLDOWN_SECONDS = float(os.environ.get("AI_KEY_COOLDOWN_SECONDS", 10))
+    AI_KEY_MAX_WAIT_SECONDS = float(os.environ.get("AI_KEY_MAX_WAIT_SECONDS", 30))
+    AI_KEY_ERROR_HALF_LIFE_SECONDS = float(os.environ.get("AI_KEY_ERROR_HALF_LIFE_SECONDS", 30))
@@ -1,8 +1,15 @@
+import contextvars
 from api.ai_module.enquiry_ai.log import logger
+
+# The project context of the chat being answered; the agent's tools are shared
+# by every chat, so the per-thread context travels with the request instead.
+current_project_context = contextvars.ContextVar("current_project_context", default=None)
+
+
 class ProjectContext:
     def __init__(self):
         self.last_project_id = None
 
     def update_project_id(self, project_id: int):
         self.last_project_id = project_id
-        logger.info(f"📌 Updated project context to: {project_id}")
\ No newline at end of file
+        logger.info(f"📌 Updated project context to: {project_id}")
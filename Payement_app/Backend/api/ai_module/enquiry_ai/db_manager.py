@@ -2,15 +2,21 @@
 import json
 from typing import Optional
 from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
 from langchain_postgres.vectorstores import PGVector
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from api.ai_module.enquiry_ai.config import Config
 from typing import Dict, Any, Optional
 from api.ai_module.enquiry_ai.log import logger
+from api.ai_module.enquiry_ai.runtime_cache import BoundedCache
 class DBManager:
     def __init__(self):
         self.config = Config()
-        self.users: Dict[str, Dict[str, Any]] = {}
+        # Profiles are written back when evicted so no in-memory update is lost.
+        self.users: Dict[str, Dict[str, Any]] = BoundedCache(
+            "profiles", self.config.AI_CACHE_MAX_USERS, self.config.AI_CACHE_IDLE_TTL_SECONDS,
+            on_evict=self._write_profile,
+        )
         self.embedding_model = GoogleGenerativeAIEmbeddings(
             # Use the full resource path for the model
             model="models/gemini-embedding-001",
@@ -22,6 +28,7 @@ class DBManager:
         # Engine & SSH tunnel
       
         self.engine = None
+        self.async_engine = None
 
         # Vector stores
         self.collection = "Slide_Embeddings"
@@ -41,6 +48,8 @@ class DBManager:
             )
 
             self.engine = create_engine(connection_str)
+            # psycopg 3 drives both engines; the async one serves arag()
+            self.async_engine = create_async_engine(connection_str)
             with self.engine.begin() as conn:
                 conn.execute(text("CREATE SCHEMA IF NOT EXISTS public;"))
           
@@ -156,7 +165,10 @@ class DBManager:
        
         if user_id not in self.users:
             return
-       
+        self._write_profile(user_id, profile)
+
+    def _write_profile(self, user_id: str, profile: dict):
+        """Upsert a profile row; also the eviction hook of ``self.users``."""
         try:
             with self.engine.begin() as conn:
                 conn.execute(text("""
@@ -246,3 +258,29 @@ class DBManager:
             })
 
         return messages
+
+    async def _aretrieve_messages(self, thread_id: int, limit: int = 3):
+        """Async ``_retrieve_messages`` on the async engine."""
+        query = """
+            SELECT id, direction, message, file_name, file_path, created_at
+            FROM message
+            WHERE session_id = :thread_id
+            ORDER BY created_at DESC
+            LIMIT :limit
+        """
+
+        async with self.async_engine.connect() as conn:
+            result = await conn.execute(text(query), {"thread_id": thread_id, "limit": limit})
+            rows = result.mappings().all()
+
+        return [
+            {
+                "id": row["id"],
+                "direction": row["direction"],
+                "message": row["message"],
+                "file_name": row["file_name"],
+                "file_path": row["file_path"],
+                "created_at": row["created_at"]
+            }
+            for row in rows
+        ]
@@ -0,0 +1,141 @@
+# key_scheduler.py
+import time
+import asyncio
+from dataclasses import dataclass
+from threading import Lock
+from typing import Collection, Dict, Optional, Tuple
+from .log import logger
+
+
+# Floor on the success rate used in a key's cost, so a failing key stays finite.
+MIN_SUCCESS_RATE = 0.05
+
+
+class NoKeyAvailableError(RuntimeError):
+    """Raised when every candidate key cools down longer than the caller will wait."""
+
+
+@dataclass
+class KeyHealth:
+    cooldown_until: float = 0.0
+    in_flight: int = 0
+    last_used: float = 0.0
+    calls: int = 0
+    throttled: int = 0
+    # Exponentially decayed outcome counts, so old errors fade out.
+    errors: float = 0.0
+    outcomes: float = 0.0
+    decayed_at: float = 0.0
+
+    def _decay(self, now: float, half_life: float):
+        if half_life > 0 and now > self.decayed_at:
+            factor = 0.5 ** ((now - self.decayed_at) / half_life)
+            self.errors *= factor
+            self.outcomes *= factor
+        self.decayed_at = now
+
+    def record(self, error: bool, now: float, half_life: float):
+        self._decay(now, half_life)
+        self.outcomes += 1
+        self.errors += error
+
+    def error_rate(self, now: float, half_life: float) -> float:
+        """Decayed error share, smoothed by one prior success so a single error is not final."""
+        self._decay(now, half_life)
+        return self.errors / (self.outcomes + 1)
+
+    def cost(self, now: float, half_life: float) -> float:
+        """Expected load of one more request: requests in flight plus this one, per success."""
+        return (self.in_flight + 1) / max(1 - self.error_rate(now, half_life), MIN_SUCCESS_RATE)
+
+
+class KeyScheduler:
+    """Thread-safe choice of API key by cooldown, recent error rate and load.
+
+    Keys in a cooldown are skipped. Among the others the lowest cost wins:
+    requests in flight (plus the new one) over the recent success rate,
+    compared to one decimal, then least recent use. Errors decay with a
+    half-life of ``error_half_life`` seconds, so a key that failed once still
+    takes load when the others are busy. If every candidate is cooling down,
+    ``acquire`` (or ``aacquire``) waits for the earliest cooldown to end, up
+    to ``max_wait`` seconds.
+    """
+
+    def __init__(self, key_count: int, default_cooldown: float, max_wait: float, error_half_life: float):
+        self.default_cooldown = default_cooldown
+        self.max_wait = max_wait
+        self.error_half_life = error_half_life
+        self._lock = Lock()
+        self._keys: Dict[int, KeyHealth] = {idx: KeyHealth() for idx in range(key_count)}
+
+    def _try_acquire(self, exclude: Collection[int]) -> Tuple[Optional[int], float]:
+        """Reserve a ready key, or return (None, seconds until the earliest candidate is ready)."""
+        with self._lock:
+            now = time.monotonic()
+            candidates = [idx for idx in self._keys if idx not in exclude]
+            if not candidates:
+                raise NoKeyAvailableError("No untried API key left.")
+            ready = [idx for idx in candidates if self._keys[idx].cooldown_until <= now]
+            if not ready:
+                wait = min(self._keys[idx].cooldown_until for idx in candidates) - now
+                if wait > self.max_wait:
+                    raise NoKeyAvailableError(f"All API keys cooling down for at least {wait:.1f}s.")
+                return None, wait
+            idx = min(ready, key=lambda i: (
+                round(self._keys[i].cost(now, self.error_half_life), 1), self._keys[i].last_used,
+            ))
+            health = self._keys[idx]
+            health.in_flight += 1
+            health.calls += 1
+            health.last_used = now
+            return idx, 0.0
+
+    def acquire(self, exclude: Collection[int] = ()) -> int:
+        """Reserve the healthiest key not in ``exclude`` and return its index."""
+        while True:
+            idx, wait = self._try_acquire(exclude)
+            if idx is not None:
+                return idx
+            logger.warning(f"⏳ All API keys cooling down, waiting {wait:.1f}s.")
+            time.sleep(wait)
+
+    async def aacquire(self, exclude: Collection[int] = ()) -> int:
+        """Async ``acquire``: waits for a cooldown without blocking the event loop."""
+        while True:
+            idx, wait = self._try_acquire(exclude)
+            if idx is not None:
+                return idx
+            logger.warning(f"⏳ All API keys cooling down, waiting {wait:.1f}s.")
+            await asyncio.sleep(wait)
+
+    def release(self, idx: int, error: Optional[bool] = None):
+        """Finish a request on key ``idx``; ``error`` None leaves the error rate untouched."""
+        with self._lock:
+            health = self._keys[idx]
+            health.in_flight = max(0, health.in_flight - 1)
+            if error is not None:
+                health.record(error, time.monotonic(), self.error_half_life)
+
+    def throttle(self, idx: int, retry_after: Optional[float] = None):
+        """Put key ``idx`` in cooldown after a 429 for ``retry_after`` (or the default) seconds."""
+        delay = self.default_cooldown if retry_after is None else retry_after
+        with self._lock:
+            health = self._keys[idx]
+            health.throttled += 1
+            health.cooldown_until = max(health.cooldown_until, time.monotonic() + delay)
+        logger.warning(f"🧊 Key #{idx + 1} cooling down for {delay:.1f}s.")
+
+    def stats(self) -> Dict[int, dict]:
+        """Per-key counters, keyed by 1-based key number as used in the logs."""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                idx + 1: {
+                    "calls": h.calls,
+                    "throttled": h.throttled,
+                    "in_flight": h.in_flight,
+                    "error_rate": round(h.error_rate(now, self.error_half_life), 3),
+                    "cooldown_seconds": round(max(0.0, h.cooldown_until - now), 1),
+                }
+                for idx, h in self._keys.items()
+            }
@@ -1,12 +1,15 @@
 from typing import Dict, Any, Optional,Tuple,Union
-from collections import defaultdict
+from collections import Counter
+from contextlib import contextmanager
 from threading import Lock
 from .ai_engine import EnquiryAI
-from .tools import register_tools
+from .runtime_cache import BoundedCache
+from .context import current_project_context
 from .db_manager import DBManager
 from .config import Config
 from .log import logger, set_log_filename
 import json, time, os,re
+import asyncio
 
 logger.info("🚀 Initializing Enquiry_AI runtime...")
 
@@ -14,11 +17,25 @@ logger.info("🚀 Initializing Enquiry_AI runtime...")
 # Shared DB manager (initialized once)
 db_manager = DBManager()
 logger.info("✅ DB Manager initialized.")
-_user_locks = defaultdict(Lock)
-
-# Global runtime maps
-_ai_instances: Dict[str, Dict[str, EnquiryAI]] = {}  # user_id → thread_id → EnquiryAI instance
-_threads: Dict[str, Dict[str, list]] = {}           # user_id → thread_id → list of messages
+# Held locks are never evicted, so two requests of one user always share a lock.
+_user_locks = BoundedCache(
+    "user_locks", Config.AI_CACHE_MAX_USERS, Config.AI_CACHE_IDLE_TTL_SECONDS,
+    can_evict=lambda user_id, lock: not lock.locked(), factory=Lock,
+)
+
+# Requests in progress; their users' and threads' entries are never evicted
+_in_flight: Counter = Counter()  # user_id and (user_id, thread_id) → running requests
+_in_flight_lock = Lock()
+
+# Global runtime maps, bounded per user (LRU + idle TTL) and per thread within a user
+_ai_instances = BoundedCache(
+    "ai_instances", Config.AI_CACHE_MAX_USERS, Config.AI_CACHE_IDLE_TTL_SECONDS,
+    can_evict=lambda user_id, _: not _in_flight[user_id],
+)  # user_id → thread_id → EnquiryAI instance
+_threads = BoundedCache(
+    "threads", Config.AI_CACHE_MAX_USERS, Config.AI_CACHE_IDLE_TTL_SECONDS,
+    can_evict=lambda user_id, _: not _in_flight[user_id],
+)  # user_id → thread_id → list of messages
 
 logger.info("✅ Global runtime maps initialized.")
 
@@ -26,13 +43,47 @@ logger.info("✅ Global runtime maps initialized.")
 # Helper Functions
 # ------------------------
 
+def _thread_cache(kind, user_id) -> BoundedCache:
+    """Per-user thread_id map for _ai_instances / _threads."""
+    return BoundedCache(
+        f"{kind}:{user_id}", Config.AI_CACHE_MAX_THREADS_PER_USER, Config.AI_CACHE_IDLE_TTL_SECONDS,
+        can_evict=lambda thread_id, _: not _in_flight[(user_id, thread_id)],
+    )
+
+
+@contextmanager
+def _pinned(user_id, thread_id):
+    """Keep the thread's history and AI instance cached while a request uses them."""
+    keys = (user_id, (user_id, thread_id))
+    with _in_flight_lock:
+        _in_flight.update(keys)
+    try:
+        yield
+    finally:
+        with _in_flight_lock:
+            _in_flight.subtract(keys)
+            for key in keys:
+                if not _in_flight[key]:
+                    del _in_flight[key]
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """Hit/miss/eviction counters of the runtime caches, for monitoring."""
+    return {
+        "ai_instances": _ai_instances.stats(),
+        "threads": _threads.stats(),
+        "user_locks": _user_locks.stats(),
+        "profiles": db_manager.users.stats(),
+    }
+
+
 def _retrive_message(user_id, thread_id, role, content, file_name=None, file_path=None):
     """Retrieve messages from DB to in-memory thread (thread-safe)."""
     logger.info(f"🔄 retrieving messages for user_id={user_id}, thread_id={thread_id}, role={role}")
     with _user_locks[user_id]:
         # Ensure user/thread structure exists
         if user_id not in _threads:
-            _threads[user_id] = {}
+            _threads[user_id] = _thread_cache("threads", user_id)
             logger.info(f"🆕 Created new user entry in threads for user_id={user_id}")
         if thread_id not in _threads[user_id]:
             _threads[user_id][thread_id] = []
@@ -56,6 +107,34 @@ def _retrive_message(user_id, thread_id, role, content, file_name=None, file_pat
 
         
 
+def _replace_thread_messages(user_id, thread_id, loaded):
+    """Swap a thread's in-memory history under the user's lock."""
+    with _user_locks[user_id]:
+        _init_thread_entries(user_id, thread_id)
+        _threads[user_id][thread_id][:] = loaded
+
+
+async def _aretrive_message(user_id, thread_id, role, content, file_name=None, file_path=None):
+    """Async ``_retrive_message``: the DB read is awaited and the locked swap runs in a worker thread.
+
+    The user lock is a threading.Lock shared with the sync path, so it is
+    never taken on the event loop.
+    """
+    logger.info(f"🔄 retrieving messages (async) for user_id={user_id}, thread_id={thread_id}, role={role}")
+    messages = await db_manager._aretrieve_messages(thread_id, limit=10)
+    loaded = [
+        {
+            "role": "user" if msg['direction'] == 1 else "assistant",
+            "content": msg['message'],
+            "file_name": msg['file_name'],
+            "file_path": msg['file_path']
+        }
+        for msg in reversed(messages)  # oldest first for conversation order
+    ]
+    await asyncio.to_thread(_replace_thread_messages, user_id, thread_id, loaded)
+    logger.info(f"💾 Retrieved and loaded {len(messages)} messages into memory for user={user_id}, thread={thread_id}, role={role}")
+
+
 def _ensure_thread_and_ai_instance(user_id, thread_id, role) -> EnquiryAI:
     """Ensure AI instance and thread exist; initialize if needed."""
     global _ai_instances, _threads, db_manager
@@ -85,7 +164,7 @@ def _ensure_thread_and_ai_instance(user_id, thread_id, role) -> EnquiryAI:
 
 def _init_thread_entries(user_id, thread_id):
     if user_id not in _threads:
-        _threads[user_id] = {}
+        _threads[user_id] = _thread_cache("threads", user_id)
         logger.info(f"🆕 Created new user entry in threads for user_id={user_id}")
     if thread_id not in _threads[user_id]:
         _threads[user_id][thread_id] = []
@@ -94,7 +173,7 @@ def _init_thread_entries(user_id, thread_id):
 
 def _init_ai_entries(user_id):
     if user_id not in _ai_instances:
-        _ai_instances[user_id] = {}
+        _ai_instances[user_id] = _thread_cache("ai_instances", user_id)
         logger.info(f"🆕 Created new user entry in AI instances for user_id={user_id}")
 
 
@@ -163,7 +242,7 @@ def _load_recent_messages(ai_instance, thread_id, user_id=None, inside_lock=Fals
 
 
 def _setup_personalization(ai_instance, user_id, user_role):
-    profile = ai_instance.db_manager.users[user_id]
+    profile = _get_profile(ai_instance, user_id)
     tech = profile.get("technology_interest", {})
     domain = profile.get("domain_interest", {})
     ai_instance.top_tech = sorted(tech, key=tech.get, reverse=True)[:5] or ["None"]
@@ -172,25 +251,31 @@ def _setup_personalization(ai_instance, user_id, user_role):
     logger.info(f"✅ Personalization set: top_tech={ai_instance.top_tech}, top_domain={ai_instance.top_domain}, role={ai_instance.user_role}")
 
 
+def _get_profile(ai_instance, user_id):
+    """Return the cached profile, reloading it if it was evicted while the instance lived."""
+    dbm = ai_instance.db_manager
+    profile = dbm.users.get(user_id)
+    if profile is None:
+        dbm.get_user_role(user_id)
+        profile = dbm.users.get(user_id)
+    if profile is None:
+        profile = dbm.users[user_id] = ai_instance._create_profile(ai_instance.user_role)
+    return profile
+
+
 def _register_and_init(ai_instance, user_id):
-    ai_instance.tools = register_tools(
-        model=ai_instance.model,
-        vector_store=ai_instance.vector_store,
-        recall_vector_store=ai_instance.recall_vector_store,
-        engine=ai_instance.engine,
-        db_manager=db_manager
-    )
+    # Tools and the compiled agent are shared process-wide; see get_shared_agent.
     ai_instance.init_agent(user_id)
 
 
 def _recheck_thread_entries(user_id, thread_id):
     """Recreate threads and instances under lock, exactly like original logic."""
     if user_id not in _threads:
-        _threads[user_id] = {}
+        _threads[user_id] = _thread_cache("threads", user_id)
     if thread_id not in _threads[user_id]:
         _threads[user_id][thread_id] = []
     if user_id not in _ai_instances:
-        _ai_instances[user_id] = {}
+        _ai_instances[user_id] = _thread_cache("ai_instances", user_id)
 
 
 def extract_json_filename(ai_response: str) -> str:
@@ -247,31 +332,58 @@ def _build_system_context(profile, ai_instance, user_id: str) -> str:
 
 
 
+def _fold_step(step, ai_response, ppt_path, ppt_filename):
+    """Fold one streamed agent state into the response and file path/name so far."""
+    last_msg = step["messages"][-1]
+    raw_content = getattr(last_msg, "content", "")
+
+    # Handle both string and list
+    if isinstance(raw_content, list):
+        content = " ".join(map(str, raw_content)).strip()
+    else:
+        content = (raw_content or "").strip()
+
+    # Skip empty messages or "Prepared Action:" messages
+    if not content or "Prepared Action:" in content:
+        return ai_response, ppt_path, ppt_filename
+    msg_name = getattr(last_msg, "name", "")
+
+    if msg_name in ("generate_ppt_tool", "get_file"):
+        ppt_path, ppt_filename = _process_file_message(msg_name, content)
+        return ai_response, ppt_path, ppt_filename
+
+    if type(last_msg).__name__ == "AIMessage":
+        ai_response = content
+    return ai_response, ppt_path, ppt_filename
+
+
 def _stream_and_save_response(ai_instance, user_id, thread_id, messages) -> tuple[str, Optional[str], Optional[str]]:
     """Stream model response and save assistant messages to DB."""
     ai_response, ppt_path, ppt_filename = "", None, None
     logger.info(f"🔄 Streaming response for user_id :---------------------------------- ={user_id}, thread_id={thread_id},messages={messages}")
-    for step in ai_instance.agent.stream({"messages": messages}, stream_mode="values"):
-        last_msg = step["messages"][-1]
-        raw_content = getattr(last_msg, "content", "")
-
-        # Handle both string and list
-        if isinstance(raw_content, list):
-            content = " ".join(map(str, raw_content)).strip()
-        else:
-            content = (raw_content or "").strip()
-
-        # Skip empty messages or "Prepared Action:" messages
-        if not content or "Prepared Action:" in content:
-            continue
-        msg_name = getattr(last_msg, "name", "")
+    agent_input = {"messages": messages, **ai_instance.agent_state(user_id)}
+    token = current_project_context.set(ai_instance.project_content)
+    try:
+        for step in ai_instance.agent.stream(agent_input, stream_mode="values"):
+            ai_response, ppt_path, ppt_filename = _fold_step(step, ai_response, ppt_path, ppt_filename)
+    finally:
+        current_project_context.reset(token)
+    logger.info(f"before striping--->{ai_response}")
+    cleaned = extract_json_filename(ai_response)
+    return cleaned, ppt_path, ppt_filename
 
-        if msg_name in ("generate_ppt_tool", "get_file"):
-            ppt_path, ppt_filename = _process_file_message(msg_name, content)
-            continue
 
-        if type(last_msg).__name__ == "AIMessage":
-            ai_response = content
+async def _astream_and_save_response(ai_instance, user_id, thread_id, messages) -> tuple[str, Optional[str], Optional[str]]:
+    """Async ``_stream_and_save_response`` using the agent's astream."""
+    ai_response, ppt_path, ppt_filename = "", None, None
+    logger.info(f"🔄 Streaming response (async) for user_id={user_id}, thread_id={thread_id},messages={messages}")
+    agent_input = {"messages": messages, **ai_instance.agent_state(user_id)}
+    token = current_project_context.set(ai_instance.project_content)
+    try:
+        async for step in ai_instance.agent.astream(agent_input, stream_mode="values"):
+            ai_response, ppt_path, ppt_filename = _fold_step(step, ai_response, ppt_path, ppt_filename)
+    finally:
+        current_project_context.reset(token)
     logger.info(f"before striping--->{ai_response}")
     cleaned = extract_json_filename(ai_response)
     return cleaned, ppt_path, ppt_filename
@@ -337,6 +449,11 @@ def _process_file_message(name: str, content: Union[str, dict, list, Any]) -> Tu
 # ------------------------
 def rag(user_id: str, message: str, role: str = None, thread_id: Optional[str] = None) -> Dict[str, Any]:
     """Core RAG process for one user + one message."""
+    with _pinned(user_id, thread_id):
+        return _rag(user_id, message, role, thread_id)
+
+
+def _rag(user_id, message, role, thread_id) -> Dict[str, Any]:
     set_log_filename(message)
     start_time = time.time()
     node_timings = {}
@@ -355,7 +472,7 @@ def rag(user_id: str, message: str, role: str = None, thread_id: Optional[str] =
     node_timings["setup_time"] = time.time() - start_time
 
     # 3️⃣ Build conversation messages
-    profile = ai_instance.db_manager.users[user_id]
+    profile = _get_profile(ai_instance, user_id)
     thread_messages = _threads[user_id][thread_id]
     logger.info(f"thread_messages-----------{thread_messages}")
     system_context = _build_system_context(profile, ai_instance, user_id)
@@ -387,3 +504,54 @@ def rag(user_id: str, message: str, role: str = None, thread_id: Optional[str] =
         "role": str(profile.get("role", Config.DEFAULT_USER_ROLE)),
         "node_timings": node_timings
     }
+
+
+async def arag(user_id: str, message: str, role: str = None, thread_id: Optional[str] = None) -> Dict[str, Any]:
+    """Async ``rag``: the agent runs with astream and message history loads on the async engine.
+
+    Instance setup (first message of a thread only), profile loads and writes
+    and every user-lock section still use sync code and run in worker threads.
+    """
+    with _pinned(user_id, thread_id):
+        return await _arag(user_id, message, role, thread_id)
+
+
+async def _arag(user_id, message, role, thread_id) -> Dict[str, Any]:
+    set_log_filename(message)
+    start_time = time.time()
+    node_timings = {}
+
+    logger.info(f"message received in aRAG: {message}")
+
+    ai_instance = await asyncio.to_thread(_ensure_thread_and_ai_instance, user_id, thread_id, role)
+    logger.info(f"✅ Ensured AI instance for user_id={user_id}, thread_id={thread_id},message={message}")
+    await _aretrive_message(user_id, thread_id, "user", message)
+    ai_instance.recent_queries.append(message)
+    ai_instance.recent_queries = ai_instance.recent_queries[-3:]
+
+    node_timings["setup_time"] = time.time() - start_time
+
+    # A profile evicted from the cache is reloaded through the sync DB layer
+    profile = await asyncio.to_thread(_get_profile, ai_instance, user_id)
+    thread_messages = _threads[user_id][thread_id]
+    system_context = _build_system_context(profile, ai_instance, user_id)
+    logger.info(f"system_context={system_context}")
+
+    messages = [{"role": "system", "content": f"Dynamic context:\n{system_context}"},*thread_messages]
+
+    ai_response, ppt_path, ppt_filename = await _astream_and_save_response(ai_instance, user_id, thread_id, messages)
+
+    await ai_instance.aanalyze_and_update_background(user_id, message)
+    node_timings["total_time"] = time.time() - start_time
+    logger.info(f"✅ Completed aRAG process for user_id={user_id}, thread_id={thread_id},message={message}, in {node_timings['total_time']:.2f}s")
+
+    return {
+        "thread_id": thread_id,
+        "response": {
+            "message": ai_response,
+            "file_name": ppt_filename,
+            "file_path": ppt_path
+        },
+        "role": str(profile.get("role", Config.DEFAULT_USER_ROLE)),
+        "node_timings": node_timings
+    }
@@ -0,0 +1,149 @@
+# runtime_cache.py
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from threading import RLock
+from typing import Any, Callable, Optional
+import time
+from .log import logger
+
+
+class BoundedCache(MutableMapping):
+    """Thread-safe mapping bounded by entry count (LRU) and idle time (TTL).
+
+    ``on_evict(key, value)`` runs, outside the cache lock, for every entry
+    dropped by size or TTL; explicit deletes do not trigger it. Entries for
+    which ``can_evict(key, value)`` is False are kept (e.g. a held lock).
+    With ``factory`` set, reading a missing key creates it, like defaultdict.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        ttl_seconds: float,
+        on_evict: Optional[Callable[[Any, Any], None]] = None,
+        can_evict: Optional[Callable[[Any, Any], bool]] = None,
+        factory: Optional[Callable[[], Any]] = None,
+    ):
+        self.name = name
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self.can_evict = can_evict
+        self.factory = factory
+        self._data: "OrderedDict[Any, list]" = OrderedDict()  # key -> [value, last_access]
+        self._lock = RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expired(self, entry, now) -> bool:
+        return self.ttl_seconds > 0 and now - entry[1] > self.ttl_seconds
+
+    def _evictable(self, key, entry) -> bool:
+        return self.can_evict is None or self.can_evict(key, entry[0])
+
+    def _collect(self, now, keep=None) -> list:
+        """Pop expired entries, then least recently used ones over the limit, sparing ``keep``.
+
+        ``keep`` is the key being read or written, so an entry just added
+        next to pinned ones is not dropped before its caller uses it.
+        """
+        evicted = []
+        for key, entry in list(self._data.items()):
+            if not self._expired(entry, now):
+                break
+            if self._evictable(key, entry):
+                evicted.append((key, self._data.pop(key)[0]))
+        if len(self._data) > self.max_entries:
+            for key, entry in list(self._data.items()):
+                if len(self._data) <= self.max_entries:
+                    break
+                if key != keep and self._evictable(key, entry):
+                    evicted.append((key, self._data.pop(key)[0]))
+        self.evictions += len(evicted)
+        return evicted
+
+    def _run_hooks(self, evicted):
+        for key, value in evicted:
+            logger.info(f"♻️ Evicted {key} from {self.name} cache.")
+            if self.on_evict:
+                try:
+                    self.on_evict(key, value)
+                except Exception as e:
+                    logger.error(f"Eviction hook failed for {key} in {self.name} cache: {e}")
+
+    def __getitem__(self, key):
+        now = time.monotonic()
+        with self._lock:
+            evicted = self._collect(now, keep=key)
+            entry = self._data.get(key)
+            if entry is not None:
+                entry[1] = now
+                self._data.move_to_end(key)
+                self.hits += 1
+                value = entry[0]
+            elif self.factory is not None:
+                self.misses += 1
+                value = self.factory()
+                self._data[key] = [value, now]
+                evicted += self._collect(now, keep=key)
+            else:
+                self.misses += 1
+        self._run_hooks(evicted)
+        if entry is None and self.factory is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        if self.factory is not None and key not in self:
+            with self._lock:
+                self.misses += 1
+            return default
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            evicted = self._collect(time.monotonic(), keep=key)
+            found = key in self._data
+        self._run_hooks(evicted)
+        return found
+
+    def __setitem__(self, key, value):
+        now = time.monotonic()
+        with self._lock:
+            self._data[key] = [value, now]
+            self._data.move_to_end(key)
+            evicted = self._collect(now, keep=key)
+        self._run_hooks(evicted)
+
+    def __delitem__(self, key):
+        with self._lock:
+            del self._data[key]
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._data))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def sweep(self):
+        """Evict expired and over-limit entries now rather than on the next write."""
+        with self._lock:
+            evicted = self._collect(time.monotonic())
+        self._run_hooks(evicted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -7,7 +7,7 @@ from langchain_core.documents import Document
 from langchain_core.messages import SystemMessage, HumanMessage
 from sqlalchemy import text
 from .schemas import SQLQueryInput, ProjectSearchInput, NLQueryInput
-from .context import ProjectContext
+from .context import ProjectContext, current_project_context
 from .ppt_generation_agent import init_ppt_service, generate_ppt_tool
 from .db_manager import DBManager
 from .prompt import SQL_SCHEMA, SQL_AGENT_PROMPT
@@ -27,8 +27,14 @@ class AgentTools:
         self.recall_vector_store = recall_vector_store or self.db_manager.recall_vector_store
         self.users = self.db_manager.users
         self.engine = engine
-        self.project_content = project_content
+        self._default_project_content = project_content
         init_ppt_service(self.engine)     
+
+    @property
+    def project_content(self):
+        """Project context of the chat being answered, falling back to the instance's own."""
+        return current_project_context.get() or self._default_project_content
+
     # Memory tools
     def save_recall_memory(self, memory: str, user_id: str):
         """Save memory to vectorstore for later semantic retrieval."""
@@ -7,7 +7,7 @@ from django.db import close_old_connections
 from django.core.exceptions import ObjectDoesNotExist
 from channels.generic.websocket import AsyncWebsocketConsumer
 from chatbot.utils.websocket_authentication import JWTWebSocketAuth
-from api.ai_module import rag
+from api.ai_module import arag
 
 logger = logging.getLogger("api_logger")
 executor = ThreadPoolExecutor(max_workers=10)
@@ -240,11 +240,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
         try:
             user_role = UserRole(user.role).label
-            # Offload blocking rag() call to thread pool
-            loop = asyncio.get_running_loop()
-            response_data = await loop.run_in_executor(
-                executor, lambda: rag(user.id, message_text, user_role, session_id)
-            )
+            # arag() is natively async, so chats are not capped by the executor size
+            response_data = await arag(user.id, message_text, user_role, session_id)
 
             if isinstance(response_data, dict):
                 resp = response_data.get("response", {})
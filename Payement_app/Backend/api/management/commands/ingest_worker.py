@@ -0,0 +1,53 @@
+"""Run ingestion workers: python manage.py ingest_worker --workers 4"""
+
+import signal
+import logging
+import threading
+import multiprocessing
+from django import db
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.workers.ingestion_worker import requeue_stale_files, work
+
+logger = logging.getLogger("api_logger")
+
+
+def _worker_main(poll_interval):
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    signal.signal(signal.SIGINT, lambda *_: stopping.set())
+    work(poll_interval=poll_interval, stop=stopping.is_set)
+
+
+class Command(BaseCommand):
+    help = "Claim pending file uploads and run the ingestion pipeline in N worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=settings.INGESTION_WORKERS)
+        parser.add_argument("--poll-interval", type=float, default=settings.INGESTION_POLL_INTERVAL)
+
+    def handle(self, *args, **options):
+        requeue_stale_files()
+        workers = max(1, options["workers"])
+        if workers == 1:
+            _worker_main(options["poll_interval"])
+            return
+
+        # Children must not inherit the parent's open DB connections
+        db.connections.close_all()
+        processes = [
+            multiprocessing.Process(target=_worker_main, args=(options["poll_interval"],), daemon=False)
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        # SIGTERM asks each child to finish its current file and exit
+        signal.signal(signal.SIGTERM, lambda *_: [process.terminate() for process in processes])
+        self.stdout.write(f"Started {workers} ingestion workers.")
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            # Children received the same SIGINT and are finishing their current file
+            for process in processes:
+                process.join()
@@ -11,7 +11,11 @@ from .rag_model import (
     LangChainEmbedding,
     LangChainCollection,
     Client,
-    UserProfile
+    UserProfile,
+    SlidePolishCache,
+    ChunkEmbeddingCache,
+    ChunkSignature,
+    PipelineCheckpoint
 )
 from .session_model import Session
 from .message_model import Message
@@ -11,6 +11,7 @@ class Batch(models.Model):
     status          = models.IntegerField(choices=Status.choices, default=Status.PENDING)
     start_time      = models.DateTimeField()
     end_time        = models.DateTimeField(null=True, blank=True)
+    metrics         = models.JSONField(null=True, blank=True, help_text="Per-stage ingestion spans and totals")
     created_at      = models.DateTimeField(auto_now_add=True)
     updated_at      = models.DateTimeField(auto_now=True)
 
@@ -11,6 +11,7 @@ class FileImport(models.Model):
     type            = models.IntegerField(choices=FileType.choices, default=FileType.RFP)
     domain          = models.CharField(max_length=100, blank=True)
     client_name     = models.CharField(max_length=100, blank=True)
+    content_hash    = models.CharField(max_length=64, blank=True, db_index=True, help_text="SHA-256 of the uploaded file")
     status          = models.SmallIntegerField(choices=Status.choices, default=Status.PENDING)
     created_at      = models.DateTimeField(auto_now_add=True)
     updated_at      = models.DateTimeField(auto_now=True)
@@ -117,6 +117,63 @@ class LangChainEmbedding(models.Model):
         db_table = "langchain_pg_embedding"
 
 
+class SlidePolishCache(models.Model):
+    content_hash = models.CharField(primary_key=True, max_length=64)
+    polished_text = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return self.content_hash
+
+    class Meta:
+        db_table = "slide_polish_cache"
+
+
+class ChunkEmbeddingCache(models.Model):
+    content_hash = models.CharField(primary_key=True, max_length=64)
+    embedding = VectorField(dimensions=3072)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.content_hash
+
+    class Meta:
+        db_table = "chunk_embedding_cache"
+
+
+class ChunkSignature(models.Model):
+    embedding = models.OneToOneField(
+        LangChainEmbedding,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        db_column="embedding_id",
+        related_name="signature"
+    )
+    simhash = models.BigIntegerField()
+
+    def __str__(self):
+        return f"Signature of {self.embedding_id}"
+
+    class Meta:
+        db_table = "chunk_signature"
+
+
+class PipelineCheckpoint(models.Model):
+    file_hash = models.CharField(max_length=64)
+    stage = models.CharField(max_length=32)
+    stage_version = models.CharField(max_length=32)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.file_hash[:12]} {self.stage}"
+
+    class Meta:
+        db_table = "pipeline_checkpoint"
+        unique_together = ("file_hash", "stage")
+
+
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="profile")
     tone_score = models.JSONField()  # e.g., {"style": "formal"}
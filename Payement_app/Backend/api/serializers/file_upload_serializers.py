@@ -3,6 +3,7 @@ from api.models import FileImport, FileTechnology
 from api.models.enums import FileType
 from datetime import datetime
 import logging
+import hashlib
 import os
 from api.functions import server_file_path
 from chatbot.utils.messages.error_messages import FILE_ERROR_MESSAGES
@@ -75,8 +76,10 @@ class FileUploadSerializer(serializers.ModelSerializer):
         relative_path = f"uploads/files/{new_filename}"
         full_path = os.path.join(server_file_path, "media", relative_path)
         os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        digest = hashlib.sha256()
         with open(full_path, "wb+") as destination:
             for chunk in upload_file.chunks():
+                digest.update(chunk)
                 destination.write(chunk)
 
         # Save main FileImport record
@@ -85,6 +88,7 @@ class FileUploadSerializer(serializers.ModelSerializer):
             name=upload_file.name,
             path=relative_path,
             size=upload_file.size,
+            content_hash=digest.hexdigest(),
             **validated_data
         )
 
@@ -1,4 +1,5 @@
 import os
+import hashlib
 from datetime import timedelta
 from django.conf import settings
 from django.urls import reverse
@@ -64,6 +65,24 @@ class FileViewTestCase(APITestCase):
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.data["message"], FILE_SUCCESS_MESSAGES["file_uploaded"])
 
+    def test_upload_stores_content_hash(self):
+        """Should store the SHA-256 of the uploaded content"""
+        file = SimpleUploadedFile("hashed.ppt", b"dummy content", content_type="application/vnd.ms-powerpoint")
+        response = self.client.post(
+            self.url,
+            {
+                "file": file,
+                "type": "rpf",
+                "domain": "Tech",
+                "technology": "Django",
+                "client_name": "Acme",
+            },
+            format="multipart"
+        )
+        self.assertEqual(response.status_code, 201)
+        file_obj = FileImport.objects.get(id=response.data["file_id"])
+        self.assertEqual(file_obj.content_hash, hashlib.sha256(b"dummy content").hexdigest())
+
     def test_list_uploaded_files(self):
         """Should list uploaded files"""
         FileImport.objects.create(user=self.user, name="sample1.ppt", path="uploads/sample1.ppt")
@@ -0,0 +1,122 @@
+"""Test suite for the DB-backed ingestion queue worker"""
+
+import os
+from datetime import timedelta
+from unittest.mock import patch
+from django.test import TestCase
+from django.utils import timezone
+from django.contrib.auth.hashers import make_password
+from api.models import User, FileImport, Batch
+from api.models.enums import Status
+from api.workers.ingestion_worker import claim_next_file, run_batch, renew_lease, requeue_stale_files, work
+
+
+class IngestionWorkerTestCase(TestCase):
+    """Test claiming pending uploads and moving them through statuses"""
+
+    def setUp(self):
+        self.user = User.objects.create(
+            email="ingestuser@gmail.com",
+            password=make_password(os.getenv("PASSWORD", "Password@123")),
+            name="ingest tester",
+        )
+        self.first = FileImport.objects.create(user=self.user, name="first.pptx", path="uploads/files/first.pptx")
+        self.second = FileImport.objects.create(user=self.user, name="second.pptx", path="uploads/files/second.pptx")
+
+    def test_claim_oldest_pending_file(self):
+        """Should claim the oldest pending file and open a batch for it"""
+        batch = claim_next_file("test-host")
+        self.first.refresh_from_db()
+        self.assertEqual(batch.file_id, self.first.id)
+        self.assertEqual(batch.host, "test-host")
+        self.assertEqual(batch.status, Status.IN_PROGRESS)
+        self.assertIsNotNone(batch.start_time)
+        self.assertEqual(self.first.status, Status.IN_PROGRESS)
+
+    def test_claim_skips_claimed_files(self):
+        """Should not hand the same file out twice"""
+        self.assertEqual(claim_next_file().file_id, self.first.id)
+        self.assertEqual(claim_next_file().file_id, self.second.id)
+        self.assertIsNone(claim_next_file())
+
+    @patch("api.workers.ingestion_worker._run_pipeline")
+    def test_run_batch_success(self, run_pipeline):
+        """Should mark the file and batch completed"""
+        batch = claim_next_file()
+        self.assertEqual(run_batch(batch), Status.COMPLETED)
+        batch.refresh_from_db()
+        self.first.refresh_from_db()
+        self.assertEqual(batch.status, Status.COMPLETED)
+        self.assertIsNotNone(batch.end_time)
+        self.assertEqual(self.first.status, Status.COMPLETED)
+        self.assertEqual(batch.metrics["trace_id"], f"batch-{batch.id}")
+        run_pipeline.assert_called_once_with(self.first)
+
+    @patch("api.workers.ingestion_worker._run_pipeline", side_effect=RuntimeError("quota"))
+    def test_run_batch_failure(self, run_pipeline):
+        """Should mark the file and batch failed when the pipeline raises"""
+        batch = claim_next_file()
+        self.assertEqual(run_batch(batch), Status.FAILED)
+        batch.refresh_from_db()
+        self.first.refresh_from_db()
+        self.assertEqual(batch.status, Status.FAILED)
+        self.assertEqual(self.first.status, Status.FAILED)
+
+    @patch("api.workers.ingestion_worker._run_pipeline")
+    def test_work_drains_queue(self, run_pipeline):
+        """Should process every pending file and stop when max_jobs is set"""
+        self.assertEqual(work(poll_interval=0, max_jobs=5), 2)
+        self.assertEqual(run_pipeline.call_count, 2)
+        self.assertEqual(Batch.objects.filter(status=Status.COMPLETED).count(), 2)
+
+    def test_requeue_stale_files(self):
+        """Should return files from crashed workers to the queue"""
+        batch = claim_next_file()
+        Batch.objects.filter(id=batch.id).update(updated_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(requeue_stale_files(stale_minutes=60), 1)
+        self.first.refresh_from_db()
+        batch.refresh_from_db()
+        self.assertEqual(self.first.status, Status.PENDING)
+        self.assertEqual(batch.status, Status.FAILED)
+
+    def test_requeue_keeps_long_running_files_with_a_live_lease(self):
+        """Should leave a file alone while its worker keeps renewing the lease"""
+        batch = claim_next_file()
+        Batch.objects.filter(id=batch.id).update(
+            start_time=timezone.now() - timedelta(hours=2), updated_at=timezone.now() - timedelta(hours=2)
+        )
+        self.assertTrue(renew_lease(batch.id))
+        self.assertEqual(requeue_stale_files(stale_minutes=60), 0)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.status, Status.IN_PROGRESS)
+
+    def test_renew_lease_stops_after_batch_finishes(self):
+        """Should not touch a batch that is no longer in progress"""
+        batch = claim_next_file()
+        Batch.objects.filter(id=batch.id).update(status=Status.FAILED)
+        self.assertFalse(renew_lease(batch.id))
+
+    @patch("api.workers.ingestion_worker._run_pipeline")
+    def test_run_batch_skips_ingested_duplicate(self, run_pipeline):
+        """Should complete a re-upload of an ingested file without running the pipeline"""
+        FileImport.objects.filter(id=self.first.id).update(content_hash="a" * 64, status=Status.COMPLETED)
+        FileImport.objects.filter(id=self.second.id).update(content_hash="a" * 64)
+        batch = claim_next_file()
+        self.assertEqual(batch.file_id, self.second.id)
+        self.assertEqual(run_batch(batch), Status.COMPLETED)
+        run_pipeline.assert_not_called()
+
+    def test_claim_holds_back_copies_in_progress(self):
+        """Should not claim a copy of a file another worker is ingesting"""
+        FileImport.objects.filter(id__in=[self.first.id, self.second.id]).update(content_hash="b" * 64)
+        self.assertEqual(claim_next_file().file_id, self.first.id)
+        self.assertIsNone(claim_next_file())
+
+    @patch("api.workers.ingestion_worker._lock_content_hash", return_value=False)
+    def test_claim_skips_copies_locked_by_another_worker(self, lock_content_hash):
+        """Should move on to the next file when another worker holds the content hash lock"""
+        FileImport.objects.filter(id=self.first.id).update(content_hash="c" * 64)
+        self.assertEqual(claim_next_file().file_id, self.second.id)
+        lock_content_hash.assert_called_once_with("c" * 64)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.status, Status.PENDING)
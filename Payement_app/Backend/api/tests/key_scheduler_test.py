@@ -0,0 +1,86 @@
+"""Test suite for the Gemini API key scheduler"""
+
+import time
+import asyncio
+from django.test import SimpleTestCase
+from api.ai_module.enquiry_ai.key_scheduler import KeyScheduler, NoKeyAvailableError
+
+
+class KeySchedulerTestCase(SimpleTestCase):
+    """Test key choice by load and errors, cooldown waits and NoKeyAvailableError"""
+
+    def scheduler(self, keys=3, cooldown=5.0, max_wait=1.0, half_life=30.0):
+        return KeyScheduler(keys, default_cooldown=cooldown, max_wait=max_wait, error_half_life=half_life)
+
+    def test_spreads_concurrent_requests_over_keys(self):
+        """Should hand out the least loaded key"""
+        scheduler = self.scheduler()
+        self.assertEqual(sorted(scheduler.acquire() for _ in range(3)), [0, 1, 2])
+
+    def test_skips_keys_in_cooldown(self):
+        """Should not hand out a throttled key while others are ready"""
+        scheduler = self.scheduler(keys=2)
+        scheduler.throttle(0, 30)
+        for _ in range(3):
+            idx = scheduler.acquire()
+            scheduler.release(idx, error=False)
+            self.assertEqual(idx, 1)
+
+    def test_waits_out_short_cooldown(self):
+        """Should wait for the earliest cooldown when every key is throttled"""
+        scheduler = self.scheduler(keys=1)
+        scheduler.throttle(0, 0.05)
+        start = time.monotonic()
+        self.assertEqual(scheduler.acquire(), 0)
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+    def test_async_acquire_waits_out_short_cooldown(self):
+        """Should wait for the cooldown without blocking the event loop"""
+        scheduler = self.scheduler(keys=1)
+        scheduler.throttle(0, 0.05)
+        self.assertEqual(asyncio.run(scheduler.aacquire()), 0)
+
+    def test_raises_when_cooldown_exceeds_max_wait(self):
+        """Should raise NoKeyAvailableError rather than wait past max_wait"""
+        scheduler = self.scheduler(keys=2, max_wait=1)
+        scheduler.throttle(0)
+        scheduler.throttle(1, 10)
+        with self.assertRaises(NoKeyAvailableError):
+            scheduler.acquire()
+        with self.assertRaises(NoKeyAvailableError):
+            asyncio.run(scheduler.aacquire())
+
+    def test_raises_when_every_key_was_tried(self):
+        """Should raise NoKeyAvailableError once every key is excluded"""
+        scheduler = self.scheduler(keys=2)
+        with self.assertRaises(NoKeyAvailableError):
+            scheduler.acquire(exclude={0, 1})
+
+    def test_failed_key_still_takes_load(self):
+        """Should use a key that failed once as soon as the healthy keys are busy"""
+        scheduler = self.scheduler(keys=3)
+        scheduler.release(scheduler.acquire(exclude={1, 2}), error=True)
+        held = [scheduler.acquire() for _ in range(30)]
+        self.assertGreater(held.count(0), 0)
+        self.assertLess(held.count(0), held.count(1))
+
+    def test_errors_decay(self):
+        """Should rotate back to a failed key once its errors have faded"""
+        scheduler = self.scheduler(keys=2, half_life=0.01)
+        scheduler.release(scheduler.acquire(exclude={1}), error=True)
+        self.assertEqual(scheduler.stats()[1]["error_rate"], 0.5)
+        time.sleep(0.1)
+        used = set()
+        for _ in range(4):
+            idx = scheduler.acquire()
+            scheduler.release(idx, error=False)
+            used.add(idx)
+        self.assertEqual(used, {0, 1})
+
+    def test_request_errors_do_not_count(self):
+        """Should leave the error rate untouched when error is None"""
+        scheduler = self.scheduler(keys=1)
+        scheduler.release(scheduler.acquire(), error=None)
+        self.assertEqual(scheduler.stats()[1], {
+            "calls": 1, "throttled": 0, "in_flight": 0, "error_rate": 0.0, "cooldown_seconds": 0.0,
+        })
@@ -0,0 +1,157 @@
+"""Test suite for the bounded Enquiry AI runtime caches"""
+
+import asyncio
+from threading import Lock
+from unittest.mock import AsyncMock, MagicMock, patch
+from django.test import SimpleTestCase
+from api.ai_module.enquiry_ai.config import Config
+from api.ai_module.enquiry_ai.db_manager import DBManager
+from api.ai_module.enquiry_ai.runtime_cache import BoundedCache
+
+with patch.object(DBManager, "_initialize_db"), patch("api.ai_module.enquiry_ai.db_manager.GoogleGenerativeAIEmbeddings"):
+    from api.ai_module.enquiry_ai import main
+
+
+class BoundedCacheTestCase(SimpleTestCase):
+    """Test LRU and idle-TTL eviction, the can_evict veto and the eviction hook"""
+
+    def setUp(self):
+        self.evicted = []
+        self.now = 1000.0
+        clock = patch("api.ai_module.enquiry_ai.runtime_cache.time")
+        clock.start().monotonic.side_effect = lambda: self.now
+        self.addCleanup(clock.stop)
+
+    def cache(self, **kwargs):
+        kwargs.setdefault("on_evict", lambda key, value: self.evicted.append((key, value)))
+        return BoundedCache("test", **kwargs)
+
+    def test_evicts_least_recently_used_over_limit(self):
+        """Should drop the entry read least recently once max_entries is exceeded"""
+        cache = self.cache(max_entries=2, ttl_seconds=0)
+        cache["a"], cache["b"] = 1, 2
+        cache["a"]
+        cache["c"] = 3
+        self.assertEqual(sorted(cache), ["a", "c"])
+        self.assertEqual(self.evicted, [("b", 2)])
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_evicts_idle_entries_after_ttl(self):
+        """Should drop entries idle longer than ttl_seconds and keep recently read ones"""
+        cache = self.cache(max_entries=10, ttl_seconds=60)
+        cache["a"], cache["b"] = 1, 2
+        self.now += 45
+        cache["b"]
+        self.now += 30
+        cache.sweep()
+        self.assertEqual(list(cache), ["b"])
+        self.assertEqual(self.evicted, [("a", 1)])
+
+    def test_expired_entry_reads_as_missing(self):
+        """Should not return an expired entry"""
+        cache = self.cache(max_entries=10, ttl_seconds=60)
+        cache["a"] = 1
+        self.now += 61
+        self.assertNotIn("a", cache)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(self.evicted, [("a", 1)])
+
+    def test_can_evict_vetoes_held_locks(self):
+        """Should keep a held lock past the size limit and evict it once released"""
+        cache = self.cache(
+            max_entries=1, ttl_seconds=0, factory=Lock,
+            can_evict=lambda key, lock: not lock.locked(),
+        )
+        with cache["a"]:
+            cache["b"]
+            self.assertEqual(len(cache), 2)
+            self.assertIn("a", cache)
+        cache["c"]
+        self.assertNotIn("a", cache)
+        self.assertEqual([key for key, _ in self.evicted], ["b", "a"])
+
+    def test_factory_creates_missing_entries(self):
+        """Should create and keep an entry on first read, like defaultdict"""
+        cache = self.cache(max_entries=2, ttl_seconds=0, factory=list)
+        cache["a"].append(1)
+        self.assertEqual(cache["a"], [1])
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_failing_hook_does_not_break_the_cache(self):
+        """Should log eviction hook errors and carry on"""
+        def fail(key, value):
+            raise RuntimeError("write failed")
+        cache = self.cache(max_entries=1, ttl_seconds=0, on_evict=fail)
+        cache["a"], cache["b"] = 1, 2
+        self.assertEqual(list(cache), ["b"])
+
+
+class ProfileCacheTestCase(SimpleTestCase):
+    """Test that DBManager writes evicted profiles back to the database"""
+
+    @patch.object(DBManager, "_initialize_db")
+    @patch("api.ai_module.enquiry_ai.db_manager.GoogleGenerativeAIEmbeddings")
+    @patch.object(Config, "AI_CACHE_MAX_USERS", 1)
+    def test_evicted_profile_is_flushed(self, embeddings, initialize_db):
+        """Should upsert a profile pushed out of the cache"""
+        with patch.object(DBManager, "_write_profile") as write_profile:
+            db_manager = DBManager()
+            first, second = {"role": "sales"}, {"role": "admin"}
+            db_manager.users["user-1"] = first
+            db_manager.users["user-2"] = second
+        write_profile.assert_called_once_with("user-1", first)
+        self.assertNotIn("user-1", db_manager.users)
+
+
+class InFlightEvictionTestCase(SimpleTestCase):
+    """Test that a request's thread history and AI instance survive cache pressure"""
+
+    def setUp(self):
+        for cache in (main._threads, main._ai_instances):
+            cache.clear()
+            self.addCleanup(cache.clear)
+            limit = patch.object(cache, "max_entries", 1)
+            limit.start()
+            self.addCleanup(limit.stop)
+        for name, value in (
+            ("db_manager", MagicMock(**{"_retrieve_messages.return_value": [], "_aretrieve_messages": AsyncMock(return_value=[])})),
+            ("set_log_filename", MagicMock()),
+            ("_create_new_ai_instance", MagicMock(side_effect=self.create_instance)),
+            ("_get_profile", MagicMock(side_effect=self.other_users_arrive)),
+            ("_stream_and_save_response", MagicMock(return_value=("hello", None, None))),
+        ):
+            patcher = patch.object(main, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def create_instance(self, user_id, thread_id, role, inside_lock=False):
+        instance = MagicMock(recent_queries=[], aanalyze_and_update_background=AsyncMock())
+        main._ai_instances[user_id][thread_id] = instance
+        return instance
+
+    def other_users_arrive(self, ai_instance, user_id):
+        """Fill both caches past their limit while the request is between steps."""
+        for other in ("user-2", "user-3"):
+            main._ensure_thread_and_ai_instance(other, "thread-1", None)
+        return {"role": "sales"}
+
+    def assert_released(self):
+        self.assertFalse(main._in_flight)
+        main._ensure_thread_and_ai_instance("user-4", "thread-1", None)
+        self.assertNotIn("user-1", main._threads)
+        self.assertNotIn("user-1", main._ai_instances)
+
+    def test_rag_keeps_its_entries_until_done(self):
+        """Should not evict the requesting user's thread mid-request, only after it"""
+        result = main.rag("user-1", "hi", thread_id="thread-1")
+        self.assertEqual(result["response"]["message"], "hello")
+        self.assertIn("user-1", main._threads)
+        self.assert_released()
+
+    def test_arag_keeps_its_entries_until_done(self):
+        """Should pin the entries across the awaits of the async path as well"""
+        with patch.object(main, "_astream_and_save_response", AsyncMock(return_value=("hello", None, None))):
+            result = asyncio.run(main.arag("user-1", "hi", thread_id="thread-1"))
+        self.assertEqual(result["response"]["message"], "hello")
+        self.assert_released()
@@ -0,0 +1,222 @@
+"""DB-backed ingestion queue: claims pending uploads and runs the Extract_Strore pipeline.
+
+FileImport rows in PENDING status form the queue. Workers claim one row at a
+time with SELECT ... FOR UPDATE SKIP LOCKED, so any number of workers on any
+number of hosts can poll the same table without double-processing a file.
+Copies of one file (same content_hash) are serialized with a transaction-level
+advisory lock on the hash, so two of them never run at the same time.
+A running batch holds a lease: its updated_at is refreshed by a heartbeat, and
+only batches whose lease has expired are treated as crashed and requeued.
+"""
+
+import os
+import sys
+import time
+import socket
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction, close_old_connections
+from django.utils import timezone
+from api.models import Batch, FileImport
+from api.models.enums import Status
+from api.functions import server_file_path
+
+logger = logging.getLogger("api_logger")
+
+
+def _add_ingestion_root():
+    """Make the Extract_Strore package, which lives outside the Django project, importable."""
+    if settings.INGESTION_ROOT not in sys.path:
+        sys.path.append(settings.INGESTION_ROOT)
+
+
+def _load_telemetry():
+    _add_ingestion_root()
+    from Extract_Strore import telemetry
+    return telemetry
+
+
+def _load_pipeline():
+    """Import the Extract_Strore pipeline."""
+    _add_ingestion_root()
+    from Extract_Strore.extract_main import IngestJob, ingest_file
+    return IngestJob, ingest_file
+
+
+def _lock_content_hash(content_hash):
+    """Take the transaction's advisory lock on a content hash if no copy is in progress.
+
+    Under READ COMMITTED two workers can each pick a different copy of one file
+    before either claim commits; only one of them gets the lock, and the other
+    re-checks after the first commits, so copies never run side by side.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_xact_lock(hashtext(%s))", [content_hash])
+        if not cursor.fetchone()[0]:
+            return False
+    return not FileImport.objects.filter(content_hash=content_hash, status=Status.IN_PROGRESS).exists()
+
+
+def claim_next_file(host=None):
+    """Claim the oldest pending upload and open a Batch for it, or return None."""
+    with transaction.atomic():
+        # Hold back copies of a file that another worker is ingesting right now
+        in_progress_hashes = (
+            FileImport.objects.filter(status=Status.IN_PROGRESS).exclude(content_hash="").values("content_hash")
+        )
+        candidates = (
+            FileImport.objects.select_for_update(skip_locked=True)
+            .filter(status=Status.PENDING)
+            .exclude(content_hash__in=in_progress_hashes)
+            .order_by("created_at", "id")
+        )
+        skipped = []
+        while True:
+            file_obj = candidates.exclude(id__in=skipped).first()
+            if not file_obj:
+                return None
+            if not file_obj.content_hash or _lock_content_hash(file_obj.content_hash):
+                break
+            skipped.append(file_obj.id)
+        file_obj.status = Status.IN_PROGRESS
+        file_obj.save(update_fields=["status", "updated_at"])
+        return Batch.objects.create(
+            user=file_obj.user,
+            host=host or socket.gethostname(),
+            file=file_obj,
+            status=Status.IN_PROGRESS,
+            start_time=timezone.now(),
+        )
+
+
+def find_ingested_duplicate(file_obj):
+    """Return an already ingested upload with the same content, if any."""
+    if not file_obj.content_hash:
+        return None
+    return (
+        FileImport.objects.filter(content_hash=file_obj.content_hash, status=Status.COMPLETED)
+        .exclude(id=file_obj.id)
+        .order_by("created_at", "id")
+        .first()
+    )
+
+
+def renew_lease(batch_id):
+    """Mark a running batch as alive; returns False once it is no longer in progress."""
+    return bool(Batch.objects.filter(id=batch_id, status=Status.IN_PROGRESS).update(updated_at=timezone.now()))
+
+
+@contextmanager
+def _heartbeat(batch_id, interval=None):
+    """Renew the batch's lease from a background thread while the block runs."""
+    interval = settings.INGESTION_HEARTBEAT_SECONDS if interval is None else interval
+    stopped = threading.Event()
+
+    def beat():
+        try:
+            while not stopped.wait(interval):
+                try:
+                    renew_lease(batch_id)
+                except Exception as e:
+                    logger.warning("Heartbeat failed for batch %s: %s", batch_id, e)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f"heartbeat-{batch_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def requeue_stale_files(stale_minutes=None):
+    """Return files whose worker stopped renewing its lease (crashed or killed) to the queue."""
+    cutoff = timezone.now() - timedelta(minutes=stale_minutes or settings.INGESTION_STALE_MINUTES)
+    with transaction.atomic():
+        stale = Batch.objects.select_for_update(skip_locked=True).filter(
+            status=Status.IN_PROGRESS, updated_at__lt=cutoff
+        )
+        file_ids = list(stale.values_list("file_id", flat=True))
+        if not file_ids:
+            return 0
+        stale.update(status=Status.FAILED, end_time=timezone.now())
+        count = FileImport.objects.filter(id__in=file_ids, status=Status.IN_PROGRESS).update(status=Status.PENDING)
+    logger.warning("Requeued %s stale ingestion jobs", count)
+    return count
+
+
+def _run_pipeline(file_obj):
+    """Parse, polish and insert one uploaded file; raises on failure."""
+    IngestJob, ingest_file = _load_pipeline()
+    file_path = os.path.join(server_file_path, "media", str(file_obj.path))
+    if not file_path.lower().endswith(".pptx"):
+        raise ValueError(f"Unsupported file for ingestion: {file_obj.name}")
+
+    # Retries of a failed file resume from the last completed stage
+    ingest_file(IngestJob(
+        file_path=file_path,
+        project_name=file_obj.name,
+        file_type=file_obj.get_type_display(),
+        domain=file_obj.domain,
+        technology=[tech.technology_name for tech in file_obj.technologies.all()],
+        client_name=file_obj.client_name,
+        file_hash=file_obj.content_hash or None,
+    ))
+
+
+def run_batch(batch):
+    """Run the pipeline for a claimed batch and record the outcome."""
+    file_obj = batch.file
+    logger.info("Ingesting file %s (batch %s) on %s", file_obj.id, batch.id, batch.host)
+    telemetry = _load_telemetry()
+    with telemetry.trace(str(file_obj.path), f"batch-{batch.id}") as trace:
+        try:
+            duplicate = find_ingested_duplicate(file_obj)
+            if duplicate:
+                logger.info("File %s has the same content as ingested file %s; skipping pipeline", file_obj.id, duplicate.id)
+            else:
+                with _heartbeat(batch.id):
+                    _run_pipeline(file_obj)
+            status = Status.COMPLETED
+            logger.info("Ingested file %s", file_obj.id)
+        except Exception as e:
+            status = Status.FAILED
+            logger.error("Ingestion failed for file %s: %s", file_obj.id, e, exc_info=True)
+        finally:
+            close_old_connections()
+
+    file_obj.status = status
+    file_obj.save(update_fields=["status", "updated_at"])
+    batch.status = status
+    batch.end_time = timezone.now()
+    update_fields = ["status", "end_time", "updated_at"]
+    if settings.INGESTION_PERSIST_METRICS:
+        batch.metrics = trace.summary()
+        update_fields.append("metrics")
+    batch.save(update_fields=update_fields)
+    return status
+
+
+def work(poll_interval=None, max_jobs=None, stop=None):
+    """Claim and process files until ``max_jobs`` is reached or ``stop()`` is true."""
+    poll_interval = settings.INGESTION_POLL_INTERVAL if poll_interval is None else poll_interval
+    host = f"{socket.gethostname()}:{os.getpid()}"
+    processed = 0
+    logger.info("Ingestion worker %s started", host)
+    while not (stop and stop()) and (max_jobs is None or processed < max_jobs):
+        close_old_connections()
+        batch = claim_next_file(host)
+        if batch is None:
+            if max_jobs is not None:
+                break
+            time.sleep(poll_interval)
+            continue
+        run_batch(batch)
+        processed += 1
+    logger.info("Ingestion worker %s stopped after %s jobs", host, processed)
+    return processed
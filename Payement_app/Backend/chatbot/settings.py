@@ -226,6 +226,16 @@ LOGGING = {
 
 
 
+# Ingestion workers
+# Root holding the Extract_Strore package, config.py and log.py
+INGESTION_ROOT = os.getenv("INGESTION_ROOT", str(BASE_DIR.parent))
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", 2))
+INGESTION_POLL_INTERVAL = float(os.getenv("INGESTION_POLL_INTERVAL", 5))
+# A running batch refreshes its lease every HEARTBEAT seconds; one silent for STALE minutes is requeued
+INGESTION_HEARTBEAT_SECONDS = float(os.getenv("INGESTION_HEARTBEAT_SECONDS", 60))
+INGESTION_STALE_MINUTES = int(os.getenv("INGESTION_STALE_MINUTES", 10))
+INGESTION_PERSIST_METRICS = os.getenv("INGESTION_PERSIST_METRICS", "true").lower() == "true"
+
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.getenv("MEDIA_ROOT")
 
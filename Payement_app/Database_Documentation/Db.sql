@@ -66,10 +66,12 @@ CREATE TABLE  file_import (
     type INT DEFAULT 0,          -- FileType enum
     domain VARCHAR(100),
     client_name VARCHAR(100),
+    content_hash VARCHAR(64) DEFAULT '',  -- SHA-256 of the uploaded file
     status SMALLINT DEFAULT 0,        -- Status enum
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+CREATE INDEX idx_file_import_content_hash ON file_import (content_hash);
 
 -- Batch
 CREATE TABLE  batch (
@@ -80,6 +82,7 @@ CREATE TABLE  batch (
     status SMALLINT DEFAULT 0,        -- Status enum
     start_time TIMESTAMP NOT NULL,
     end_time TIMESTAMP NOT NULL,
+    metrics JSONB,                    -- per-stage ingestion spans and totals
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -166,5 +169,35 @@ CREATE TABLE file_technology (
     CONSTRAINT unique_file_technology UNIQUE (file_id, technology_name)  -- unique constraint
 );
 
+-- Polished Slide Cache
+CREATE TABLE slide_polish_cache (
+    content_hash VARCHAR(64) PRIMARY KEY,                          -- sha256 of prompt version + merged slide text
+    polished_text TEXT NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    last_used_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_slide_polish_cache_last_used_at ON slide_polish_cache (last_used_at);
 
+-- Chunk Embedding Cache
+CREATE TABLE chunk_embedding_cache (
+    content_hash VARCHAR(64) PRIMARY KEY,                          -- sha256 of embedding model + chunk text
+    embedding VECTOR(3072) NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
 
+-- Pipeline Checkpoints
+CREATE TABLE pipeline_checkpoint (
+    id integer GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    file_hash VARCHAR(64) NOT NULL,                                -- sha256 of the source file
+    stage VARCHAR(32) NOT NULL,                                    -- parse, polish, metadata
+    stage_version VARCHAR(32) NOT NULL,
+    payload JSONB NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT unique_pipeline_checkpoint UNIQUE (file_hash, stage)
+);
+
+-- Chunk Signatures (near-duplicate index)
+CREATE TABLE chunk_signature (
+    embedding_id VARCHAR PRIMARY KEY REFERENCES langchain_pg_embedding(id) ON DELETE CASCADE,
+    simhash BIGINT NOT NULL                                        -- 64-bit SimHash of the chunk text, compared with bit_count (PostgreSQL 14+)
+);
@@ -0,0 +1,113 @@
+"""One-off cleanup of vector store chunks written before chunks carried a project_id.
+
+Usage:
+    python -m Extract_Strore.backfill_legacy_chunks
+    python -m Extract_Strore.backfill_legacy_chunks --apply [--force] [--report report.csv]
+
+Chunks from the original pipeline only record slide_number and chunk_id, so
+no re-ingest can attribute them to a deck and they stay behind as
+duplicates. Without --apply the legacy chunks and stored documents are only
+counted. --apply re-ingests every stored document whose file is still on
+disk through the bulk runner, which writes attributed chunks, and then
+deletes the unattributed ones. Nothing is deleted if a document is missing
+or fails to re-ingest, unless --force is given.
+"""
+
+import os
+import argparse
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import delete, func, not_, select
+from config import Config
+from log import set_log_filename, logger
+from .db_utils import create_session
+from .db_schema import clients, documents, domains, langchain_embeddings, project_domains, project_technologies, projects, technology
+from .insert_file import collection_name, get_or_create_collection
+from .bulk_ingest import IngestJob, run_bulk, write_report
+
+
+def _legacy_chunks(collection_id):
+    return (
+        langchain_embeddings.c.collection_id == collection_id,
+        not_(langchain_embeddings.c.cmetadata.has_key("project_id")),
+    )
+
+
+def count_legacy_chunks(session, collection_id) -> int:
+    return session.execute(select(func.count()).select_from(langchain_embeddings).where(*_legacy_chunks(collection_id))).scalar_one()
+
+
+def purge_legacy_chunks(session, collection_id) -> int:
+    """Delete every chunk of the collection that carries no project_id."""
+    return session.execute(delete(langchain_embeddings).where(*_legacy_chunks(collection_id))).rowcount
+
+
+def jobs_from_documents(session) -> tuple[list[IngestJob], list[str]]:
+    """One job per stored document with its project's metadata, plus the paths missing on disk."""
+    names = defaultdict(lambda: defaultdict(list))
+    for kind, link, table, column in (
+        ("domain", project_domains, domains, project_domains.c.domain_id),
+        ("technology", project_technologies, technology, project_technologies.c.technology_id),
+    ):
+        for project_id, name in session.execute(select(link.c.project_id, table.c.name).join(table, table.c.id == column)):
+            names[project_id][kind].append(name)
+
+    jobs, missing = [], []
+    rows = session.execute(
+        select(documents.c.file_path, documents.c.type, projects.c.id, projects.c.name, clients.c.name.label("client_name"))
+        .join(projects, projects.c.id == documents.c.project_id)
+        .outerjoin(clients, clients.c.id == projects.c.client_id)
+        .order_by(documents.c.id)
+    )
+    for row in rows:
+        if not row.file_path or not os.path.exists(row.file_path):
+            missing.append(row.file_path or "")
+            continue
+        project_names = names[row.id]
+        jobs.append(IngestJob(
+            file_path=row.file_path,
+            project_name=row.name,
+            file_type=row.type or "",
+            domain=(project_names["domain"] or [""])[0],
+            technology=project_names["technology"],
+            client_name=row.client_name or "",
+        ))
+    return jobs, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-ingest stored decks and delete unattributed legacy chunks.")
+    parser.add_argument("--apply", action="store_true", help="Re-ingest and delete; otherwise only report counts")
+    parser.add_argument("--force", action="store_true", help="Delete legacy chunks even if some documents were not re-ingested")
+    parser.add_argument("--report", default=f"legacy_backfill_report_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.csv")
+    parser.add_argument("--parse-workers", type=int, default=Config.BULK_PARSE_WORKERS)
+    parser.add_argument("--llm-workers", type=int, default=Config.BULK_LLM_WORKERS)
+    parser.add_argument("--insert-workers", type=int, default=Config.BULK_INSERT_WORKERS)
+    args = parser.parse_args()
+
+    set_log_filename("legacy_backfill")
+    with create_session() as session:
+        collection_id = get_or_create_collection(session, collection_name)
+        legacy = count_legacy_chunks(session, collection_id)
+        jobs, missing = jobs_from_documents(session)
+        session.commit()
+    logger.info(f"{legacy} legacy chunks; {len(jobs)} documents to re-ingest, {len(missing)} missing on disk.")
+    for path in missing:
+        logger.warning(f"Document file missing, cannot re-ingest: {path!r}")
+    if not args.apply or not legacy:
+        return
+
+    results = run_bulk(jobs, args.parse_workers, args.llm_workers, args.insert_workers)
+    write_report(results, args.report)
+    failed = [r["file_path"] for r in results if r["status"] != "success"]
+    if (failed or missing) and not args.force:
+        logger.error(f"{len(failed)} re-ingests failed and {len(missing)} files are missing; legacy chunks kept (use --force).")
+        return
+    with create_session() as session:
+        deleted = purge_legacy_chunks(session, collection_id)
+        session.commit()
+    logger.info(f"Deleted {deleted} legacy chunks.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Timing benchmark: SlideChunker vs LangChain's RecursiveCharacterTextSplitter.
+
+Usage:
+    python -m Extract_Strore.benchmarks.chunker_benchmark [slides.json ...] [--from-cache N] [--repeat N]
+
+The corpus is, in order of preference: up to N polished slides from the
+slide_polish_cache table, slide JSON files written by save_slides_json, or
+a synthetic set of polished-looking slides.
+"""
+
+import json
+import time
+import argparse
+from statistics import mean
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from Extract_Strore.text_chunker import SlideChunker, estimate_tokens
+
+
+def _synthetic_corpus(count=400):
+    return [
+        "\n".join(
+            [f"## Slide {n}: Delivery Phase {n % 7}"]
+            + [f"- Milestone {m}: integrate payment gateway, notifications and reporting for region {n}" for m in range(8)]
+            + ["**Technology Stack:**"]
+            + [f"- Service {m}: Django REST API, PostgreSQL, Redis and Celery workers on AWS" for m in range(6)]
+        )
+        for n in range(count)
+    ]
+
+
+def _json_corpus(paths):
+    from Extract_Strore.chunking import _merge_slide_text
+    texts = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            texts.extend(_merge_slide_text(slide) for slide in json.load(f))
+    return texts
+
+
+def _cache_corpus(limit):
+    from sqlalchemy import select
+    from Extract_Strore.db_utils import create_session
+    from Extract_Strore.db_schema import slide_polish_cache
+    with create_session() as session:
+        return session.execute(select(slide_polish_cache.c.polished_text).limit(limit)).scalars().all()
+
+
+def _measure(split, texts, repeat):
+    best, chunks = float("inf"), []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = [chunk for text in texts for chunk in split(text)]
+        best = min(best, time.perf_counter() - start)
+    return best, chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("slides_json", nargs="*")
+    parser.add_argument("--from-cache", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.from_cache:
+        texts = _cache_corpus(args.from_cache)
+    elif args.slides_json:
+        texts = _json_corpus(args.slides_json)
+    else:
+        texts = _synthetic_corpus()
+
+    splitters = {
+        "recursive splitter": RecursiveCharacterTextSplitter(
+            chunk_size=1000, chunk_overlap=200, separators=["\n\n", "\n", " "]
+        ).split_text,
+        "slide chunker": SlideChunker().split_text,
+    }
+    print(f"corpus: {len(texts)} slides, {sum(map(len, texts)) / 1024:.0f} KiB")
+    baseline = None
+    for name, split in splitters.items():
+        seconds, chunks = _measure(split, texts, args.repeat)
+        baseline = baseline or seconds
+        print(
+            f"  {name:<18}: {seconds * 1000:8.1f} ms  {len(chunks):6d} chunks  "
+            f"avg {mean(estimate_tokens(c) for c in chunks) if chunks else 0:6.1f} tokens  "
+            f"speedup {baseline / seconds:5.2f}x"
+        )
+    chunker = SlideChunker()
+    deterministic = all(chunker.split_text(t) == chunker.split_text(t) for t in texts)
+    print(f"  deterministic      : {'ok' if deterministic else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
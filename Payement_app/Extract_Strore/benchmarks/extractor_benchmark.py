@@ -0,0 +1,59 @@
+"""Timing benchmark: streaming PPTX extractor vs the python-pptx object walk.
+
+Usage:
+    python -m Extract_Strore.benchmarks.extractor_benchmark [deck.pptx ...] [--slides N] [--repeat N]
+
+Without deck paths a synthetic deck is generated.
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import tracemalloc
+from Extract_Strore.extractor import parse_pptx, iter_pptx_slides
+from Extract_Strore.tests.extractor_test import build_deck
+
+
+def _measure(fn, path, repeat):
+    best, peak = float("inf"), 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        fn(path)
+        best = min(best, time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("decks", nargs="*")
+    parser.add_argument("--slides", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    decks, generated = args.decks, None
+    if not decks:
+        handle, generated = tempfile.mkstemp(suffix=".pptx")
+        os.close(handle)
+        build_deck(generated, args.slides)
+        decks = [generated]
+
+    try:
+        for deck in decks:
+            walk_time, walk_peak = _measure(parse_pptx, deck, args.repeat)
+            stream_time, stream_peak = _measure(lambda p: list(iter_pptx_slides(p)), deck, args.repeat)
+            same = list(iter_pptx_slides(deck)) == parse_pptx(deck)
+            print(f"{os.path.basename(deck)}: parity={'ok' if same else 'MISMATCH'}")
+            print(f"  python-pptx walk : {walk_time * 1000:8.1f} ms  peak {walk_peak / 1024:8.0f} KiB")
+            print(f"  streaming        : {stream_time * 1000:8.1f} ms  peak {stream_peak / 1024:8.0f} KiB")
+            print(f"  speedup          : {walk_time / stream_time:8.2f}x")
+    finally:
+        if generated:
+            os.remove(generated)
+
+
+if __name__ == "__main__":
+    main()
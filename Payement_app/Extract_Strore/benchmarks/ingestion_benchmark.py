@@ -0,0 +1,242 @@
+"""Offline throughput benchmark for the ingestion pipeline.
+
+Usage:
+    python -m Extract_Strore.benchmarks.ingestion_benchmark [--files N] [--slides N] [--tables N]
+        [--bullets N] [--words N] [--llm-latency S] [--llm-429-rate P]
+        [--embed-latency S] [--embed-429-rate P] [--no-db] [--with-caches]
+
+Synthetic decks are generated into a temporary directory and run through
+the bulk runner with Gemini chat and embedding calls replaced by seeded
+fakes, so no network access or real API keys are needed (placeholder keys
+are set before the pipeline is imported). By default chunks are
+written to the Postgres/pgvector database from config; --no-db stops after
+embedding instead. Per-stage p50/p95 come from the telemetry spans.
+"""
+
+import os
+
+# The pipeline builds its Gemini clients at import, which fails without keys;
+# the benchmark never calls them, so placeholders are enough.
+for _n in (1, 2, 3):
+    os.environ.setdefault(f"GOOGLE_API_KEY_{_n}", f"fake-key-{_n}")
+
+import re
+import json
+import time
+import random
+import hashlib
+import argparse
+import tempfile
+import threading
+from statistics import quantiles
+from unittest import mock
+import numpy as np
+from pptx import Presentation
+from pptx.util import Inches, Pt
+from langchain_core.messages import AIMessage
+from langchain_core.embeddings import Embeddings
+from google.api_core.exceptions import ResourceExhausted
+from config import Config
+from Extract_Strore import bulk_ingest, chunking, extract_main, insert_file, telemetry
+from Extract_Strore.key_pool import KeyStats
+
+WORDS = (
+    "platform booking payment analytics dashboard integration mobile cloud migration workflow "
+    "reporting notification inventory customer portal api security compliance automation "
+    "python django react postgresql kubernetes microservices scalability latency onboarding"
+).split()
+
+
+def build_synthetic_deck(path, slides=20, tables=1, bullets=6, words=12, seed=0):
+    """Write a deck of one title slide plus ``slides`` content slides with bullets and tables."""
+    rng = random.Random(seed)
+    prs = Presentation()
+    layout = prs.slide_layouts[6]
+
+    def sentence():
+        return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+    for n in range(slides + 1):
+        slide = prs.slides.add_slide(layout)
+        title = slide.shapes.add_textbox(Inches(0.5), Inches(0.3), Inches(9), Inches(1)).text_frame.paragraphs[0]
+        run = title.add_run()
+        run.text = f"Synthetic Project {seed}" if n == 0 else f"Section {n}: {sentence()[:40]}"
+        run.font.size = Pt(40)
+        body = slide.shapes.add_textbox(Inches(0.5), Inches(1.5), Inches(9), Inches(3)).text_frame
+        body.text = sentence()
+        for _ in range(bullets - 1):
+            body.add_paragraph().text = sentence()
+        for t in range(tables):
+            table = slide.shapes.add_table(3, 3, Inches(0.5), Inches(4.5 + t * 0.2), Inches(6), Inches(1)).table
+            for r in range(3):
+                for c in range(3):
+                    table.cell(r, c).text = rng.choice(WORDS)
+    prs.save(path)
+
+
+class _FaultInjector:
+    """Seeded latency and 429 injection shared by the fakes."""
+
+    def __init__(self, latency, rate_429, seed):
+        self.latency = latency
+        self.rate_429 = rate_429
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.throttled = 0
+
+    def hit(self):
+        with self._lock:
+            self.calls += 1
+            throttle = self._rng.random() < self.rate_429
+            self.throttled += throttle
+        time.sleep(self.latency)
+        return throttle
+
+
+class FakeChatModel:
+    """Stands in for ChatGoogleGenerativeAI.invoke with canned, well-formed replies."""
+
+    def __init__(self, faults: _FaultInjector):
+        self.faults = faults
+
+    def invoke(self, prompt):
+        if self.faults.hit():
+            raise ResourceExhausted("429 Resource exhausted. Please retry in 0.05s.")
+        system = str(getattr(prompt[0], "content", "")) if not isinstance(prompt, str) else ""
+        human = str(getattr(prompt[-1], "content", prompt)) if not isinstance(prompt, str) else prompt
+        if '"slide_number"' in system:
+            slides = json.loads(human)
+            return AIMessage(content=json.dumps({s["slide_number"]: s["content"] for s in slides}))
+        if "client_name, project_name, domain, technology" in system + human:
+            project = re.search(r"Synthetic Project \d+", human)
+            return AIMessage(content=json.dumps({
+                "client_name": "synthetic client",
+                "project_name": (project.group(0) if project else "synthetic project").lower(),
+                "domain": "information technology",
+                "technology": ["python", "django"],
+                "file_type": "case study",
+            }))
+        if "Normalize the following domain" in human:
+            return AIMessage(content=json.dumps({"domain": {}, "technology": {}}))
+        return AIMessage(content=human[:2000])
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic 3072-d vectors; 429s are retried internally like the real client."""
+
+    model = "fake-embedding"
+
+    def __init__(self, faults: _FaultInjector, dimensions=3072):
+        self.faults = faults
+        self.dimensions = dimensions
+
+    def _vector(self, text):
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:4], "big")
+        vector = np.random.default_rng(seed).standard_normal(self.dimensions)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts):
+        while self.faults.hit():
+            time.sleep(0.05)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def _embed_only(metadata, polished_docs, file_path, summary):
+    """--no-db stand-in for insert_file_record_full: embeds the chunks and stops."""
+    with telemetry.span("insert"), telemetry.span("embed"):
+        insert_file.cached_embedding_model.embed_documents([doc.page_content for doc in polished_docs])
+
+
+def _percentiles(values):
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return value, value
+    cuts = quantiles(values, n=100, method="inclusive")
+    return cuts[49], cuts[94]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--slides", type=int, default=30)
+    parser.add_argument("--tables", type=int, default=1)
+    parser.add_argument("--bullets", type=int, default=6)
+    parser.add_argument("--words", type=int, default=12)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--llm-429-rate", type=float, default=0.05)
+    parser.add_argument("--embed-latency", type=float, default=0.1)
+    parser.add_argument("--embed-429-rate", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-db", action="store_true", help="Skip the database; stop after embedding")
+    parser.add_argument("--with-caches", action="store_true", help="Keep polish/embedding caches and checkpoints on")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="ingestion_benchmark_")
+    spans_file = os.path.join(workdir, "spans.jsonl")
+    for n in range(args.files):
+        build_synthetic_deck(
+            os.path.join(workdir, f"synthetic_{n:03d}.pptx"),
+            args.slides, args.tables, args.bullets, args.words, seed=args.seed + n,
+        )
+
+    llm_faults = _FaultInjector(args.llm_latency, args.llm_429_rate, args.seed)
+    embed_faults = _FaultInjector(args.embed_latency, args.embed_429_rate, args.seed + 1)
+    fake_chat = FakeChatModel(llm_faults)
+    overrides = {"TELEMETRY_ENABLED": True, "TELEMETRY_FILE": spans_file}
+    if not args.with_caches or args.no_db:
+        overrides.update(POLISH_CACHE_ENABLED=False, EMBED_CACHE_ENABLED=False, PIPELINE_CHECKPOINTS=False)
+    if args.no_db:
+        overrides.update(CANONICAL_REFRESH_SECONDS=float("inf"))
+
+    fake_keys = ["fake-key-1", "fake-key-2", "fake-key-3"]
+    patches = [mock.patch.object(Config, name, value) for name, value in overrides.items()]
+    patches += [
+        mock.patch.object(chunking.key_pool, "api_keys", fake_keys),
+        mock.patch.object(chunking.key_pool, "_stats", {key: KeyStats() for key in fake_keys}),
+        mock.patch.object(chunking.key_pool, "client", lambda key: fake_chat),
+        mock.patch.object(insert_file.cached_embedding_model, "embedding_model", FakeEmbeddings(embed_faults)),
+        mock.patch.object(insert_file.cached_embedding_model, "model_name", FakeEmbeddings.model),
+        mock.patch("Extract_Strore.extract_main.save_slides_json"),
+    ]
+    if args.no_db:
+        patches.append(mock.patch.object(extract_main, "insert_file_record_full", _embed_only))
+    for patch in patches:
+        patch.start()
+
+    try:
+        jobs = bulk_ingest.jobs_from_directory(workdir)
+        start = time.perf_counter()
+        results = bulk_ingest.run_bulk(jobs)
+        elapsed = time.perf_counter() - start
+    finally:
+        for patch in reversed(patches):
+            patch.stop()
+
+    with open(spans_file, encoding="utf-8") as f:
+        spans = [json.loads(line) for line in f]
+    succeeded = sum(r["status"] == "success" for r in results)
+    print(f"files: {succeeded}/{len(results)} succeeded in {elapsed:.1f}s "
+          f"({succeeded / elapsed * 60:.1f} files/min)")
+    print(f"llm: {llm_faults.calls} calls, {llm_faults.throttled} throttled; "
+          f"embeddings: {embed_faults.calls} calls, {embed_faults.throttled} throttled")
+    print(f"{'stage':<10} {'count':>6} {'p50 s':>8} {'p95 s':>8} {'llm':>6} {'rows':>6}")
+    for stage in ("parse", "polish", "summarize", "metadata", "insert", "embed"):
+        stage_spans = [s for s in spans if s["stage"] == stage]
+        if not stage_spans:
+            continue
+        p50, p95 = _percentiles([s["wall_seconds"] for s in stage_spans])
+        print(f"{stage:<10} {len(stage_spans):>6} {p50:>8.3f} {p95:>8.3f} "
+              f"{sum(s['llm_calls'] for s in stage_spans):>6} {sum(s['rows'] for s in stage_spans):>6}")
+    peak = max((s["peak_rss_mb"] or 0 for s in spans), default=0)
+    print(f"peak RSS: {peak:.1f} MiB")
+    for result in results:
+        if result["status"] != "success":
+            print(f"failed: {result['file_path']} at {result['stage']}: {result['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Bulk ingestion of PPTX decks from a directory or a metadata CSV.
+
+Usage:
+    python -m Extract_Strore.bulk_ingest --dir decks/
+    python -m Extract_Strore.bulk_ingest --csv metadata.csv --report report.csv
+
+CSV columns: file, project, type, domain, technology, client. ``file`` is
+resolved relative to the CSV; ``technology`` may list several values
+separated by ";" or ",".
+"""
+
+import os
+import re
+import csv
+import time
+import argparse
+import traceback
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from config import Config
+from log import set_log_filename, logger
+from .db_utils import pool_stats
+from .chunking import key_pool
+from .extract_main import IngestJob, parse_stage, llm_stage, insert_stage
+from . import telemetry
+
+REPORT_FIELDS = ["file_path", "project_name", "status", "stage", "slides", "chunks", "seconds", "error"]
+
+
+def jobs_from_directory(directory: str) -> list[IngestJob]:
+    """One job per .pptx file under ``directory``; metadata is left to the LLM."""
+    jobs = []
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.lower().endswith(".pptx") and not name.startswith("~$"):
+                jobs.append(IngestJob(file_path=os.path.join(root, name), project_name=name))
+    return jobs
+
+
+def jobs_from_csv(csv_path: str) -> list[IngestJob]:
+    """One job per CSV row, with the uploader's metadata."""
+    base_dir = os.path.dirname(os.path.abspath(csv_path))
+    jobs = []
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            row = {(k or "").strip().lower(): (v or "").strip() for k, v in row.items()}
+            if not row.get("file"):
+                logger.warning(f"Skipping CSV row without a file: {row}")
+                continue
+            jobs.append(IngestJob(
+                file_path=os.path.join(base_dir, row["file"]),
+                project_name=row.get("project") or os.path.basename(row["file"]),
+                file_type=row.get("type", ""),
+                domain=row.get("domain", ""),
+                technology=[t.strip() for t in re.split(r"[;,]", row.get("technology", "")) if t.strip()],
+                client_name=row.get("client", ""),
+            ))
+    return jobs
+
+
+def in_trace(job: IngestJob, fn, *args):
+    """Run one stage of a job under the job's trace so its spans share a trace_id."""
+    with telemetry.trace(job.file_path, job.trace_id):
+        return fn(*args)
+
+
+def run_bulk(jobs: list[IngestJob], parse_workers=None, llm_workers=None, insert_workers=None) -> list[dict]:
+    """Run jobs through the extract_main stages: parse (process pool), LLM and insert (thread pools).
+
+    Each file moves to the next stage as soon as its previous stage finishes,
+    so parsing, polishing and embedding overlap across files. A failure only
+    affects its own file.
+    """
+    results = []
+    stages = {}
+
+    def finish(job, status, stage, error=""):
+        results.append({
+            "file_path": job.file_path,
+            "project_name": job.project_name,
+            "status": status,
+            "stage": stage,
+            "slides": job.slides,
+            "chunks": job.chunks,
+            "seconds": round(time.time() - job.started, 2),
+            "error": error,
+        })
+        logger.info(f"[{len(results)}/{len(jobs)}] {status} {job.file_path} ({stage})")
+
+    with ProcessPoolExecutor(max_workers=parse_workers or Config.BULK_PARSE_WORKERS) as parse_pool, \
+            ThreadPoolExecutor(max_workers=llm_workers or Config.BULK_LLM_WORKERS) as llm_pool, \
+            ThreadPoolExecutor(max_workers=insert_workers or Config.BULK_INSERT_WORKERS) as insert_pool:
+        pending = set()
+        for job in jobs:
+            job.started = time.time()
+            future = parse_pool.submit(in_trace, job, parse_stage, job.file_path, job.file_hash)
+            stages[future] = ("parse", job)
+            pending.add(future)
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, job = stages.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"❌ {stage} failed for {job.file_path}: {e}")
+                    logger.debug(traceback.format_exc())
+                    finish(job, "failed", stage, str(e))
+                    continue
+
+                if stage == "parse":
+                    job.file_hash, slides = result
+                    job.slides = len(slides)
+                    next_stage, next_future = "llm", llm_pool.submit(in_trace, job, llm_stage, job, slides)
+                elif stage == "llm":
+                    metadata, polished_docs, summary = result
+                    job.chunks = len(polished_docs)
+                    next_stage, next_future = "insert", insert_pool.submit(
+                        in_trace, job, insert_stage, job, metadata, polished_docs, summary,
+                    )
+                else:
+                    finish(job, "success", stage)
+                    continue
+
+                stages[next_future] = (next_stage, job)
+                pending.add(next_future)
+    return results
+
+
+def write_report(results: list[dict], report_path: str):
+    with open(report_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+    logger.info(f"Ingestion report saved at: {report_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk ingest PPTX decks.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--dir", help="Directory searched recursively for .pptx files")
+    source.add_argument("--csv", help="Metadata CSV (file, project, type, domain, technology, client)")
+    parser.add_argument("--report", default=f"ingestion_report_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.csv")
+    parser.add_argument("--parse-workers", type=int, default=Config.BULK_PARSE_WORKERS)
+    parser.add_argument("--llm-workers", type=int, default=Config.BULK_LLM_WORKERS)
+    parser.add_argument("--insert-workers", type=int, default=Config.BULK_INSERT_WORKERS)
+    args = parser.parse_args()
+
+    set_log_filename("bulk_extraction")
+    jobs = jobs_from_directory(args.dir) if args.dir else jobs_from_csv(args.csv)
+    logger.info(f"Starting bulk ingestion of {len(jobs)} files.")
+    results = run_bulk(jobs, args.parse_workers, args.llm_workers, args.insert_workers)
+    write_report(results, args.report)
+    succeeded = sum(r["status"] == "success" for r in results)
+    logger.info(f"Bulk ingestion finished: {succeeded} succeeded, {len(results) - succeeded} failed.")
+    logger.info(f"DB pool stats: {pool_stats()}")
+    logger.info(f"Gemini key stats: {key_pool.stats()}")
+
+
+if __name__ == "__main__":
+    main()
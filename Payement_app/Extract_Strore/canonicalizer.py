@@ -0,0 +1,216 @@
+# canonicalizer.py
+"""Local canonicalization of domain and technology names.
+
+Values are resolved against, in order: the synonym file, the names already
+stored in the ``domain``/``technology`` tables, and a trigram fuzzy match
+against those names. Only values that none of these recognise are sent to
+the LLM, and its answers are remembered for the life of the process.
+"""
+import os
+import re
+import json
+import time
+import threading
+from difflib import SequenceMatcher
+from sqlalchemy import select
+from langchain_core.prompts import ChatPromptTemplate
+from config import Config
+from .db_utils import create_session
+from .db_schema import domains, technology
+from log import logger
+
+KINDS = ("domain", "technology")
+_TABLES = {"domain": domains, "technology": technology}
+_FILLER_RE = re.compile(r"\s+(industry|sector|domain|field)$")
+
+
+def normalize_name(value) -> str:
+    """Lowercase, trim and collapse whitespace; drop a trailing "sector"/"industry"."""
+    value = re.sub(r"\s+", " ", str(value or "").lower()).strip(" ,-_")
+    return _FILLER_RE.sub("", value)
+
+
+def trigrams(value: str) -> set[str]:
+    """pg_trgm style trigram set of a normalized name."""
+    padded = f"  {value} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a: str, b: str) -> float:
+    """Trigram Jaccard similarity, tie-broken by edit-distance ratio."""
+    ta, tb = trigrams(a), trigrams(b)
+    score = len(ta & tb) / len(ta | tb) if ta and tb else 0.0
+    return score + SequenceMatcher(None, a, b).ratio() * 1e-3
+
+
+class Canonicalizer:
+    """Match free-form names to canonical ones from aliases and known names."""
+
+    def __init__(self, aliases=None, known=None, threshold=None, min_fuzzy_length=None):
+        self.threshold = Config.CANONICAL_MATCH_THRESHOLD if threshold is None else threshold
+        self.min_fuzzy_length = Config.CANONICAL_MIN_FUZZY_LENGTH if min_fuzzy_length is None else min_fuzzy_length
+        self._lock = threading.Lock()
+        self._learned = {kind: {} for kind in KINDS}
+        self.set_aliases(aliases or {})
+        self.set_known(known or {})
+
+    def set_aliases(self, aliases: dict):
+        table = {
+            kind: {normalize_name(k): normalize_name(v) for k, v in aliases.get(kind, {}).items()}
+            for kind in KINDS
+        }
+        with self._lock:
+            self._aliases = table
+
+    def set_known(self, known: dict):
+        table = {kind: {normalize_name(n) for n in known.get(kind, ()) if normalize_name(n)} for kind in KINDS}
+        with self._lock:
+            self._known = {kind: {name: trigrams(name) for name in names} for kind, names in table.items()}
+
+    def learn(self, kind: str, value: str, canonical: str):
+        """Remember a resolution (e.g. from the LLM); survives synonym file reloads."""
+        with self._lock:
+            self._learned[kind][normalize_name(value)] = normalize_name(canonical)
+
+    def known_names(self, kind: str) -> list[str]:
+        with self._lock:
+            return sorted(self._known[kind])
+
+    def match(self, kind: str, value) -> str | None:
+        """Return the canonical name for value, or None if nothing matches."""
+        name = normalize_name(value)
+        if not name:
+            return None
+        with self._lock:
+            aliases = self._aliases[kind]
+            learned = self._learned[kind]
+            known = self._known[kind]
+        if name in aliases:
+            return aliases[name]
+        if name in learned:
+            return learned[name]
+        if name in known:
+            return name
+        if len(name) < self.min_fuzzy_length:
+            return None
+        best, best_score = None, 0.0
+        for candidate in known:
+            score = similarity(name, candidate)
+            if score > best_score:
+                best, best_score = candidate, score
+        if best is not None and best_score >= self.threshold:
+            logger.info(f"Fuzzy matched {kind} '{name}' to '{best}' ({best_score:.2f}).")
+            return best
+        return None
+
+
+_canonicalizer = Canonicalizer()
+_synonyms_mtime = None
+_known_loaded_at = 0.0
+_refresh_lock = threading.Lock()
+
+
+def _refresh():
+    """Reload the synonym file when it changes and the known names when stale."""
+    global _synonyms_mtime, _known_loaded_at
+    with _refresh_lock:
+        path = Config.CANONICAL_SYNONYMS_FILE
+        try:
+            mtime = os.path.getmtime(path)
+            if mtime != _synonyms_mtime:
+                with open(path, encoding="utf-8") as f:
+                    _canonicalizer.set_aliases(json.load(f))
+                _synonyms_mtime = mtime
+                logger.info(f"Loaded synonym file: {path}")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load synonym file {path}: {e}")
+
+        if time.monotonic() - _known_loaded_at >= Config.CANONICAL_REFRESH_SECONDS:
+            try:
+                with create_session() as session:
+                    known = {
+                        kind: session.execute(select(table.c.name)).scalars().all()
+                        for kind, table in _TABLES.items()
+                    }
+                _canonicalizer.set_known(known)
+                _known_loaded_at = time.monotonic()
+            except Exception as e:
+                logger.warning(f"Could not load known domain/technology names: {e}")
+
+
+def _resolve_with_llm(unmatched: dict) -> dict:
+    """Ask the LLM to canonicalize the leftover values; returns {kind: {value: canonical}}."""
+    from .chunking import call_model
+
+    prompt_template = ChatPromptTemplate.from_messages([
+        ("system", "You are a data cleaning assistant."),
+        ("user", """Normalize the following domain and technology names.
+        Rules:
+        - Classify each domain into a broad, top-level category such as Tourism, Healthcare, Finance, Business,
+          Hospitality, Food & Beverage, Retail, Event Management, Logistics, E-Commerce, Security Services,
+          Waste Management, Marketing, Education, Human Resources, Fitness & Health, IT Infrastructure,
+          Information Technology, Automotive, Entertainment, Risk Management.
+        - Prefer one of these existing names whenever it fits: {known}
+        - Expand abbreviations and synonyms of technologies to their canonical names.
+        - Always return lowercase text.
+        Return valid JSON only, shaped as {{"domain": {{"<input>": "<canonical>"}}, "technology": {{"<input>": "<canonical>"}}}}
+
+        Input:
+        {values}""")
+    ])
+    known = {kind: _canonicalizer.known_names(kind)[:200] for kind in KINDS}
+    formatted_prompt = prompt_template.format_messages(
+        known=json.dumps(known, ensure_ascii=False),
+        values=json.dumps(unmatched, ensure_ascii=False),
+    )
+    response = call_model(formatted_prompt)
+    raw_out = getattr(response, "content", str(response))
+    cleaned_output = re.sub(r"(^```(?:json)?)|(```$)", "", raw_out.strip(), flags=re.MULTILINE)
+    try:
+        resolved = json.loads(cleaned_output)
+    except json.JSONDecodeError:
+        logger.error("⚠️ LLM returned invalid JSON for canonicalization, keeping values as-is.")
+        return {}
+    return {kind: resolved[kind] for kind in KINDS if isinstance(resolved.get(kind), dict)}
+
+
+def canonicalize_metadata(metadata: dict) -> dict:
+    """Return metadata with its domain and technology names canonicalized.
+
+    Values that match nothing locally are sent to the LLM in one call when
+    CANONICAL_LLM_FALLBACK is set, otherwise they are kept in normalized form.
+    """
+    _refresh()
+    techs = metadata.get("technology") or []
+    if isinstance(techs, str):
+        techs = [techs]
+    values = {
+        "domain": [metadata.get("domain")] if metadata.get("domain") else [],
+        "technology": [t for t in techs if isinstance(t, str) and t.strip()],
+    }
+    resolved = {kind: {} for kind in KINDS}
+    unmatched = {kind: [] for kind in KINDS}
+    for kind in KINDS:
+        for value in values[kind]:
+            canonical = _canonicalizer.match(kind, value)
+            if canonical:
+                resolved[kind][value] = canonical
+            elif not normalize_name(value).startswith("unknown"):
+                unmatched[kind].append(value)
+
+    if Config.CANONICAL_LLM_FALLBACK and any(unmatched.values()):
+        logger.info(f"Canonicalizing unmatched values with LLM: {unmatched}")
+        for kind, mapping in _resolve_with_llm(unmatched).items():
+            for value, canonical in mapping.items():
+                if value in unmatched[kind] and normalize_name(canonical):
+                    _canonicalizer.learn(kind, value, canonical)
+                    resolved[kind][value] = normalize_name(canonical)
+
+    def pick(kind, value):
+        return resolved[kind].get(value) or normalize_name(value)
+
+    result = dict(metadata)
+    if values["domain"]:
+        result["domain"] = pick("domain", values["domain"][0])
+    result["technology"] = list(dict.fromkeys(pick("technology", t) for t in values["technology"]))
+    return result
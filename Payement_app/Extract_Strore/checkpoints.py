@@ -0,0 +1,120 @@
+import json
+import hashlib
+from datetime import datetime, timezone
+from config import Config
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from .db_utils import create_session
+from .db_schema import pipeline_checkpoints
+
+from log import logger
+
+# Bump a stage's version whenever its output format or logic changes so old
+# checkpoints for that stage are ignored.
+STAGE_VERSIONS = {
+    "parse": "1",
+    "polish": "3",
+    "metadata": "1",
+}
+
+
+def _version(stage: str, variant: str | None) -> str:
+    return STAGE_VERSIONS[stage] if variant is None else f"{STAGE_VERSIONS[stage]}:{variant}"
+
+
+def file_sha256(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Stream a file through SHA-256 and return the hex digest."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def inputs_hash(inputs) -> str:
+    """Short stable digest of a stage's JSON-serializable inputs, for use as a variant."""
+    encoded = json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def load_checkpoint(file_hash: str, stage: str, variant: str | None = None):
+    """Return the saved payload for a stage at its current version and variant, or None."""
+    if not Config.PIPELINE_CHECKPOINTS or not file_hash:
+        return None
+    try:
+        with create_session() as session:
+            payload = session.execute(
+                select(pipeline_checkpoints.c.payload).where(
+                    pipeline_checkpoints.c.file_hash == file_hash,
+                    pipeline_checkpoints.c.stage == stage,
+                    pipeline_checkpoints.c.stage_version == _version(stage, variant),
+                )
+            ).scalar_one_or_none()
+        if payload is not None:
+            logger.info(f"Resuming {stage} stage from checkpoint for {file_hash[:12]}.")
+        return payload
+    except Exception as e:
+        logger.warning(f"Checkpoint lookup failed for {stage}, running the stage: {e}")
+        return None
+
+
+def save_checkpoint(file_hash: str, stage: str, payload, variant: str | None = None):
+    """Upsert a stage's output for the file.
+
+    ``variant`` (at most 29 characters) identifies stage inputs other than the
+    file itself; it is stored with the stage version, so a checkpoint written
+    for different inputs is never resumed.
+    """
+    if not Config.PIPELINE_CHECKPOINTS or not file_hash:
+        return
+    try:
+        with create_session() as session:
+            stmt = pg_insert(pipeline_checkpoints).values(
+                file_hash=file_hash,
+                stage=stage,
+                stage_version=_version(stage, variant),
+                payload=payload,
+                created_at=datetime.now(timezone.utc),
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[pipeline_checkpoints.c.file_hash, pipeline_checkpoints.c.stage],
+                set_={
+                    "stage_version": stmt.excluded.stage_version,
+                    "payload": stmt.excluded.payload,
+                    "created_at": stmt.excluded.created_at,
+                },
+            )
+            session.execute(stmt)
+            session.commit()
+    except Exception as e:
+        logger.warning(f"Failed to save {stage} checkpoint: {e}")
+
+
+def clear_checkpoints(file_hash: str):
+    """Drop every checkpoint of a file once it has been fully ingested."""
+    if not Config.PIPELINE_CHECKPOINTS or not file_hash:
+        return
+    try:
+        with create_session() as session:
+            session.execute(delete(pipeline_checkpoints).where(pipeline_checkpoints.c.file_hash == file_hash))
+            session.commit()
+    except Exception as e:
+        logger.warning(f"Failed to clear checkpoints for {file_hash[:12]}: {e}")
+
+
+def checkpointed(file_hash: str, stage: str, run, encode=lambda value: value, decode=lambda payload: payload,
+                 variant: str | None = None, keep=lambda result: True):
+    """Return the stage's checkpointed result, or run it and checkpoint the output.
+
+    Results for which ``keep(result)`` is False (e.g. partial output) are
+    returned but not checkpointed, so the next attempt runs the stage again.
+    """
+    payload = load_checkpoint(file_hash, stage, variant)
+    if payload is not None:
+        return decode(payload)
+    result = run()
+    if keep(result):
+        save_checkpoint(file_hash, stage, encode(result), variant)
+    else:
+        logger.warning(f"Not checkpointing incomplete {stage} output.")
+    return result
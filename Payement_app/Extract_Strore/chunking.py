@@ -1,14 +1,16 @@
 import re
 import json
-import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from config import Config
-from langchain.schema import Document
+from langchain_core.documents import Document
 from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate
 from google.api_core.exceptions import ResourceExhausted
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from .polish_cache import cache_key, get_cached, store_cached
+from .key_pool import GeminiKeyPool, NoKeyAvailableError, retry_delay_seconds
+from .text_chunker import SlideChunker
+from . import telemetry
 
 from log import logger
 
@@ -18,41 +20,110 @@ API_KEYS = [
     Config.GOOGLE_API_KEY_3,
 ]
 
-current_key_index = 0
-
-def get_model():
-    """Return a ChatGoogleGenerativeAI instance with the current API key."""
-    global current_key_index
-    logger.info(f"Using Google API key ...{API_KEYS[current_key_index][-6:]}")
-    return ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        google_api_key=API_KEYS[current_key_index]
-    )
+# Bump whenever the polishing prompts change so cached output is not reused.
+POLISH_PROMPT_VERSION = "1"
+# Polish output is cached per prompt that produced it: the single-slide prompt or BATCH_POLISH_PROMPT
+POLISH_VARIANTS = ("single", "batch")
+text_chunker = SlideChunker()
+key_pool = GeminiKeyPool(
+    API_KEYS,
+    model="gemini-2.5-flash",
+    default_cooldown=Config.GEMINI_KEY_COOLDOWN,
+    max_wait=Config.GEMINI_KEY_MAX_WAIT,
+)
 
 class APIKeysExhaustedError(RuntimeError):
     """Raised when all API keys are exhausted or still rate limited."""
     pass
 
 def call_model(prompt: str, retries: int = 3):
-    """Call Gemini model with retry + key rotation."""
-    global current_key_index
+    """Call Gemini through the shared key pool, retrying 429s on another key."""
     logger.info("Calling Gemini model.")
-    for attempt in range(retries):
+    for _ in range(retries):
         try:
-            model = get_model()
-            response = model.invoke(prompt)
+            key = key_pool.acquire()
+        except NoKeyAvailableError as e:
+            logger.error(str(e))
+            break
+        try:
+            response = key_pool.client(key).invoke(prompt)
+            telemetry.record(
+                llm_calls=1,
+                prompt_chars=_prompt_chars(prompt),
+                response_chars=len(str(getattr(response, "content", response))),
+            )
             return response
-
-        except ResourceExhausted:
-            logger.warning(f"Rate limit hit on key ...{API_KEYS[current_key_index][-6:]} Switching keys.")
-            current_key_index = (current_key_index + 1) % len(API_KEYS)
-            time.sleep(2 ** attempt)
+        except ResourceExhausted as e:
+            key_pool.report_throttled(key, retry_delay_seconds(e))
 
     logger.error("All API keys exhausted or still rate limited.")
     raise APIKeysExhaustedError("All API keys exhausted or still rate limited.")
 
+def _prompt_chars(prompt) -> int:
+    if isinstance(prompt, str):
+        return len(prompt)
+    return sum(len(str(getattr(message, "content", message))) for message in prompt)
+
+BATCH_POLISH_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are provided with content from several slides as a JSON list of
+                 objects with "slide_number" and "content".
+                 Rewrite each slide's text in a presentation-like format.
+                 - Use bullets, headings, or subheadings.
+                 - Do NOT add extra commentary.
+                 - Output only plain text suitable for a presentation.
+                 - Include slide number if available.
+                 - Never merge content across slides.
+
+                 Output requirements:
+                 - Return a single valid JSON object and nothing else.
+                 - Keys are the slide_number values as strings, values are the rewritten text.
+                 - Include every slide_number from the input exactly once.
+              """),
+    ("human", "{input_data}")
+])
+
+SUMMARY_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are a world-class executive summarization expert with deep knowledge
+                in project documentation, software systems, and business analysis.
+                Your task is to generate a **single, highly detailed, professional executive summary** 
+                from slide content. The summary should enable any reader to fully understand 
+                the project without seeing the original slides.
+
+                Requirements:
+                1. Capture **every critical detail** from the slides, including:
+                    - Project overview and purpose
+                    - Key features and functionalities
+                    - Technologies and tools used
+                    - Processes, workflows, or methodologies described
+                    - Findings, insights, and conclusions
+                2. Use only the content provided — do not add assumptions or outside knowledge.
+                3. Present the summary in a **cohesive, narrative format**, flowing logically.
+                4. Include technical details in a readable and professional manner.
+                5. **STRICT RULE:** The summary **must not exceed 8000 characters**. Condense wording carefully if needed, but do not omit critical information. Exceeding this limit is not allowed.
+                6. Ensure someone reading this summary alone can fully understand the project, its scope, and its implementation.
+            """),
+    ("human", "{ppt_text}")
+])
+
+SECTION_SUMMARY_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are provided with consecutive content from one section of a larger slide deck.
+                 Summarize it for a later executive summary of the whole deck.
+                 - Keep every concrete detail: purpose, features, technologies, processes,
+                   figures, names and conclusions.
+                 - Use only the content provided; do not add assumptions.
+                 - Output plain text only, at most {max_chars} characters.
+              """),
+    ("human", "{section_text}")
+])
+
 # --- Merge slides ---
-def polish_content(file_record):
+def polish_content(file_record, max_workers: int | None = None, batch_chars: int | None = None,
+                   failed_slides: list | None = None):
+    """Polish and chunk the deck's slides and summarize it.
+
+    Returns (docs, polished_text, summary). Slides that could not be polished
+    are skipped; their slide numbers are appended to ``failed_slides``.
+    """
     all_docs = []
     processed_text=[]
     slides = file_record.get("slides", [])
@@ -76,63 +147,230 @@ def polish_content(file_record):
         ("human", "{input_data}")
     ])
     logger.info("System prompt for polishing content prepared.")
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
-        separators=["\n\n", "\n", " "]
+    with ThreadPoolExecutor(max_workers=max(1, Config.SUMMARY_MAX_WORKERS)) as summary_executor:
+        sections = _SectionSummarizer(summary_executor, Config.SUMMARY_SECTION_CHARS)
+        all__docs =_slides(slides,prompt,processed_text,text_chunker,all_docs,max_workers,batch_chars,sections.add,
+                           failed_slides)
+        final_ppt="\n".join(processed_text)
+        with telemetry.span("summarize"):
+            summary_text = sections.result(final_ppt)
+
+    logger.info(f"✅ Created {len(all_docs)} text chunks for embedding.")
+    return all__docs,final_ppt,summary_text
+
+
+class _SectionSummarizer:
+    """Build the executive summary while slides are still being polished.
+
+    Polished slides are fed in as they finish and released in slide order.
+    Every ``section_chars`` characters of released text are summarized in the
+    background; ``result`` then reduces the section summaries into the final
+    summary. Decks shorter than one section keep the single summary call.
+    """
+
+    def __init__(self, executor, section_chars: int):
+        self.executor = executor
+        self.section_chars = section_chars
+        self._done = {}
+        self._next = 0
+        self._buffer = []
+        self._size = 0
+        self._sections = []
+
+    def add(self, index: int, polished_text):
+        self._done[index] = polished_text if isinstance(polished_text, str) else ""
+        while self._next in self._done:
+            text = self._done.pop(self._next)
+            self._next += 1
+            if text:
+                self._buffer.append(text)
+                self._size += len(text)
+            if self._size >= self.section_chars:
+                self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            self._sections.append(self.executor.submit(telemetry.bind(_summarize_section), "\n".join(self._buffer)))
+            self._buffer, self._size = [], 0
+
+    def result(self, final_ppt: str) -> str:
+        if not self._sections:
+            return _summarize(final_ppt)
+        self._flush()
+        logger.info(f"Reducing {len(self._sections)} section summaries into the executive summary.")
+        summaries = [future.result() for future in self._sections]
+        while len(summaries) > 1 and len("\n\n".join(summaries)) > self.section_chars:
+            groups = _pack_texts(summaries, self.section_chars)
+            if len(groups) == len(summaries):
+                break
+            futures = [self.executor.submit(telemetry.bind(_summarize_section), "\n\n".join(g)) for g in groups]
+            summaries = [future.result() for future in futures]
+        return _summarize("\n\n".join(summaries))
+
+
+def _pack_texts(texts: list[str], max_chars: int) -> list[list[str]]:
+    """Group consecutive texts into lists of up to ``max_chars`` characters."""
+    groups, current, size = [], [], 0
+    for text in texts:
+        if current and size + len(text) > max_chars:
+            groups.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += len(text)
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _summarize_section(section_text: str) -> str:
+    """Condense one section of the deck for the reduce step."""
+    logger.info(f"Summarizing a deck section of {len(section_text)} characters.")
+    formatted_prompt = SECTION_SUMMARY_PROMPT.format_messages(
+        section_text=section_text, max_chars=Config.SUMMARY_SECTION_MAX_CHARS
     )
-    all__docs =_slides(slides,prompt,processed_text,text_splitter,all_docs)
-    final_ppt="\n".join(processed_text)
-
-    summary_prompt = ChatPromptTemplate.from_messages([
-        ("system", """You are a world-class executive summarization expert with deep knowledge
-                    in project documentation, software systems, and business analysis.
-                    Your task is to generate a **single, highly detailed, professional executive summary** 
-                    from slide content. The summary should enable any reader to fully understand 
-                    the project without seeing the original slides.
-
-                    Requirements:
-                    1. Capture **every critical detail** from the slides, including:
-                        - Project overview and purpose
-                        - Key features and functionalities
-                        - Technologies and tools used
-                        - Processes, workflows, or methodologies described
-                        - Findings, insights, and conclusions
-                    2. Use only the content provided — do not add assumptions or outside knowledge.
-                    3. Present the summary in a **cohesive, narrative format**, flowing logically.
-                    4. Include technical details in a readable and professional manner.
-                    5. **STRICT RULE:** The summary **must not exceed 8000 characters**. Condense wording carefully if needed, but do not omit critical information. Exceeding this limit is not allowed.
-                    6. Ensure someone reading this summary alone can fully understand the project, its scope, and its implementation.
-                """),
-        ("human", "{ppt_text}")
-    ])
+    response = call_model(formatted_prompt)
+    return getattr(response, "content", str(response)).strip()
+
 
-    formatted_summary_prompt = summary_prompt.format_messages(ppt_text=final_ppt)
+def _summarize(ppt_text: str) -> str:
+    """Produce the executive summary, capped at 8000 characters."""
+    formatted_summary_prompt = SUMMARY_PROMPT.format_messages(ppt_text=ppt_text)
     summary_response = call_model(formatted_summary_prompt)
     summary_text = getattr(summary_response, "content", str(summary_response)).strip()
 
-# ---- Trim for DB safety (optional, but should rarely be needed if LLM follows strict rule) ----
+    # ---- Trim for DB safety (optional, but should rarely be needed if LLM follows strict rule) ----
     if len(summary_text) > 8000:
         summary_text = summary_text[:7997] + "..."
+    return summary_text
+
+def _slides(slides, prompt, processed_text, text_splitter, all_docs, max_workers=None, batch_chars=None,
+            on_polished=None, failed_slides=None):
+    """Polish slides concurrently, then collect results in slide order.
+
+    Slides whose merged text is already in the polish cache, under either
+    prompt variant, are not sent to the model. The rest are packed into requests of up to ``batch_chars``
+    characters (0 disables packing) with at most ``max_workers`` model calls
+    in flight. A slide that fails is logged and skipped without cancelling
+    the others, and its slide number is appended to ``failed_slides``.
+    ``on_polished(index, text)`` is called for every slide as soon as its
+    result is known, in completion order.
+    """
+    max_workers = max(1, max_workers or Config.POLISH_MAX_WORKERS)
+    batch_chars = Config.POLISH_BATCH_CHARS if batch_chars is None else batch_chars
+    entries = [(slide, _merge_slide_text(slide)) for slide in slides]
+    keys = {
+        variant: [cache_key(merged_texts, f"{POLISH_PROMPT_VERSION}:{variant}") for _, merged_texts in entries]
+        for variant in POLISH_VARIANTS
+    }
+    cached = get_cached([key for variant_keys in keys.values() for key in variant_keys])
+    results = [
+        next((cached[keys[variant][i]] for variant in POLISH_VARIANTS if keys[variant][i] in cached), None)
+        for i in range(len(entries))
+    ]
+    variants = [None] * len(entries)
+
+    pending = [i for i, text in enumerate(results) if text is None]
+    batches = _pack_slides(entries, pending, batch_chars)
+    logger.info(f"Processing {len(pending)} uncached slides in {len(batches)} requests ({max_workers} workers).")
+    if on_polished:
+        for i, polished_text in enumerate(results):
+            if polished_text is not None:
+                on_polished(i, polished_text)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(telemetry.bind(_polish_batch), [entries[i] for i in batch], prompt): batch
+            for batch in batches
+        }
+        for future in as_completed(futures):
+            for i, (polished_text, variant) in zip(futures[future], future.result()):
+                results[i], variants[i] = polished_text, variant
+                if on_polished:
+                    on_polished(i, polished_text)
+    store_cached({keys[variants[i]][i]: results[i] for i in pending if isinstance(results[i], str)})
+
+    for (slide, merged_texts), polished_text in zip(entries, results):
+        slide_num = slide.get("slide_number")
+        try:
+            if isinstance(polished_text, Exception):
+                raise polished_text
+            processed_text.append(polished_text)
+            _add_chunks_to_docs(
+                polished_text, slide_num, all_docs, text_splitter, _slide_fingerprint(merged_texts, text_splitter)
+            )
+        except Exception as e:
+            logger.error(f"Error processing slide {slide_num}: {e}")
+            if failed_slides is not None:
+                failed_slides.append(slide_num)
+    return all_docs
 
 
+def _pack_slides(entries, indexes, batch_chars: int) -> list[list[int]]:
+    """Group consecutive entry indexes whose merged text fits in ``batch_chars``."""
+    batches, current, size = [], [], 0
+    for i in indexes:
+        length = len(entries[i][1])
+        if current and size + length > batch_chars:
+            batches.append(current)
+            current, size = [], 0
+        current.append(i)
+        size += length
+    if current:
+        batches.append(current)
+    return batches
 
 
-    logger.info(f"✅ Created {len(all_docs)} recursive text chunks for embedding.")
-    return all__docs,final_ppt,summary_text
+def _polish_batch(batch, prompt) -> list:
+    """Polish a batch of slides, returning (polished text or raised error, prompt variant) per slide.
 
-def _slides(slides, prompt, processed_text, text_splitter, all_docs):
-    logger.info("Processing slides for polishing and chunking.")
-    for slide in slides:
-        slide_num = slide.get("slide_number")
+    Multi-slide batches go out as a single request; any slide missing from the
+    parsed response falls back to its own single-slide call.
+    """
+    polished = {}
+    if len(batch) > 1:
         try:
-            merged_texts = _merge_slide_text(slide)
-            polished_text = _call_model_for_slide(merged_texts, prompt)
-            processed_text.append(polished_text)
-            _add_chunks_to_docs(polished_text, slide_num, all_docs, text_splitter)
+            polished = _call_model_for_batch(batch)
         except Exception as e:
-            logger.error(f"Error processing slide {slide_num}: {e}")
-    return all_docs
+            logger.warning(f"Batched polishing failed, falling back to single-slide calls: {e}")
+
+    results = []
+    for position, (slide, merged_texts) in enumerate(batch, start=1):
+        text = polished.get(_batch_key(slide, position))
+        if text:
+            results.append((text, "batch"))
+            continue
+        try:
+            results.append((_call_model_for_slide(merged_texts, prompt), "single"))
+        except Exception as e:
+            results.append((e, "single"))
+    return results
+
+
+def _batch_key(slide, position: int) -> str:
+    slide_num = slide.get("slide_number")
+    return str(slide_num if slide_num is not None else position)
+
+
+def _call_model_for_batch(batch) -> dict[str, str]:
+    """Call the LLM once for several slides and split the JSON reply per slide."""
+    logger.info(f"Calling model to polish {len(batch)} slides in one request.")
+    payload = [
+        {"slide_number": _batch_key(slide, position), "content": merged_texts}
+        for position, (slide, merged_texts) in enumerate(batch, start=1)
+    ]
+    formatted_prompt = BATCH_POLISH_PROMPT.format_messages(
+        input_data=json.dumps(payload, ensure_ascii=False)
+    )
+    response = call_model(formatted_prompt)
+    raw_output = getattr(response, "content", str(response))
+    cleaned_output = re.sub(r"(^```(?:json)?\s*)|(\s*```$)", "", raw_output.strip(), flags=re.MULTILINE)
+    try:
+        parsed = json.loads(cleaned_output)
+    except json.JSONDecodeError:
+        logger.error("Failed to parse batched polishing output.")
+        return {}
+    if not isinstance(parsed, dict):
+        return {}
+    return {str(k): v.strip() for k, v in parsed.items() if isinstance(v, str) and v.strip()}
 
 
 def _merge_slide_text(slide) -> str:
@@ -159,14 +397,25 @@ def _call_model_for_slide(content: str, prompt) -> str:
     return getattr(response, "content", str(response))
 
 
-def _add_chunks_to_docs(polished_text: str, slide_num: int, all_docs: list, text_splitter):
+def _slide_fingerprint(merged_text: str, text_splitter) -> str:
+    """Identify a slide's chunks by its source text and the settings that shape them.
+
+    Hashing the source rather than the LLM output keeps the fingerprint stable
+    when the polish cache misses, so re-ingest only re-embeds edited slides.
+    """
+    settings = [POLISH_PROMPT_VERSION, getattr(text_splitter, "max_tokens", None), getattr(text_splitter, "overlap_tokens", None)]
+    payload = json.dumps([settings, merged_text], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _add_chunks_to_docs(polished_text: str, slide_num: int, all_docs: list, text_splitter, fingerprint: str):
     """Split polished text into chunks and append to document list."""
     logger.info(f"Splitting polished text of slide {slide_num} into chunks.")
     chunks = text_splitter.split_text(polished_text)
     for idx, chunk in enumerate(chunks, start=1):
         all_docs.append(Document(
             page_content=chunk,
-            metadata={"slide_number": slide_num, "chunk_id": f"{slide_num}-{idx}"}
+            metadata={"slide_number": slide_num, "chunk_id": f"{slide_num}-{idx}", "slide_fingerprint": fingerprint}
         ))
 
 def find_details(polished_text):
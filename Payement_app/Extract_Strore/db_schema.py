@@ -1,13 +1,8 @@
-from config import Config
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from pgvector.sqlalchemy import Vector
 from datetime import datetime,timezone
-from sqlalchemy import (Table, Column, Integer, String, Text, ForeignKey,Enum, DateTime, MetaData)
+from sqlalchemy import (Table, Column, Integer, String, Text, ForeignKey,Enum, DateTime, MetaData, UniqueConstraint, BigInteger)
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 
-connection_str = f"postgresql+psycopg2://{Config.db_user}:{Config.db_password}@{Config.db_host}:{Config.db_port}/{Config.db_name}"
-engine = create_engine(connection_str)
-Session = sessionmaker(bind=engine)
-session = Session()
 # -------------------
 # Table Definitions
 # -------------------
@@ -85,3 +80,56 @@ users = Table(
     Column("created_at", DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False),
     Column("updated_at", DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False),
 )
+
+# ---------------- Polished Slide Cache ----------------
+slide_polish_cache = Table(
+    "slide_polish_cache", metadata,
+    Column("content_hash", String(64), primary_key=True),
+    Column("polished_text", Text, nullable=False),
+    Column("created_at", DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False),
+    Column("last_used_at", DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False, index=True),
+)
+
+# ---------------- Chunk Embedding Cache ----------------
+chunk_embedding_cache = Table(
+    "chunk_embedding_cache", metadata,
+    Column("content_hash", String(64), primary_key=True),
+    Column("embedding", Vector(3072), nullable=False),
+    Column("created_at", DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False),
+)
+
+# ---------------- Pipeline Checkpoints ----------------
+pipeline_checkpoints = Table(
+    "pipeline_checkpoint", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("file_hash", String(64), nullable=False),
+    Column("stage", String(32), nullable=False),
+    Column("stage_version", String(32), nullable=False),
+    Column("payload", JSONB, nullable=False),
+    Column("created_at", DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False),
+    UniqueConstraint("file_hash", "stage", name="unique_pipeline_checkpoint"),
+)
+
+# ---------------- LangChain Vector Store ----------------
+langchain_collections = Table(
+    "langchain_pg_collection", metadata,
+    Column("uuid", UUID(as_uuid=True), primary_key=True),
+    Column("name", String),
+    Column("cmetadata", JSONB),
+)
+
+langchain_embeddings = Table(
+    "langchain_pg_embedding", metadata,
+    Column("id", String, primary_key=True),
+    Column("collection_id", UUID(as_uuid=True), ForeignKey("langchain_pg_collection.uuid", ondelete="CASCADE"), nullable=False),
+    Column("embedding", Vector(3072)),
+    Column("document", String),
+    Column("cmetadata", JSONB),
+)
+
+# ---------------- Chunk Signatures (near-duplicate index) ----------------
+chunk_signatures = Table(
+    "chunk_signature", metadata,
+    Column("embedding_id", String, ForeignKey("langchain_pg_embedding.id", ondelete="CASCADE"), primary_key=True),
+    Column("simhash", BigInteger, nullable=False),
+)
@@ -1,16 +1,103 @@
+import os
+import time
+import threading
 from config import Config
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from contextlib import contextmanager
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+_engine = None
+_engine_pid = None
+_Session = None
+_engine_lock = threading.Lock()
+_EMPTY_STATS = {"connects": 0, "checkouts": 0, "checkins": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0}
+_pool_stats = dict(_EMPTY_STATS)
+_stats_lock = threading.Lock()
+_acquire = threading.local()
+
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _pool_stats[name] += amount
+
+
+class _TimedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a free connection.
+
+    Only the wait on the pool queue counts: time spent opening a new
+    connection is subtracted, and the pre-ping runs after this returns.
+    """
+
+    def _do_get(self):
+        _acquire.connect_seconds = 0.0
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start - _acquire.connect_seconds
+            with _stats_lock:
+                _pool_stats["wait_seconds"] += waited
+                _pool_stats["max_wait_seconds"] = max(_pool_stats["max_wait_seconds"], waited)
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            _acquire.connect_seconds = getattr(_acquire, "connect_seconds", 0.0) + time.perf_counter() - start
+
+
+def get_engine():
+    """Return the ingestion engine shared by this process, creating it on first use.
+
+    A process forked after the engine was created gets its own engine and
+    pool counters rather than sharing them with its parent.
+    """
+    global _engine, _engine_pid, _Session, _pool_stats, _stats_lock
+    if _engine is None or _engine_pid != os.getpid():
+        with _engine_lock:
+            if _engine is None or _engine_pid != os.getpid():
+                if _engine is not None:
+                    _engine.dispose(close=False)
+                    # The parent's lock may have been held by another thread at fork time
+                    _pool_stats, _stats_lock = dict(_EMPTY_STATS), threading.Lock()
+                connection_str = f"postgresql+psycopg2://{Config.db_user}:{Config.db_password}@{Config.db_host}:{Config.db_port}/{Config.db_name}"
+                engine = create_engine(
+                    connection_str,
+                    poolclass=_TimedQueuePool,
+                    pool_pre_ping=True,
+                    pool_size=Config.DB_POOL_SIZE,
+                    max_overflow=Config.DB_MAX_OVERFLOW,
+                    pool_timeout=Config.DB_POOL_TIMEOUT,
+                    pool_recycle=Config.DB_POOL_RECYCLE,
+                )
+                event.listen(engine, "connect", lambda *_: _count("connects"))
+                event.listen(engine, "checkout", lambda *_: _count("checkouts"))
+                event.listen(engine, "checkin", lambda *_: _count("checkins"))
+                _Session = sessionmaker(bind=engine)
+                _engine, _engine_pid = engine, os.getpid()
+    return _engine
+
+
+def pool_stats() -> dict:
+    """Return pool checkout counters, total/max queue wait and current pool usage."""
+    engine = get_engine()
+    with _stats_lock:
+        stats = dict(_pool_stats)
+    stats.update({
+        "pool_size": engine.pool.size(),
+        "checked_out": engine.pool.checkedout(),
+        "overflow": engine.pool.overflow(),
+    })
+    return stats
+
 
 @contextmanager
 def create_session():
-    
-    connection_str = f"postgresql+psycopg2://{Config.db_user}:{Config.db_password}@{Config.db_host}:{Config.db_port}/{Config.db_name}"
-    engine = create_engine(connection_str, pool_pre_ping=True)
-    Session = sessionmaker(bind=engine)
-    session = Session()
+    get_engine()
+    session = _Session()
     try:
         yield session
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
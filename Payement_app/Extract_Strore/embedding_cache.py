@@ -0,0 +1,88 @@
+import hashlib
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from sqlalchemy import select
+from langchain_core.embeddings import Embeddings
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from .db_utils import create_session
+from .db_schema import chunk_embedding_cache
+from . import telemetry
+
+from log import logger
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that reuses vectors for chunk text it has already embedded.
+
+    Cache misses are deduplicated and embedded in batches of ``batch_size``
+    with up to ``max_workers`` batch requests in flight.
+    """
+
+    def __init__(self, embedding_model, batch_size: int | None = None, max_workers: int | None = None):
+        self.embedding_model = embedding_model
+        self.batch_size = max(1, batch_size or Config.EMBED_BATCH_SIZE)
+        self.max_workers = max(1, max_workers or Config.EMBED_MAX_WORKERS)
+        self.model_name = getattr(embedding_model, "model", "")
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\n{text}".encode("utf-8")).hexdigest()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [self._key(text) for text in texts]
+        text_by_key = dict(zip(keys, texts))
+        vectors = _get_cached(keys)
+        missing = [key for key in text_by_key if key not in vectors]
+        logger.info(f"Embedding {len(missing)} of {len(texts)} chunks ({len(texts) - len(missing)} reused).")
+
+        batches = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+        embedded = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(telemetry.bind(self.embedding_model.embed_documents), [text_by_key[key] for key in batch])
+                for batch in batches
+            ]
+            for batch, future in zip(batches, futures):
+                embedded.update(zip(batch, future.result()))
+        telemetry.record(embeddings=len(missing))
+
+        _store_cached(embedded)
+        vectors.update(embedded)
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embedding_model.embed_query(text)
+
+
+def _get_cached(keys) -> dict[str, list[float]]:
+    if not Config.EMBED_CACHE_ENABLED or not keys:
+        return {}
+    try:
+        with create_session() as session:
+            rows = session.execute(
+                select(chunk_embedding_cache.c.content_hash, chunk_embedding_cache.c.embedding)
+                .where(chunk_embedding_cache.c.content_hash.in_(set(keys)))
+            ).fetchall()
+        return {row.content_hash: list(map(float, row.embedding)) for row in rows}
+    except Exception as e:
+        logger.warning(f"Embedding cache lookup failed, embedding without cache: {e}")
+        return {}
+
+
+def _store_cached(vectors: dict[str, list[float]]):
+    if not Config.EMBED_CACHE_ENABLED or not vectors:
+        return
+    now = datetime.now(timezone.utc)
+    try:
+        with create_session() as session:
+            session.execute(
+                pg_insert(chunk_embedding_cache)
+                .values([
+                    {"content_hash": key, "embedding": vector, "created_at": now}
+                    for key, vector in vectors.items()
+                ])
+                .on_conflict_do_nothing()
+            )
+            session.commit()
+    except Exception as e:
+        logger.warning(f"Failed to store {len(vectors)} embeddings in cache: {e}")
@@ -1,14 +1,166 @@
 import os
 import json
+import uuid
 import traceback
-from .extractor import parse_pptx
+from dataclasses import dataclass, field
+from config import Config
+from .extractor import parse_pptx, iter_pptx_slides
 from log import set_log_filename, logger
 from .insert_file import insert_file_record_full
-from .metadata_normalizer import resolve_metadata
+from .metadata_normalizer import resolve_metadata, extract_and_resolve_metadata
 from .chunking import polish_content, find_details
+from .checkpoints import checkpointed, clear_checkpoints, file_sha256, inputs_hash
+from . import telemetry
+from langchain_core.documents import Document
 
 
 
+@dataclass
+class IngestJob:
+    """One deck to ingest, with the uploader's metadata and its progress."""
+    file_path: str
+    project_name: str
+    file_type: str = ""
+    domain: str = ""
+    technology: list[str] = field(default_factory=list)
+    client_name: str = ""
+    file_hash: str | None = None
+    trace_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    started: float = 0.0
+    slides: int = 0
+    chunks: int = 0
+
+
+def parse_file(file_path: str, file_hash: str | None = None) -> list[dict]:
+    """Parse a PPTX file into slide records, reusing the checkpoint for file_hash."""
+    def parse():
+        if Config.PPTX_STREAMING_EXTRACTOR:
+            return list(iter_pptx_slides(file_path))
+        return parse_pptx(file_path)
+    with telemetry.span("parse"):
+        return checkpointed(file_hash, "parse", parse)
+
+
+def _encode_polished(result):
+    polished_docs, polished_text, summary = result
+    return {
+        "docs": [{"page_content": doc.page_content, "metadata": doc.metadata} for doc in polished_docs],
+        "text": polished_text,
+        "summary": summary,
+    }
+
+
+def _decode_polished(payload):
+    docs = [Document(page_content=doc["page_content"], metadata=doc["metadata"]) for doc in payload["docs"]]
+    return docs, payload["text"], payload["summary"]
+
+
+def save_slides_json(project_name: str, slides: list[dict]) -> str:
+    """Save parsed slides locally for inspection."""
+    output_folder = "Slides_JSON"
+    os.makedirs(output_folder, exist_ok=True)
+    output_json = os.path.join(
+        output_folder, project_name.replace(".pptx", ".json")
+    )
+    with open(output_json, "w", encoding="utf-8") as f:
+        json.dump(slides, f, indent=2, ensure_ascii=False)
+
+    logger.info(f"Slides JSON saved at: {output_json}")
+    return output_json
+
+
+def prepare_record(
+    project_name: str,
+    file_path: str,
+    file_type: str,
+    domain: str,
+    technology: list[str],
+    client_name: str,
+    slides: list[dict],
+    file_hash: str | None = None,
+):
+    """Run the LLM stages for parsed slides.
+
+    With a file_hash, each stage resumes from its checkpoint when one exists.
+    Returns (metadata, polished_docs, summary) ready for insert_file_record_full.
+    """
+    file_record = {
+        "project_name": project_name,
+        "file_path": file_path,
+        "file_type": file_type,
+        "domain": domain,
+        "technology": technology,
+        "client_name": client_name,
+    }
+    # Only complete polish output is checkpointed; a resumed run retries failed slides.
+    failed_slides = []
+    with telemetry.span("polish"):
+        polished_docs, polished_text,summary = checkpointed(
+            file_hash, "polish",
+            lambda: polish_content({**file_record, "slides": slides}, failed_slides=failed_slides),
+            encode=_encode_polished, decode=_decode_polished,
+            keep=lambda result: not failed_slides,
+        )
+    if failed_slides:
+        logger.warning(f"Slides {failed_slides} of {project_name} failed to polish and were skipped.")
+    logger.info(f"Polished content generated for {project_name}")
+
+    def resolve():
+        if Config.METADATA_SINGLE_CALL:
+            return extract_and_resolve_metadata(file_record, polished_text)
+        details_dict = find_details(polished_text)
+        return resolve_metadata(file_record, details_dict)
+    with telemetry.span("metadata"):
+        # The uploader's metadata feeds this stage, so it is part of the checkpoint key.
+        metadata_nomrs = checkpointed(
+            file_hash, "metadata", resolve,
+            variant=inputs_hash({**file_record, "single_call": Config.METADATA_SINGLE_CALL}),
+        )
+    return metadata_nomrs, polished_docs, summary
+
+
+# The ingestion pipeline, stage by stage. ingest_file runs it in one go;
+# bulk_ingest.run_bulk runs the same stages on separate pools.
+
+def parse_stage(file_path: str, file_hash: str | None = None) -> tuple[str | None, list[dict]]:
+    """Hash the deck (for checkpoints, unless a hash is given) and parse it.
+
+    Process-pool safe. Raises ValueError when no slides are extracted.
+    """
+    if file_hash is None and Config.PIPELINE_CHECKPOINTS:
+        file_hash = file_sha256(file_path)
+    slides = parse_file(file_path, file_hash)
+    if not slides:
+        raise ValueError(f"No slides extracted from {file_path}")
+    return file_hash, slides
+
+
+def llm_stage(job: IngestJob, slides: list[dict]):
+    """Save the parsed slides and run the LLM stages; returns prepare_record's result."""
+    save_slides_json(job.project_name, slides)
+    return prepare_record(
+        job.project_name, job.file_path, job.file_type, job.domain, job.technology, job.client_name,
+        slides, job.file_hash,
+    )
+
+
+def insert_stage(job: IngestJob, metadata: dict, polished_docs: list, summary):
+    """Embed and store the record, then drop the file's checkpoints."""
+    insert_file_record_full(metadata, polished_docs, job.file_path, summary)
+    clear_checkpoints(job.file_hash)
+
+
+def ingest_file(job: IngestJob) -> list[dict]:
+    """Run every pipeline stage for one deck; raises on failure. Returns the parsed slides."""
+    job.file_hash, slides = parse_stage(job.file_path, job.file_hash)
+    job.slides = len(slides)
+    logger.info(f"Extracted {len(slides)} slides from {job.project_name}")
+    metadata, polished_docs, summary = llm_stage(job, slides)
+    job.chunks = len(polished_docs)
+    insert_stage(job, metadata, polished_docs, summary)
+    return slides
+
+
 def process_file(
     project_name: str,
     file_path: str,
@@ -22,52 +174,15 @@ def process_file(
 
     slides = []
 
-    # Parse PPTX if applicable
-    if file_path.lower().endswith(".pptx"):
-        slides = parse_pptx(file_path)
-        logger.info(f"Extracted {len(slides)} slides from {project_name}")
-
-        # Save slides JSON locally
-        output_folder = "Slides_JSON"
-        os.makedirs(output_folder, exist_ok=True)
-        output_json = os.path.join(
-            output_folder, project_name.replace(".pptx", ".json")
-        )
-        with open(output_json, "w", encoding="utf-8") as f:
-            json.dump(slides, f, indent=2, ensure_ascii=False)
-
-        logger.info(f"Slides JSON saved at: {output_json}")
-
-        # Polish content and insert
-        polished_docs, polished_text,summary = polish_content(
-            {
-                "project_name": project_name,
-                "file_path": file_path,
-                "file_type": file_type,
-                "domain": domain,
-                "technology": technology,
-                "client_name": client_name,
-                "slides": slides,
-            }
-        )
-        logger.info(f"Polished content generated for {project_name}")
-        details_dict = find_details(polished_text)
-        metadata_nomrs = resolve_metadata(
-            {
-                "project_name": project_name,
-                "file_path": file_path,
-                "file_type": file_type,
-                "domain": domain,
-                "technology": technology,
-                "client_name": client_name,
-            },
-            details_dict,
-        )
-        try:
-            insert_file_record_full(metadata_nomrs, polished_docs, file_path,summary)
-            logger.info(f"✅ File inserted successfully: {project_name}")
-        except Exception as e:
-            logger.error(f"❌ Error inserting file {project_name}: {e}")
-            logger.debug(traceback.format_exc())
+    with telemetry.trace(file_path):
+        # Parse PPTX if applicable
+        if file_path.lower().endswith(".pptx"):
+            job = IngestJob(file_path, project_name, file_type, domain, technology, client_name)
+            try:
+                slides = ingest_file(job)
+                logger.info(f"✅ File inserted successfully: {project_name}")
+            except Exception as e:
+                logger.error(f"❌ Error processing file {project_name}: {e}")
+                logger.debug(traceback.format_exc())
     logger.info(f"Completed processing: {file_path}")
-    return {"project_name": project_name, "file_path": file_path, "slides": slides}
\ No newline at end of file
+    return {"project_name": project_name, "file_path": file_path, "slides": slides}
@@ -1,4 +1,7 @@
-from typing import Any
+import zipfile
+import posixpath
+from typing import Any, Iterator
+from lxml import etree
 from pptx import Presentation
 
 from log import logger
@@ -104,4 +107,125 @@ def parse_pptx(file_path):
         logger.error(f"Failed to parse PPTX {file_path}: {e}")
 
 
-    return slides_data
\ No newline at end of file
+    return slides_data
+
+
+# ---------------------------
+# Streaming extractor
+# ---------------------------
+_NS = {
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+_SP_TREE = f"{{{_NS['p']}}}spTree"
+_SP = f"{{{_NS['p']}}}sp"
+_GRAPHIC_FRAME = f"{{{_NS['p']}}}graphicFrame"
+_A_R = f"{{{_NS['a']}}}r"
+_A_FLD = f"{{{_NS['a']}}}fld"
+_A_BR = f"{{{_NS['a']}}}br"
+
+
+def _slide_part_names(zf: zipfile.ZipFile) -> list[str]:
+    """Return slide part names in presentation order."""
+    presentation = etree.fromstring(zf.read("ppt/presentation.xml"))
+    rels = etree.fromstring(zf.read("ppt/_rels/presentation.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels.iterfind("rel:Relationship", _NS)}
+    part_names = []
+    for sld_id in presentation.iterfind("p:sldIdLst/p:sldId", _NS):
+        target = targets.get(sld_id.get(f"{{{_NS['r']}}}id"))
+        if target:
+            part_names.append(posixpath.normpath(posixpath.join("ppt", target)).lstrip("/"))
+    return part_names
+
+
+def _runs_with_fontsizes(sp) -> list[tuple[str, float | None]]:
+    """Mirror extract_text_with_fontsizes for a raw <p:sp> element."""
+    results = []
+    for run in sp.iterfind("p:txBody/a:p/a:r", _NS):
+        txt = (run.findtext("a:t", default="", namespaces=_NS) or "").strip()
+        if not txt:
+            continue
+        sz = run.find("a:rPr", _NS)
+        sz = sz.get("sz") if sz is not None else None
+        results.append((txt, int(sz) / 100 if sz else None))
+    return results
+
+
+def _paragraph_text(para) -> str:
+    parts = []
+    for child in para:
+        if child.tag in (_A_R, _A_FLD):
+            parts.append(child.findtext("a:t", default="", namespaces=_NS) or "")
+        elif child.tag == _A_BR:
+            parts.append("\v")
+    return "".join(parts)
+
+
+def _table_rows(graphic_frame) -> list[list[str]]:
+    """Mirror extract_table for a raw <p:graphicFrame> element."""
+    tbl = graphic_frame.find("a:graphic/a:graphicData/a:tbl", _NS)
+    if tbl is None:
+        return []
+    return [
+        [
+            "\n".join(_paragraph_text(p) for p in tc.iterfind("a:txBody/a:p", _NS)).strip()
+            for tc in tr.iterfind("a:tc", _NS)
+        ]
+        for tr in tbl.iterfind("a:tr", _NS)
+    ]
+
+
+def parse_slide_xml(stream) -> dict[str, Any]:
+    """Parse one slide XML part incrementally, producing the same dict as parse_slide."""
+    categorized_text = {"body": [], "subtitle": [], "title": []}
+    tables = []
+    parents = []
+
+    for event, elem in etree.iterparse(stream, events=("start", "end"), resolve_entities=False, no_network=True):
+        if event == "start":
+            parents.append(elem.tag)
+            continue
+        parents.pop()
+        # Only top-level shapes, like slide.shapes in python-pptx
+        if not parents or parents[-1] != _SP_TREE:
+            continue
+        try:
+            if elem.tag == _SP:
+                for txt, fs in _runs_with_fontsizes(elem):
+                    categorized_text[classify_text(fs)].append(txt)
+            elif elem.tag == _GRAPHIC_FRAME:
+                table_data = _table_rows(elem)
+                if table_data:
+                    tables.append(table_data)
+        except Exception as e:
+            logger.warning(f"Skipping shape due to unexpected error: {e}")
+        elem.clear()
+
+    return {
+        "title": " ".join(categorized_text["title"]).strip(),
+        "subtitle": " ".join(categorized_text["subtitle"]).strip(),
+        "text_blocks": categorized_text["body"],
+        "tables": tables,
+    }
+
+
+def iter_pptx_slides(file_path) -> Iterator[dict[str, Any]]:
+    """Yield parsed slides one at a time straight from the PPTX zip.
+
+    Produces the same records as parse_pptx (including skipping the last
+    slide) without loading the whole presentation into python-pptx objects.
+    """
+    logger.info(f"Starting streaming PPTX parsing: {file_path}")
+    try:
+        with zipfile.ZipFile(file_path) as zf:
+            part_names = _slide_part_names(zf)
+            logger.info(f"Total slides found: {len(part_names)}")
+            for i, part_name in enumerate(part_names[:-1]):  # skip last slide
+                with zf.open(part_name) as stream:
+                    slide_info = parse_slide_xml(stream)
+                yield {"slide_number": i + 1, **slide_info}
+        logger.info(f"Finished streaming {max(len(part_names) - 1, 0)} slides from {file_path}")
+    except Exception as e:
+        logger.error(f"Failed to parse PPTX {file_path}: {e}")
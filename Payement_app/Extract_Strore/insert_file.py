@@ -4,14 +4,19 @@ import json
 import uuid
 import json
 import datetime
+import threading
 import numpy as np
+from collections import defaultdict
 from config import Config
-from sqlalchemy import insert
+from sqlalchemy import insert, select, delete, update, func, or_, not_
 from .db_utils import create_session
-from langchain_postgres.vectorstores import PGVector
+from .embedding_cache import CachedEmbeddings
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from .db_schema import projects, documents, technology,project_technologies,domains,clients,project_domains
+from .db_schema import langchain_collections, langchain_embeddings, chunk_signatures
+from .near_dup import find_near_duplicates, signature_rows
+from . import telemetry
 from log import logger
 # -------------------
 # Main function to insert file record
@@ -25,6 +30,7 @@ embedding_model = GoogleGenerativeAIEmbeddings(
     task_type="retrieval_document",
 )
 collection_name = "Slide_Embeddings"
+cached_embedding_model = CachedEmbeddings(embedding_model)
 
 
 
@@ -68,7 +74,7 @@ def insert_file_record_full(metadata_nomrs, polished_docs, file_path, summary):
         if isinstance(t, str) and t.strip()
     ] or ["unknown technology"]
 
-    with create_session() as session:
+    with telemetry.span("insert"), create_session() as session:
         try:
             logger.info("Inserting related entities.")
             client_id = insert_client(session, client_name)
@@ -77,9 +83,10 @@ def insert_file_record_full(metadata_nomrs, polished_docs, file_path, summary):
             if domain_id:
                 link_project_domain(session, project_id, domain_id)
             insert_technologies(session, project_id, technologies_list)
-            insert_document(session, project_id,project_name, doc_type, summary, file_path)
-            add_to_vector_store(session, polished_docs)
+            document_id = insert_document(session, project_id,project_name, doc_type, summary, file_path)
+            sync_project_chunks(session, project_id, document_id, polished_docs)
             session.commit()
+            commit_lookup_cache(session)
             logger.info(f"✅ Inserted project '{project_name}' with {len(polished_docs)} chunks")
         except Exception as e:
             session.rollback()
@@ -89,18 +96,52 @@ def insert_file_record_full(metadata_nomrs, polished_docs, file_path, summary):
 def safe_lower(value, default):
     return str(value).lower() if value else default
 
-def get_or_insert(session, table, name):
-    logger.info(f"Getting or inserting {name} into {table.name}.")
-    stmt = pg_insert(table).values(name=name).on_conflict_do_nothing()
-    session.execute(stmt)
-    row = session.execute(table.select().where(table.c.name == name)).fetchone()
-    return row.id if row else None
+# Process-local name -> id cache for the client/domain/technology lookup tables.
+# Ids created inside a transaction are only published after it commits.
+_lookup_cache: dict[str, dict[str, int]] = {}
+_lookup_cache_lock = threading.Lock()
+
+def _cached_ids(session, table) -> dict[str, int]:
+    """Return the committed name -> id map for a lookup table, warming it on first use."""
+    with _lookup_cache_lock:
+        cache = _lookup_cache.get(table.name)
+    if cache is None:
+        logger.info(f"Warming lookup cache from {table.name}.")
+        rows = session.execute(select(table.c.name, table.c.id)).fetchall()
+        with _lookup_cache_lock:
+            cache = _lookup_cache.setdefault(table.name, {})
+            cache.update({row.name: row.id for row in rows})
+    return cache
+
+def upsert_names(session, table, names) -> dict[str, int]:
+    """Resolve names to ids, inserting missing ones with a single multi-row upsert."""
+    names = list(dict.fromkeys(name for name in names if name))
+    cache = _cached_ids(session, table)
+    ids = {name: cache[name] for name in names if name in cache}
+    missing = [name for name in names if name not in ids]
+    if missing:
+        logger.info(f"Upserting {len(missing)} names into {table.name}.")
+        stmt = pg_insert(table).values([{"name": name} for name in missing])
+        # No-op update so existing rows are returned as well
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.name], set_={"name": stmt.excluded.name}
+        ).returning(table.c.name, table.c.id)
+        created = {row.name: row.id for row in session.execute(stmt)}
+        ids.update(created)
+        session.info.setdefault("lookup_cache_pending", []).append((table.name, created))
+    return ids
+
+def commit_lookup_cache(session):
+    """Publish ids resolved in the just-committed transaction to the process cache."""
+    with _lookup_cache_lock:
+        for table_name, created in session.info.pop("lookup_cache_pending", []):
+            _lookup_cache.setdefault(table_name, {}).update(created)
 
 def insert_client(session, client_name):
     logger.info(f"Inserting client: {client_name}")
     if not client_name:
         return None
-    return get_or_insert(session, clients, client_name)
+    return upsert_names(session, clients, [client_name]).get(client_name)
 
 def insert_project(session, project_name, client_id, metadata):
     logger.info(f"Inserting project: {project_name}")
@@ -120,7 +161,7 @@ def insert_domain(session, domain_name):
     logger.info(f"Inserting domain: {domain_name}")
     if not domain_name:
         return None
-    return get_or_insert(session, domains, domain_name)
+    return upsert_names(session, domains, [domain_name]).get(domain_name)
 
 def link_project_domain(session, project_id, domain_id):
     logger.info(f"Linking project ID {project_id} with domain ID {domain_id}.")
@@ -129,36 +170,179 @@ def link_project_domain(session, project_id, domain_id):
 
 def insert_technologies(session, project_id, technologies_list):
     logger.info(f"Inserting technologies for project ID {project_id}.")
-    for tech_name in technologies_list:
-        tech_id = get_or_insert(session, technology, tech_name)
-        if tech_id:
-            stmt = pg_insert(project_technologies).values(project_id=project_id, technology_id=tech_id).on_conflict_do_nothing()
-            session.execute(stmt)
+    tech_ids = upsert_names(session, technology, technologies_list)
+    if tech_ids:
+        stmt = pg_insert(project_technologies).values([
+            {"project_id": project_id, "technology_id": tech_id} for tech_id in set(tech_ids.values())
+        ]).on_conflict_do_nothing()
+        session.execute(stmt)
+        telemetry.record(rows=len(set(tech_ids.values())))
 
 def insert_document(session, project_id, project_name, doc_type, summary, file_path):
-    logger.info(f"Inserting document for project ID {project_id}.")
-    doc_content = [{"text": summary}]
+    """Insert or refresh the project's document row for file_path and return its id."""
+    logger.info(f"Upserting document for project ID {project_id}.")
+    values = {
+        "name": project_name,
+        "type": doc_type,
+        "content": json.dumps([{"text": summary}], ensure_ascii=False),
+    }
+    document_id = session.execute(
+        select(documents.c.id)
+        .where(documents.c.project_id == project_id, documents.c.file_path == file_path)
+        .order_by(documents.c.id)
+        .limit(1)
+    ).scalar_one_or_none()
+    if document_id is None:
+        document_id = session.execute(
+            insert(documents).values(project_id=project_id, file_path=file_path, **values)
+            .returning(documents.c.id)
+        ).scalar_one()
+    else:
+        session.execute(update(documents).where(documents.c.id == document_id).values(**values))
+    telemetry.record(rows=1)
+    return document_id
+
+def get_or_create_collection(session, name) -> uuid.UUID:
+    """Return the vector store collection's uuid, creating the row on a fresh database."""
+    collection_id = session.execute(
+        select(langchain_collections.c.uuid).where(langchain_collections.c.name == name)
+    ).scalar_one_or_none()
+    if collection_id is not None:
+        return collection_id
+    # Serialize creation: the table has no unique constraint on name to conflict on.
+    session.execute(select(func.pg_advisory_xact_lock(func.hashtext(name))))
     session.execute(
-        insert(documents).values(
-            project_id=project_id,
-            name=project_name,
-            type=doc_type,
-            content=json.dumps(doc_content, ensure_ascii=False),
-            file_path=file_path
-        )
+        pg_insert(langchain_collections)
+        .values(uuid=uuid.uuid4(), name=name, cmetadata={})
+        .on_conflict_do_nothing()
     )
+    return session.execute(
+        select(langchain_collections.c.uuid).where(langchain_collections.c.name == name)
+        .order_by(langchain_collections.c.uuid)
+        .limit(1)
+    ).scalar_one()
 
-def add_to_vector_store(session, polished_docs):
-    logger.info("Adding documents to vector store.")
-    vector_store = PGVector.from_existing_index(
-        connection=session.bind,
-        embedding=embedding_model,
-        collection_name=collection_name,
-        use_jsonb=True,
-    )
-    vector_store.add_documents(polished_docs)
+def sync_project_chunks(session, project_id, document_id, polished_docs):
+    """Bring the document's chunks in the vector store in line with polished_docs.
+
+    Chunks are grouped per slide and compared by slide_fingerprint: unchanged
+    slides are left alone, changed or new slides are re-embedded and
+    replaced, and slides that disappeared are deleted. Only chunks of this
+    document are diffed; project chunks written before chunks carried a
+    document_id cannot be attributed and are replaced wholesale; chunks without
+    even a project_id are cleaned up by backfill_legacy_chunks. New chunks that are
+    near-duplicates (see near_dup) are stored with ``duplicate_of`` and reuse
+    the matched vector; CHUNK_DEDUP_MODE=skip drops repeats within a slide. Everything runs on the
+    caller's session so it commits or rolls back with the rest of the file.
+    """
+    logger.info(f"Syncing vector store chunks for project ID {project_id}, document ID {document_id}.")
+    collection_id = get_or_create_collection(session, collection_name)
+    cmetadata_col = langchain_embeddings.c.cmetadata
+
+    old_slides = defaultdict(lambda: {"ids": [], "fingerprints": set()})
+    legacy_ids = []
+    for row in session.execute(
+        select(langchain_embeddings.c.id, cmetadata_col).where(
+            langchain_embeddings.c.collection_id == collection_id,
+            cmetadata_col["project_id"].astext == str(project_id),
+            or_(
+                cmetadata_col["document_id"].astext == str(document_id),
+                not_(cmetadata_col.has_key("document_id")),
+            ),
+        )
+    ):
+        if "document_id" not in row.cmetadata:
+            legacy_ids.append(row.id)
+            continue
+        slide = old_slides[row.cmetadata.get("slide_number")]
+        slide["ids"].append(row.id)
+        slide["fingerprints"].add(row.cmetadata.get("slide_fingerprint"))
+    if legacy_ids:
+        logger.warning(
+            f"{len(legacy_ids)} chunks of project {project_id} predate document_id; doing a full replace."
+        )
+        for slide in old_slides.values():
+            legacy_ids.extend(slide["ids"])
+        old_slides.clear()
+
+    new_slides = defaultdict(list)
+    for doc in polished_docs:
+        new_slides[doc.metadata.get("slide_number")].append(doc)
 
+    unchanged = {
+        slide_num for slide_num, docs in new_slides.items()
+        if slide_num in old_slides
+        and old_slides[slide_num]["fingerprints"] == {docs[0].metadata.get("slide_fingerprint")}
+    }
+    stale_ids = legacy_ids + [
+        chunk_id for slide_num, slide in old_slides.items()
+        if slide_num not in unchanged for chunk_id in slide["ids"]
+    ]
+    to_insert = [doc for slide_num, docs in new_slides.items() if slide_num not in unchanged for doc in docs]
 
+    signatures, duplicates = [], {}
+    if Config.CHUNK_DEDUP_MODE != "off" and to_insert:
+        signatures, duplicates = find_near_duplicates(
+            session, collection_id, [doc.page_content for doc in to_insert], stale_ids
+        )
+    skipped = 0
+    if Config.CHUNK_DEDUP_MODE == "skip" and duplicates:
+        # Only repeats within one slide are dropped: they are replaced or deleted
+        # together with the chunk they repeat. Anything else is linked instead.
+        drop = {
+            i for i, match in duplicates.items()
+            if isinstance(match, int)
+            and to_insert[match].metadata.get("slide_number") == to_insert[i].metadata.get("slide_number")
+        }
+        keep = [i for i in range(len(to_insert)) if i not in drop]
+        position = {i: n for n, i in enumerate(keep)}
+        skipped = len(drop)
+        duplicates = {
+            position[i]: match if isinstance(match, str) else position[match]
+            for i, match in duplicates.items() if i not in drop
+        }
+        to_insert = [to_insert[i] for i in keep]
+        signatures = [signatures[i] for i in keep]
+    logger.info(
+        f"Slides unchanged: {len(unchanged)}, chunks deleted: {len(stale_ids)}, chunks inserted: {len(to_insert)}, "
+        f"near-duplicates skipped: {skipped}, linked: {len(duplicates)}."
+    )
 
+    # Linked duplicates reuse the vector of the chunk they duplicate instead of being embedded
+    embed_indexes = [i for i in range(len(to_insert)) if i not in duplicates]
+    with telemetry.span("embed"):
+        embedded = dict(zip(embed_indexes, cached_embedding_model.embed_documents(
+            [to_insert[i].page_content for i in embed_indexes]
+        ))) if embed_indexes else {}
+    linked_ids = [match for match in duplicates.values() if isinstance(match, str)]
+    linked = dict(session.execute(
+        select(langchain_embeddings.c.id, langchain_embeddings.c.embedding)
+        .where(langchain_embeddings.c.id.in_(linked_ids))
+    ).all()) if linked_ids else {}
 
+    ids = [str(uuid.uuid4()) for _ in to_insert]
+    rows = []
+    for i, doc in enumerate(to_insert):
+        cmetadata = {**{k: make_json_safe(v) for k, v in doc.metadata.items()}, "project_id": project_id, "document_id": document_id}
+        match = duplicates.get(i)
+        if match is None:
+            vector = embedded[i]
+        elif isinstance(match, str):
+            vector, cmetadata["duplicate_of"] = linked[match], match
+        else:
+            vector, cmetadata["duplicate_of"] = embedded[match], ids[match]
+        rows.append({
+            "id": ids[i],
+            "collection_id": collection_id,
+            "embedding": vector,
+            "document": doc.page_content,
+            "cmetadata": cmetadata,
+        })
 
+    if stale_ids:
+        session.execute(delete(langchain_embeddings).where(langchain_embeddings.c.id.in_(stale_ids)))
+    if rows:
+        session.execute(insert(langchain_embeddings), rows)
+    if signatures:
+        session.execute(insert(chunk_signatures), signature_rows(ids, signatures))
+    telemetry.record(rows=len(stale_ids) + len(rows) + len(signatures))
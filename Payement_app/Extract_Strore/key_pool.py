@@ -0,0 +1,103 @@
+# key_pool.py
+"""Shared, thread-safe pool of Gemini API keys for the ingestion pipeline.
+
+Each key gets one cached client and its own cooldown. A throttled key is
+parked until the retry delay the server asked for has passed, and callers
+are handed the usable key that was throttled least recently.
+"""
+import re
+import time
+import threading
+from dataclasses import dataclass
+from langchain_google_genai import ChatGoogleGenerativeAI
+from log import logger
+
+_RETRY_DELAY_RE = re.compile(r"retry[_ ]?delay\D*?(\d+(?:\.\d+)?)|retry in (\d+(?:\.\d+)?)\s*s", re.IGNORECASE)
+
+
+@dataclass
+class KeyStats:
+    calls: int = 0
+    throttled: int = 0
+    wait_seconds: float = 0.0
+    last_throttled_at: float = 0.0
+    cooldown_until: float = 0.0
+
+
+class NoKeyAvailableError(RuntimeError):
+    """Raised when no key is configured or every key cools down longer than the caller will wait."""
+
+
+def retry_delay_seconds(exc) -> float | None:
+    """Read the server-suggested retry delay from a 429 error, if it has one."""
+    for detail in getattr(exc, "details", None) or []:
+        delay = getattr(detail, "retry_delay", None)
+        if delay is not None:
+            return delay.seconds + delay.nanos / 1e9
+    match = _RETRY_DELAY_RE.search(str(exc))
+    if match:
+        return float(match.group(1) or match.group(2))
+    return None
+
+
+class GeminiKeyPool:
+    """Hand out API keys and cached clients, honouring per-key cooldowns."""
+
+    def __init__(self, api_keys, model: str, default_cooldown: float, max_wait: float):
+        self.api_keys = [key for key in api_keys if key]
+        self.model = model
+        self.default_cooldown = default_cooldown
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._stats = {key: KeyStats() for key in self.api_keys}
+
+    def client(self, key: str) -> ChatGoogleGenerativeAI:
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = ChatGoogleGenerativeAI(model=self.model, google_api_key=key)
+            return client
+
+    def acquire(self) -> str:
+        """Return the usable key throttled least recently, waiting out cooldowns if needed."""
+        if not self.api_keys:
+            raise NoKeyAvailableError("No Gemini API keys configured.")
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                ready = [key for key in self.api_keys if self._stats[key].cooldown_until <= now]
+                if ready:
+                    key = min(ready, key=lambda k: (self._stats[k].last_throttled_at, self._stats[k].calls))
+                    self._stats[key].calls += 1
+                    return key
+                key = min(self.api_keys, key=lambda k: self._stats[k].cooldown_until)
+                wait = self._stats[key].cooldown_until - now
+            if wait > self.max_wait:
+                raise NoKeyAvailableError(f"All API keys cooling down for at least {wait:.1f}s.")
+            logger.info(f"All API keys cooling down, waiting {wait:.1f}s.")
+            time.sleep(wait)
+            with self._lock:
+                self._stats[key].wait_seconds += wait
+
+    def report_throttled(self, key: str, retry_delay: float | None = None):
+        """Park a key after a 429 for the server's retry delay (or the default)."""
+        delay = self.default_cooldown if retry_delay is None else retry_delay
+        with self._lock:
+            stats = self._stats[key]
+            stats.throttled += 1
+            stats.last_throttled_at = time.monotonic()
+            stats.cooldown_until = max(stats.cooldown_until, stats.last_throttled_at + delay)
+        logger.warning(f"Rate limit hit on key ...{key[-6:]}, cooling down for {delay:.1f}s.")
+
+    def stats(self) -> dict:
+        """Per-key counters, keyed by the last six characters of the key."""
+        with self._lock:
+            return {
+                f"...{key[-6:]}": {
+                    "calls": s.calls,
+                    "throttled": s.throttled,
+                    "wait_seconds": round(s.wait_seconds, 3),
+                }
+                for key, s in self._stats.items()
+            }
@@ -1,6 +1,8 @@
 # metadata_resolver.py
 import json
+from config import Config
 from .chunking import call_model
+from .canonicalizer import canonicalize_metadata
 
 from langchain_core.prompts import ChatPromptTemplate
 import re
@@ -72,4 +74,124 @@ def resolve_metadata(file_record, details_dict):
             "technology": (raw_metadata["technology_ppt"] or raw_metadata["technology_csv"] or "Unknown Technology"),
             "file_type":(raw_metadata["file_type_ppt"] or raw_metadata["file_type_ppt"] or "Unknown Type")
         }
-    return final_metadata
\ No newline at end of file
+    return canonicalize_metadata(final_metadata)
+
+_COMPANY_SUFFIX_RE = re.compile(r"[,\s]+(llc|inc\.?|ltd\.?|limited|corp\.?|corporation|pvt\.?\s*ltd\.?)$", re.IGNORECASE)
+_PROJECT_TERMS_RE = re.compile(r"\b(case study|rfp|proposal)\b", re.IGNORECASE)
+
+
+def _normalize_client(name: str) -> str:
+    return _COMPANY_SUFFIX_RE.sub("", name.strip()).strip().lower()
+
+
+def _normalize_project(name: str) -> str:
+    name = re.sub(r"\.pptx?$", "", name.strip(), flags=re.IGNORECASE)
+    name = _PROJECT_TERMS_RE.sub("", name)
+    return re.sub(r"[\s\-_]+", " ", name).strip(" -_").lower()
+
+
+def _normalize_file_type(value) -> str:
+    value = str(value or "").lower()
+    if "rfp" in value or "request for proposal" in value:
+        return "rfp"
+    if "case" in value:
+        return "case study"
+    return "unknown_type"
+
+
+def has_complete_metadata(file_record) -> bool:
+    """True when the uploader supplied every field resolve_metadata would produce."""
+    return all([
+        str(file_record.get("client_name") or "").strip(),
+        str(file_record.get("project_name") or "").strip(),
+        str(file_record.get("domain") or "").strip(),
+        [t for t in file_record.get("technology") or [] if str(t).strip()],
+        _normalize_file_type(file_record.get("file_type")) != "unknown_type",
+    ])
+
+
+def deterministic_metadata(file_record) -> dict:
+    """Apply the resolve_metadata normalization rules locally to uploader metadata."""
+    return {
+        "client_name": _normalize_client(file_record["client_name"]),
+        "project_name": _normalize_project(file_record["project_name"]),
+        "domain": file_record["domain"].strip().lower(),
+        "technology": [t.strip().lower() for t in file_record["technology"] if str(t).strip()],
+        "file_type": _normalize_file_type(file_record.get("file_type")),
+    }
+
+
+def extract_and_resolve_metadata(file_record, polished_text: str) -> dict:
+    """Extract deck metadata and reconcile it with the uploader's values in one LLM call.
+
+    Skips the extraction call when the uploader already supplied every field;
+    only domain/technology names the local canonicalizer cannot place may
+    still go to the canonicalization fallback (CANONICAL_LLM_FALLBACK).
+    """
+    if has_complete_metadata(file_record):
+        logger.info("Uploader metadata complete; skipping LLM metadata extraction.")
+        return canonicalize_metadata(deterministic_metadata(file_record))
+
+    logger.info("Extracting and resolving metadata using a single LLM call.")
+    csv_metadata = {
+        "client_name": file_record.get("client_name"),
+        "project_name": file_record.get("project_name"),
+        "domain": file_record.get("domain"),
+        "technology": file_record.get("technology", []),
+        "file_type": file_record.get("file_type"),
+    }
+    prompt_template = ChatPromptTemplate.from_messages([
+        ("system", "You are a data extraction and cleaning assistant."),
+        ("user", """I will give you metadata from the uploader (CSV) and the content of a presentation (PPT).
+        Extract client name, project name, domain, technology and file type from the PPT content,
+        then merge them with the CSV metadata into a single consistent JSON.
+        Rules:
+        1. Always give higher priority to the CSV values.
+        - Use the CSV value whenever it exists; otherwise use the value found in the PPT.
+        - If neither has a value, return the default:
+         "unknown_client", "unknown_project", "unknown_domain", "unknown_type", and [] for technology.
+        - Do not use Innovature.ai as client name under any circumstance; innovature is our company, not the client.
+        - Project name is usually placed on the first slide.
+        2. Normalize text:
+        - Normalize synonyms and abbreviations to canonical forms ("dev" → "development", "tech" → "technology").
+        - Classify the domain into a broad, top-level category such as Tourism, Healthcare, Finance, Business,
+          Hospitality, Food & Beverage, Retail, Event Management, Logistics, E-Commerce, Security Services,
+          Waste Management, Marketing, Education, Human Resources, Fitness & Health, IT Infrastructure,
+          Information Technology, Automotive, Entertainment, Risk Management
+          ("fintech" → "Finance", "school management system" → "Education").
+        - Do not include words like "industry", "sector", "domain" or "field" in the domain.
+        - Remove company suffixes like "LLC", "Inc.", "Ltd." unless needed for clarity.
+        - Do not add "Case Study", "RFP", "Proposal" or similar terms to the project_name.
+        - Always return lowercase text.
+        3. file_type must be "rfp" or "case study", or "unknown_type" if it cannot be determined.
+        4. Return valid JSON only, with exactly these keys:
+        client_name, project_name, domain, technology (JSON array), file_type
+
+        CSV Metadata:
+        {metadata}
+
+        PPT Content:
+        {content}""")
+    ])
+    formatted_prompt = prompt_template.format_messages(
+        metadata=json.dumps(csv_metadata, indent=2, ensure_ascii=False),
+        content=polished_text[:Config.METADATA_CONTEXT_CHARS],
+    )
+    response = call_model(formatted_prompt)
+    raw_out = getattr(response, "content", str(response))
+    cleaned_output = re.sub(r"(^```(?:json)?)|(```$)", "", raw_out.strip(), flags=re.MULTILINE)
+    try:
+        final_metadata = json.loads(cleaned_output)
+        logger.info("✅ Metadata extracted and resolved via LLM.")
+    except json.JSONDecodeError:
+        logger.error("⚠️ LLM returned invalid JSON, falling back to CSV metadata.")
+        final_metadata = {
+            "client_name": csv_metadata["client_name"] or "unknown_client",
+            "project_name": csv_metadata["project_name"] or "unknown_project",
+            "domain": csv_metadata["domain"] or "unknown_domain",
+            "technology": csv_metadata["technology"] or [],
+            "file_type": _normalize_file_type(csv_metadata["file_type"]),
+        }
+    if not isinstance(final_metadata.get("technology"), list):
+        final_metadata["technology"] = []
+    return canonicalize_metadata(final_metadata)
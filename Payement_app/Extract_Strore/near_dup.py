@@ -0,0 +1,119 @@
+# near_dup.py
+"""SimHash near-duplicate detection for chunks before they are embedded.
+
+Every stored chunk keeps a 64-bit SimHash in ``chunk_signature``. Postgres
+filters the collection's signatures by exact Hamming distance
+(``bit_count(simhash # signature)``, PostgreSQL 14+), so only real matches
+leave the database, whatever the threshold. Banded index lookups were
+dropped: at useful thresholds (9 bits) the bands are too narrow to filter.
+"""
+import re
+import hashlib
+import numpy as np
+from sqlalchemy import BigInteger, bindparam, cast, func, select
+from sqlalchemy.dialects.postgresql import ARRAY, BIT
+from config import Config
+from .db_schema import chunk_signatures, langchain_embeddings
+
+from log import logger
+
+SIGNATURE_BITS = 64
+_WORD_RE = re.compile(r"\w+")
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """64-bit SimHash of the text's lowercase word shingles."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) > shingle_size:
+        shingles = [" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+    else:
+        shingles = [" ".join(words)]
+    hashes = np.array(
+        [hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest() for s in shingles], dtype="S8"
+    ).view(np.uint8)
+    bits = np.unpackbits(hashes).reshape(len(shingles), SIGNATURE_BITS)
+    majority = (bits.sum(axis=0) * 2 > len(shingles)).astype(np.uint8)
+    return int.from_bytes(np.packbits(majority).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def max_distance() -> int:
+    """Largest Hamming distance counted as a duplicate under the configured threshold."""
+    distance = int(round((1 - Config.CHUNK_DEDUP_THRESHOLD) * SIGNATURE_BITS, 6))
+    return min(max(distance, 0), SIGNATURE_BITS - 1)
+
+
+def to_signed(signature: int) -> int:
+    """Map an unsigned 64-bit signature onto Postgres BIGINT."""
+    return signature - (1 << SIGNATURE_BITS) if signature >= 1 << (SIGNATURE_BITS - 1) else signature
+
+
+def to_unsigned(signature: int) -> int:
+    return signature + (1 << SIGNATURE_BITS) if signature < 0 else signature
+
+
+def signature_rows(embedding_ids, signatures) -> list[dict]:
+    """chunk_signature rows for freshly inserted embedding rows."""
+    return [
+        {"embedding_id": embedding_id, "simhash": to_signed(sig)}
+        for embedding_id, sig in zip(embedding_ids, signatures)
+    ]
+
+
+def stored_matches_query(collection_id, signatures, limit):
+    """Stored chunks of the collection within ``limit`` bits of any signature.
+
+    Rows carry ``idx``, the 1-based position of the matching signature.
+    """
+    probes = (
+        func.unnest(bindparam("signatures", [to_signed(sig) for sig in signatures], type_=ARRAY(BigInteger)))
+        .table_valued("sig", with_ordinality="idx")
+        .render_derived(name="probe")
+    )
+    distance = func.bit_count(cast(chunk_signatures.c.simhash.op("#")(probes.c.sig), BIT(SIGNATURE_BITS)))
+    return (
+        select(probes.c.idx, chunk_signatures.c.embedding_id, chunk_signatures.c.simhash)
+        .select_from(chunk_signatures)
+        .join(langchain_embeddings, langchain_embeddings.c.id == chunk_signatures.c.embedding_id)
+        .join(probes, distance <= bindparam("max_distance", limit))
+        .where(langchain_embeddings.c.collection_id == collection_id)
+    )
+
+
+def find_near_duplicates(session, collection_id, texts, exclude_ids=()) -> tuple[list[int], dict[int, str | int]]:
+    """Return (signatures, duplicates) for texts about to be embedded.
+
+    ``duplicates`` maps a text's index to the id of the stored chunk it
+    duplicates, or to the index of an earlier text in the same call.
+    Stored chunks in ``exclude_ids`` (e.g. rows being replaced) are ignored.
+    """
+    signatures = [simhash(text) for text in texts]
+    limit = max_distance()
+    duplicates = {}
+    if not texts:
+        return signatures, duplicates
+
+    # Closest stored match per text; rows being replaced do not count
+    matches = {}
+    excluded = set(exclude_ids)
+    for row in session.execute(stored_matches_query(collection_id, signatures, limit)):
+        if row.embedding_id in excluded:
+            continue
+        index, distance = row.idx - 1, hamming(signatures[row.idx - 1], to_unsigned(row.simhash))
+        if index not in matches or distance < matches[index][1]:
+            matches[index] = (row.embedding_id, distance)
+
+    seen = []
+    for index, sig in enumerate(signatures):
+        match = matches[index][0] if index in matches else None
+        if match is None:
+            match = next((j for j in seen if hamming(sig, signatures[j]) <= limit), None)
+        if match is None:
+            seen.append(index)
+        else:
+            duplicates[index] = match
+    logger.info(f"Near-duplicate check: {len(duplicates)} of {len(texts)} chunks duplicate existing content.")
+    return signatures, duplicates
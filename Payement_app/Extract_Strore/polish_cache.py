@@ -0,0 +1,103 @@
+import time
+import hashlib
+import threading
+from datetime import datetime, timedelta, timezone
+from config import Config
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from .db_utils import create_session
+from .db_schema import slide_polish_cache
+
+from log import logger
+
+_eviction_lock = threading.Lock()
+_last_eviction = 0.0
+
+
+def cache_key(merged_text: str, prompt_version: str) -> str:
+    """Return the content address for a slide's merged text under a prompt version."""
+    return hashlib.sha256(f"{prompt_version}\n{merged_text}".encode("utf-8")).hexdigest()
+
+
+def get_cached(keys) -> dict[str, str]:
+    """Return {key: polished_text} for every key already in the cache."""
+    keys = list(set(keys))
+    if not Config.POLISH_CACHE_ENABLED or not keys:
+        return {}
+    try:
+        with create_session() as session:
+            rows = session.execute(
+                select(slide_polish_cache.c.content_hash, slide_polish_cache.c.polished_text)
+                .where(slide_polish_cache.c.content_hash.in_(keys))
+            ).fetchall()
+            if rows:
+                session.execute(
+                    update(slide_polish_cache)
+                    .where(slide_polish_cache.c.content_hash.in_([row.content_hash for row in rows]))
+                    .values(last_used_at=datetime.now(timezone.utc))
+                )
+                session.commit()
+        logger.info(f"Polish cache: {len(rows)} hits, {len(keys) - len(rows)} misses.")
+        return {row.content_hash: row.polished_text for row in rows}
+    except Exception as e:
+        logger.warning(f"Polish cache lookup failed, polishing without cache: {e}")
+        return {}
+
+
+def store_cached(entries: dict[str, str]):
+    """Upsert polished texts by key; stale or excess entries are evicted periodically."""
+    if not Config.POLISH_CACHE_ENABLED or not entries:
+        return
+    now = datetime.now(timezone.utc)
+    try:
+        with create_session() as session:
+            stmt = pg_insert(slide_polish_cache).values([
+                {"content_hash": key, "polished_text": text, "created_at": now, "last_used_at": now}
+                for key, text in entries.items()
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[slide_polish_cache.c.content_hash],
+                set_={"polished_text": stmt.excluded.polished_text, "last_used_at": now},
+            )
+            session.execute(stmt)
+            session.commit()
+    except Exception as e:
+        logger.warning(f"Failed to store {len(entries)} polished slides in cache: {e}")
+        return
+    _maybe_evict(now)
+
+
+def _maybe_evict(now):
+    """Evict at most once per POLISH_CACHE_EVICT_INTERVAL_SECONDS per process, and one process at a time."""
+    global _last_eviction
+    with _eviction_lock:
+        if time.monotonic() - _last_eviction < Config.POLISH_CACHE_EVICT_INTERVAL_SECONDS:
+            return
+        _last_eviction = time.monotonic()
+    try:
+        with create_session() as session:
+            # Another process already evicting makes this run redundant
+            if not session.execute(select(func.pg_try_advisory_xact_lock(func.hashtext(slide_polish_cache.name)))).scalar():
+                return
+            deleted = _evict(session, now)
+            session.commit()
+        if deleted:
+            logger.info(f"Polish cache: evicted {deleted} entries.")
+    except Exception as e:
+        logger.warning(f"Polish cache eviction failed: {e}")
+
+
+def _evict(session, now) -> int:
+    """Drop entries unused for longer than the max age or beyond the newest max-size entries.
+
+    Both bounds are last_used_at cutoffs; the size cutoff is read by walking
+    the last_used_at index, so nothing is sorted and no key list is built.
+    """
+    last_used_at = slide_polish_cache.c.last_used_at
+    stale = last_used_at < now - timedelta(days=Config.POLISH_CACHE_MAX_AGE_DAYS)
+    first_excess = session.execute(
+        select(last_used_at).order_by(last_used_at.desc()).offset(Config.POLISH_CACHE_MAX_ENTRIES).limit(1)
+    ).scalar()
+    if first_excess is not None:
+        stale = or_(stale, last_used_at <= first_excess)
+    return session.execute(delete(slide_polish_cache).where(stale)).rowcount
@@ -0,0 +1,143 @@
+# telemetry.py
+"""Per-stage spans for the ingestion pipeline, written as JSON lines.
+
+A ``trace`` covers one file and ``span`` one stage inside it. Code doing the
+work calls ``record`` (LLM calls, prompt/response characters, embeddings,
+rows) and every open span in the current context is credited. Work handed
+to thread pools must be wrapped with ``bind`` so it runs in the submitting
+context.
+"""
+import os
+import json
+import time
+import uuid
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from config import Config
+from log import logger
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+COUNTERS = ("llm_calls", "prompt_chars", "response_chars", "embeddings", "rows")
+
+_current_trace = contextvars.ContextVar("ingestion_trace", default=None)
+_open_spans = contextvars.ContextVar("ingestion_spans", default=())
+_write_lock = threading.Lock()
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process so far, in MiB."""
+    if resource is None:
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+class Trace:
+    """Spans collected for one file."""
+
+    def __init__(self, file_path: str, trace_id: str | None = None):
+        self.file_path = file_path
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, record: dict):
+        with self._lock:
+            self.spans.append(record)
+
+    def summary(self) -> dict:
+        """Spans plus per-counter totals, suitable for a JSON column."""
+        with self._lock:
+            spans = list(self.spans)
+        top_level = [s for s in spans if s["depth"] == 0]
+        totals = {name: sum(s[name] for s in top_level) for name in COUNTERS}
+        totals["wall_seconds"] = round(sum(s["wall_seconds"] for s in top_level), 3)
+        return {"trace_id": self.trace_id, "spans": spans, "totals": totals}
+
+
+class _Span:
+    def __init__(self, stage: str, depth: int):
+        self.stage = stage
+        self.depth = depth
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.lock = threading.Lock()
+
+
+def _emit(record: dict):
+    if not Config.TELEMETRY_ENABLED:
+        return
+    try:
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with _write_lock:
+            os.makedirs(os.path.dirname(os.path.abspath(Config.TELEMETRY_FILE)), exist_ok=True)
+            with open(Config.TELEMETRY_FILE, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    except Exception as e:
+        logger.warning(f"Failed to write ingestion span: {e}")
+
+
+@contextmanager
+def trace(file_path: str, trace_id: str | None = None):
+    """Collect the spans of one file; yields the Trace."""
+    current = Trace(file_path, trace_id)
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(stage: str):
+    """Time a pipeline stage and emit it as a JSON line when it ends."""
+    parents = _open_spans.get()
+    current = _Span(stage, len(parents))
+    token = _open_spans.set(parents + (current,))
+    started_at = datetime.now(timezone.utc)
+    start = time.perf_counter()
+    status, error = "ok", None
+    try:
+        yield current
+    except BaseException as e:
+        status, error = "error", str(e)
+        raise
+    finally:
+        _open_spans.reset(token)
+        owner = _current_trace.get()
+        with current.lock:
+            counters = dict(current.counters)
+        record = {
+            "trace_id": owner.trace_id if owner else None,
+            "file": owner.file_path if owner else None,
+            "stage": stage,
+            "depth": current.depth,
+            "started_at": started_at.isoformat(),
+            "wall_seconds": round(time.perf_counter() - start, 3),
+            **counters,
+            "peak_rss_mb": peak_rss_mb(),
+            "status": status,
+            "error": error,
+        }
+        if owner:
+            owner.add(record)
+        _emit(record)
+        logger.info(f"Stage {stage} finished in {record['wall_seconds']}s ({status}).")
+
+
+def record(**counts):
+    """Add counts (see COUNTERS) to every span open in the current context."""
+    for current in _open_spans.get():
+        with current.lock:
+            for name, value in counts.items():
+                current.counters[name] += value
+
+
+def bind(fn):
+    """Return fn bound to a copy of the caller's context, for thread pool submission."""
+    return functools.partial(contextvars.copy_context().run, fn)
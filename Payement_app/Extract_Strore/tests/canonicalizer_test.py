@@ -0,0 +1,64 @@
+"""Tests for the local domain/technology canonicalizer"""
+
+import unittest
+from unittest.mock import patch
+from config import Config
+from Extract_Strore import canonicalizer
+from Extract_Strore.canonicalizer import Canonicalizer, canonicalize_metadata, normalize_name
+
+
+class CanonicalizerTest(unittest.TestCase):
+    def setUp(self):
+        self.canonicalizer = Canonicalizer(
+            aliases={"domain": {"Fintech": "Finance"}, "technology": {"k8s": "Kubernetes"}},
+            known={"domain": ["finance", "education"], "technology": ["postgresql", "kubernetes", "java"]},
+            threshold=0.6,
+            min_fuzzy_length=4,
+        )
+
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name("  Finance   Sector "), "finance")
+        self.assertEqual(normalize_name(".NET"), ".net")
+
+    def test_alias_and_exact_match(self):
+        self.assertEqual(self.canonicalizer.match("domain", "FinTech"), "finance")
+        self.assertEqual(self.canonicalizer.match("technology", "K8S"), "kubernetes")
+        self.assertEqual(self.canonicalizer.match("domain", "Education industry"), "education")
+
+    def test_fuzzy_match(self):
+        self.assertEqual(self.canonicalizer.match("technology", "postgres"), "postgresql")
+        self.assertIsNone(self.canonicalizer.match("technology", "javascript"))
+
+    def test_short_values_are_not_fuzzy_matched(self):
+        self.assertIsNone(self.canonicalizer.match("technology", "jav"))
+
+    def test_learned_values_survive_alias_reload(self):
+        self.canonicalizer.learn("domain", "neobank", "Finance")
+        self.canonicalizer.set_aliases({})
+        self.assertEqual(self.canonicalizer.match("domain", "neobank"), "finance")
+
+
+    def test_llm_fallback_resolves_and_learns_unmatched_values(self):
+        llm = {"technology": {"ReactJS": "React"}}
+        with patch.object(canonicalizer, "_canonicalizer", self.canonicalizer), \
+                patch.object(canonicalizer, "_refresh"), \
+                patch.object(Config, "CANONICAL_LLM_FALLBACK", True), \
+                patch.object(canonicalizer, "_resolve_with_llm", return_value=llm) as resolve:
+            result = canonicalize_metadata({"domain": "Fintech", "technology": ["k8s", "ReactJS"]})
+            canonicalize_metadata({"domain": "Fintech", "technology": ["reactjs"]})
+        resolve.assert_called_once_with({"domain": [], "technology": ["ReactJS"]})
+        self.assertEqual(result["domain"], "finance")
+        self.assertEqual(result["technology"], ["kubernetes", "react"])
+
+    def test_llm_fallback_can_be_disabled(self):
+        with patch.object(canonicalizer, "_canonicalizer", self.canonicalizer), \
+                patch.object(canonicalizer, "_refresh"), \
+                patch.object(Config, "CANONICAL_LLM_FALLBACK", False), \
+                patch.object(canonicalizer, "_resolve_with_llm") as resolve:
+            result = canonicalize_metadata({"technology": ["ReactJS"]})
+        resolve.assert_not_called()
+        self.assertEqual(result["technology"], ["reactjs"])
+
+
+if __name__ == "__main__":
+    unittest.main()
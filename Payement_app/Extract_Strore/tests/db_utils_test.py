@@ -0,0 +1,34 @@
+"""Tests for the ingestion pool's checkout wait accounting"""
+
+import time
+import sqlite3
+import threading
+import unittest
+from unittest import mock
+from Extract_Strore import db_utils
+
+
+def slow_connect(delay):
+    def creator():
+        time.sleep(delay)
+        return sqlite3.connect(":memory:", check_same_thread=False)
+    return creator
+
+
+@mock.patch.object(db_utils, "_pool_stats", dict(db_utils._EMPTY_STATS))
+class TimedQueuePoolTest(unittest.TestCase):
+    def test_connect_time_is_not_wait(self):
+        pool = db_utils._TimedQueuePool(slow_connect(0.1), pool_size=1, max_overflow=0)
+        pool.connect().close()
+        self.assertLess(db_utils._pool_stats["wait_seconds"], 0.05)
+
+    def test_waiting_for_a_busy_connection_is_wait(self):
+        pool = db_utils._TimedQueuePool(slow_connect(0), pool_size=1, max_overflow=0, timeout=5)
+        held = pool.connect()
+        threading.Timer(0.1, held.close).start()
+        pool.connect().close()
+        self.assertGreaterEqual(db_utils._pool_stats["max_wait_seconds"], 0.08)
+
+
+if __name__ == "__main__":
+    unittest.main()
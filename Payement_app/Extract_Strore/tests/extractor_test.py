@@ -0,0 +1,75 @@
+"""Parity tests for the streaming PPTX extractor against the python-pptx walk"""
+
+import os
+import tempfile
+import unittest
+from pptx import Presentation
+from pptx.util import Inches, Pt
+from Extract_Strore.extractor import parse_pptx, iter_pptx_slides
+
+
+def build_deck(path, slide_count=4):
+    """Write a deck with titled, sized, unsized and tabular content."""
+    prs = Presentation()
+    blank = prs.slide_layouts[6]
+    for n in range(slide_count):
+        slide = prs.slides.add_slide(blank)
+        for text, size in ((f"Deck title {n}", 44), (f"Section {n}", 28), (f"Body {n}", 18), (f"Plain {n}", None)):
+            para = slide.shapes.add_textbox(Inches(1), Inches(1), Inches(6), Inches(1)).text_frame.paragraphs[0]
+            run = para.add_run()
+            run.text = text
+            if size:
+                run.font.size = Pt(size)
+        frame = slide.shapes.add_textbox(Inches(1), Inches(3), Inches(6), Inches(1)).text_frame
+        frame.text = "first bullet"
+        frame.add_paragraph().text = "  "
+        frame.add_paragraph().text = "second bullet"
+        table = slide.shapes.add_table(2, 2, Inches(1), Inches(4), Inches(4), Inches(1)).table
+        for r in range(2):
+            for c in range(2):
+                table.cell(r, c).text = f"r{r}c{c}\nline two"
+    prs.save(path)
+
+
+class StreamingExtractorTestCase(unittest.TestCase):
+    """iter_pptx_slides must produce exactly what parse_pptx produces"""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".pptx")
+        os.close(handle)
+        build_deck(self.path)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_parity_with_parse_pptx(self):
+        """Streaming output should match the python-pptx walk slide for slide"""
+        self.assertEqual(list(iter_pptx_slides(self.path)), parse_pptx(self.path))
+
+    def test_font_size_classification(self):
+        """Font sizes should be classified into title, subtitle and body"""
+        slide = next(iter_pptx_slides(self.path))
+        self.assertEqual(slide["title"], "Deck title 0")
+        self.assertEqual(slide["subtitle"], "Section 0")
+        self.assertEqual(slide["text_blocks"], ["Body 0", "Plain 0", "first bullet", "second bullet"])
+        self.assertEqual(slide["tables"], [[["r0c0\nline two", "r0c1\nline two"], ["r1c0\nline two", "r1c1\nline two"]]])
+
+    def test_last_slide_skipped(self):
+        """The closing slide is dropped, as in parse_pptx"""
+        self.assertEqual([s["slide_number"] for s in iter_pptx_slides(self.path)], [1, 2, 3])
+
+    def test_is_lazy(self):
+        """Slides should be yielded one at a time"""
+        slides = iter_pptx_slides(self.path)
+        self.assertEqual(next(slides)["slide_number"], 1)
+        self.assertEqual(next(slides)["slide_number"], 2)
+
+    def test_invalid_file_yields_nothing(self):
+        """A non-PPTX file should log and yield no slides"""
+        with open(self.path, "wb") as f:
+            f.write(b"not a zip")
+        self.assertEqual(list(iter_pptx_slides(self.path)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
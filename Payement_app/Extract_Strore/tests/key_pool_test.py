@@ -0,0 +1,57 @@
+"""Tests for the shared Gemini key pool"""
+
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from Extract_Strore.key_pool import GeminiKeyPool, NoKeyAvailableError, retry_delay_seconds
+
+
+class GeminiKeyPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.pool = GeminiKeyPool(["key-aaaaaa", "key-bbbbbb"], model="test", default_cooldown=5, max_wait=1)
+
+    def test_prefers_least_recently_throttled_key(self):
+        first = self.pool.acquire()
+        self.pool.report_throttled(first, 0)
+        self.assertNotEqual(self.pool.acquire(), first)
+
+    def test_skips_keys_in_cooldown(self):
+        self.pool.report_throttled("key-aaaaaa", 30)
+        for _ in range(3):
+            self.assertEqual(self.pool.acquire(), "key-bbbbbb")
+
+    def test_raises_when_every_key_cools_down_too_long(self):
+        self.pool.report_throttled("key-aaaaaa", 30)
+        self.pool.report_throttled("key-bbbbbb", 30)
+        with self.assertRaises(NoKeyAvailableError):
+            self.pool.acquire()
+
+    def test_pool_without_keys_builds_and_raises_on_acquire(self):
+        pool = GeminiKeyPool(["", None], model="test", default_cooldown=5, max_wait=1)
+        self.assertEqual(pool.api_keys, [])
+        with self.assertRaises(NoKeyAvailableError):
+            pool.acquire()
+
+    def test_waits_out_short_cooldowns_and_counts_wait(self):
+        self.pool.report_throttled("key-aaaaaa", 0.05)
+        self.pool.report_throttled("key-bbbbbb", 0.5)
+        self.assertEqual(self.pool.acquire(), "key-aaaaaa")
+        stats = self.pool.stats()["...aaaaaa"]
+        self.assertEqual(stats["throttled"], 1)
+        self.assertGreater(stats["wait_seconds"], 0)
+
+    def test_clients_are_cached_per_key(self):
+        with mock.patch("Extract_Strore.key_pool.ChatGoogleGenerativeAI") as client_cls:
+            self.assertIs(self.pool.client("key-aaaaaa"), self.pool.client("key-aaaaaa"))
+            self.pool.client("key-bbbbbb")
+        self.assertEqual(client_cls.call_count, 2)
+
+    def test_retry_delay_from_error(self):
+        detail = SimpleNamespace(retry_delay=SimpleNamespace(seconds=12, nanos=500_000_000))
+        self.assertEqual(retry_delay_seconds(SimpleNamespace(details=[detail])), 12.5)
+        self.assertEqual(retry_delay_seconds(Exception("429 Please retry in 7.2s.")), 7.2)
+        self.assertIsNone(retry_delay_seconds(Exception("quota exceeded")))
+
+
+if __name__ == "__main__":
+    unittest.main()
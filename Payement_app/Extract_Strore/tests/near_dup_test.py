@@ -0,0 +1,105 @@
+"""Tests for SimHash near-duplicate detection"""
+
+import random
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from sqlalchemy.dialects import postgresql
+from config import Config
+from Extract_Strore.near_dup import (
+    simhash, hamming, to_signed, to_unsigned, max_distance, signature_rows, find_near_duplicates,
+)
+
+ABOUT_US = (
+    "Innovature is a global software development company delivering web, mobile and cloud solutions. "
+    "Our teams in India and Japan build products for healthcare, finance, logistics and retail clients. "
+    "We offer dedicated development teams, quality assurance, UI and UX design and long term support. "
+    "Contact us to learn how our engineers can accelerate your next digital transformation project."
+)
+WORDS = "alpha beta gamma delta invoice ledger rocket garden violin harbor lantern quartz meadow".split()
+UNRELATED = "The fleet tracking platform streams GPS telemetry into Kafka and renders live maps in React."
+
+
+class FakeSession:
+    """Applies the query's Hamming-distance filter to stored rows, like Postgres would."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.returned = 0
+
+    def execute(self, query):
+        self.sql = str(query.compile(dialect=postgresql.dialect()))
+        params = query.compile().params
+        found = [
+            SimpleNamespace(idx=idx, embedding_id=row["embedding_id"], simhash=row["simhash"])
+            for idx, sig in enumerate(params["signatures"], start=1) for row in self.rows
+            if hamming(to_unsigned(sig), to_unsigned(row["simhash"])) <= params["max_distance"]
+        ]
+        self.returned += len(found)
+        return found
+
+
+class SimHashTest(unittest.TestCase):
+    def test_identical_text_has_identical_signature(self):
+        self.assertEqual(simhash(ABOUT_US), simhash(ABOUT_US))
+
+    def test_case_and_punctuation_are_ignored(self):
+        self.assertEqual(simhash(ABOUT_US), simhash(ABOUT_US.upper().replace(",", "")))
+
+    def test_unrelated_text_is_far(self):
+        self.assertGreater(hamming(simhash(ABOUT_US), simhash(UNRELATED)), 20)
+
+    def test_signed_round_trip(self):
+        signature = simhash(ABOUT_US)
+        self.assertEqual(to_unsigned(to_signed(signature)), signature)
+        self.assertTrue(-(1 << 63) <= to_signed(signature) < (1 << 63))
+
+    def test_max_distance_follows_threshold(self):
+        with mock.patch.object(Config, "CHUNK_DEDUP_THRESHOLD", 0.85):
+            self.assertEqual(max_distance(), 9)
+        with mock.patch.object(Config, "CHUNK_DEDUP_THRESHOLD", 0.95):
+            self.assertEqual(max_distance(), 3)
+
+
+class FindNearDuplicatesTest(unittest.TestCase):
+    EDITS = [
+        ABOUT_US.replace("Japan", "Vietnam"),
+        ABOUT_US.replace("Contact us", "Reach out"),
+        ABOUT_US.replace("healthcare", "education"),
+    ]
+
+    def setUp(self):
+        patch = mock.patch.object(Config, "CHUNK_DEDUP_THRESHOLD", 0.85)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.session = FakeSession(signature_rows(["stored-1"], [simhash(ABOUT_US)]))
+
+    def test_one_word_edit_matches_stored_chunk(self):
+        for edited in self.EDITS:
+            _, duplicates = find_near_duplicates(self.session, "collection", [edited, UNRELATED])
+            self.assertEqual(duplicates, {0: "stored-1"}, edited)
+
+    def test_one_word_edit_matches_earlier_text_in_batch(self):
+        _, duplicates = find_near_duplicates(FakeSession([]), "collection", [ABOUT_US, UNRELATED, *self.EDITS])
+        self.assertEqual(duplicates, {2: 0, 3: 0, 4: 0})
+
+    def test_distance_is_filtered_in_the_database(self):
+        find_near_duplicates(self.session, "collection", [ABOUT_US])
+        self.assertIn("bit_count(CAST(chunk_signature.simhash # probe.sig AS BIT(64)))", self.session.sql)
+
+    def test_unrelated_signatures_fetch_few_candidates(self):
+        rng = random.Random(7)
+        stored = signature_rows([f"stored-{n}" for n in range(5000)], [rng.getrandbits(64) for _ in range(5000)])
+        session = FakeSession(stored)
+        texts = [" ".join(rng.choice(WORDS) for _ in range(40)) for _ in range(100)]
+        _, duplicates = find_near_duplicates(session, "collection", texts)
+        self.assertLessEqual(session.returned, 5)
+        self.assertFalse([match for match in duplicates.values() if isinstance(match, str)])
+
+    def test_excluded_rows_are_ignored(self):
+        _, duplicates = find_near_duplicates(self.session, "collection", [self.EDITS[0]], exclude_ids=["stored-1"])
+        self.assertEqual(duplicates, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
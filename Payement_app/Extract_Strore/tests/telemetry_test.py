@@ -0,0 +1,47 @@
+"""Tests for ingestion pipeline spans"""
+
+import unittest
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+from Extract_Strore import telemetry
+
+
+@mock.patch.object(telemetry, "_emit")
+class TelemetryTest(unittest.TestCase):
+    def test_counters_roll_up_to_open_spans(self, emit):
+        with telemetry.trace("deck.pptx") as trace:
+            with telemetry.span("insert"):
+                telemetry.record(rows=2)
+                with telemetry.span("embed"):
+                    telemetry.record(embeddings=5)
+        stages = {s["stage"]: s for s in trace.spans}
+        self.assertEqual(stages["embed"]["embeddings"], 5)
+        self.assertEqual(stages["insert"]["embeddings"], 5)
+        self.assertEqual(stages["insert"]["rows"], 2)
+        self.assertEqual(trace.summary()["totals"]["embeddings"], 5)
+        self.assertEqual(emit.call_count, 2)
+
+    def test_bind_carries_context_into_threads(self, emit):
+        with telemetry.trace("deck.pptx") as trace, telemetry.span("polish"):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = [executor.submit(telemetry.bind(telemetry.record), llm_calls=1) for _ in range(8)]
+                for future in futures:
+                    future.result()
+        self.assertEqual(trace.spans[0]["llm_calls"], 8)
+
+    def test_failed_span_is_recorded(self, emit):
+        with telemetry.trace("deck.pptx") as trace:
+            with self.assertRaises(ValueError):
+                with telemetry.span("parse"):
+                    raise ValueError("corrupt deck")
+        self.assertEqual(trace.spans[0]["status"], "error")
+        self.assertEqual(trace.spans[0]["error"], "corrupt deck")
+        self.assertEqual(trace.spans[0]["file"], "deck.pptx")
+
+    def test_record_outside_span_is_ignored(self, emit):
+        telemetry.record(llm_calls=1)
+        emit.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+"""Tests for the slide-aware token-budgeted chunker"""
+
+import unittest
+from Extract_Strore.text_chunker import SlideChunker, estimate_tokens
+
+SLIDE = "\n".join(
+    ["## Project Overview"]
+    + [f"- Feature {n}: real-time booking with payment integration and notifications" for n in range(12)]
+    + ["## Technology Stack"]
+    + [f"- Component {n}: Django REST API backed by PostgreSQL and Redis caching" for n in range(12)]
+)
+
+
+class SlideChunkerTest(unittest.TestCase):
+    def setUp(self):
+        self.chunker = SlideChunker(max_tokens=80, overlap_tokens=20)
+
+    def test_chunks_respect_token_budget(self):
+        for chunk in self.chunker.split_text(SLIDE):
+            self.assertLessEqual(estimate_tokens(chunk.replace("\n", "")), 80)
+
+    def test_output_is_deterministic(self):
+        self.assertEqual(self.chunker.split_text(SLIDE), SlideChunker(80, 20).split_text(SLIDE))
+
+    def test_headings_start_new_chunks(self):
+        chunks = self.chunker.split_text(SLIDE)
+        self.assertTrue(any(chunk.startswith("## Technology Stack") for chunk in chunks))
+
+    def test_lines_are_never_cut_and_overlap_is_carried(self):
+        chunks = self.chunker.split_text(SLIDE)
+        lines = set(SLIDE.splitlines())
+        for chunk in chunks:
+            self.assertTrue(set(chunk.splitlines()) <= lines)
+        self.assertEqual(chunks[1].splitlines()[0], chunks[0].splitlines()[-1])
+
+    def test_long_line_is_split(self):
+        line = " ".join(f"word{n}." for n in range(200))
+        chunks = SlideChunker(max_tokens=50, overlap_tokens=0).split_text(line)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(" ".join(chunks).split(), line.split())
+
+    def test_blank_text(self):
+        self.assertEqual(self.chunker.split_text("\n  \n"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+# text_chunker.py
+"""Slide-aware, token-budgeted chunking of polished slide text.
+
+Polished slides are short outlines of headings and bullets, so chunks are
+built from whole lines: a heading starts a new chunk once the current one
+is reasonably full, and bullets are never cut unless a single line exceeds
+the budget. Token counts are estimated once per line, which keeps overlap
+bookkeeping free of re-scans and the output identical for identical input.
+"""
+import re
+from config import Config
+
+_HEADING_RE = re.compile(
+    r"^\s*(#{1,6}\s|\*\*[^*]+\*\*:?\s*$|•\s*Title:|‣\s*Subtitle:|slide\s+\d+\b|[A-Z][^.!?]{0,80}:\s*$)",
+    re.IGNORECASE,
+)
+_SENTENCE_RE = re.compile(r"(?<=[.!?;])\s+")
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count (about four characters per token for English)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class SlideChunker:
+    """Drop-in replacement for the text splitter's ``split_text``."""
+
+    def __init__(self, max_tokens: int | None = None, overlap_tokens: int | None = None):
+        self.max_tokens = max(1, max_tokens or Config.CHUNK_MAX_TOKENS)
+        overlap = Config.CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+        self.overlap_tokens = min(max(0, overlap), self.max_tokens // 2)
+
+    def _pieces(self, line: str):
+        """Split an over-budget line on sentences, then on words."""
+        max_chars = self.max_tokens * CHARS_PER_TOKEN
+        piece = ""
+        for sentence in _SENTENCE_RE.split(line):
+            words = [sentence] if len(sentence) <= max_chars else sentence.split(" ")
+            for word in words:
+                while len(word) > max_chars:
+                    if piece:
+                        yield piece
+                        piece = ""
+                    yield word[:max_chars]
+                    word = word[max_chars:]
+                if piece and len(piece) + 1 + len(word) > max_chars:
+                    yield piece
+                    piece = ""
+                piece = f"{piece} {word}" if piece else word
+        if piece:
+            yield piece
+
+    def _units(self, text: str):
+        """Yield (line, tokens, is_heading) for every non-blank line."""
+        for line in text.splitlines():
+            line = line.rstrip()
+            if not line.strip():
+                continue
+            heading = bool(_HEADING_RE.match(line))
+            tokens = estimate_tokens(line)
+            if tokens <= self.max_tokens:
+                yield line, tokens, heading
+                continue
+            for piece in self._pieces(line.strip()):
+                yield piece, estimate_tokens(piece), heading
+                heading = False
+
+    def split_text(self, text: str) -> list[str]:
+        chunks, current, size = [], [], 0
+        for line, tokens, heading in self._units(text):
+            if current and (size + tokens > self.max_tokens or (heading and size >= self.max_tokens // 2)):
+                chunks.append("\n".join(unit for unit, _ in current))
+                # Carry trailing lines as overlap unless a new section starts here
+                carry, carried = [], 0
+                if not heading:
+                    for unit, n in reversed(current):
+                        if carried + n > self.overlap_tokens or carried + n + tokens > self.max_tokens:
+                            break
+                        carry.append((unit, n))
+                        carried += n
+                    carry.reverse()
+                current, size = carry, carried
+            current.append((line, tokens))
+            size += tokens
+        if current:
+            chunks.append("\n".join(unit for unit, _ in current))
+        return chunks
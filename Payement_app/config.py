@@ -32,4 +32,45 @@ class Config:
     GOOGLE_API_KEY_9 = os.environ.get("GOOGLE_API_KEY_9")    
     GOOGLE_API_KEY_10 = os.environ.get("GOOGLE_API_KEY_10")
     TEMPLATE_PATH = os.environ.get("PPT_TEMPLATE", "template.pptx")
-    OUTPUT_FOLDER = os.environ.get("OUTPUT_FOLDER", "generated_ppts") 
\ No newline at end of file
+    OUTPUT_FOLDER = os.environ.get("OUTPUT_FOLDER", "generated_ppts")
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+    PPTX_STREAMING_EXTRACTOR = os.environ.get("PPTX_STREAMING_EXTRACTOR", "true").lower() == "true"
+    POLISH_MAX_WORKERS = int(os.environ.get("POLISH_MAX_WORKERS", 4))
+    POLISH_BATCH_CHARS = int(os.environ.get("POLISH_BATCH_CHARS", 0))
+    POLISH_CACHE_ENABLED = os.environ.get("POLISH_CACHE_ENABLED", "true").lower() == "true"
+    POLISH_CACHE_MAX_ENTRIES = int(os.environ.get("POLISH_CACHE_MAX_ENTRIES", 50000))
+    POLISH_CACHE_MAX_AGE_DAYS = int(os.environ.get("POLISH_CACHE_MAX_AGE_DAYS", 90))
+    POLISH_CACHE_EVICT_INTERVAL_SECONDS = int(os.environ.get("POLISH_CACHE_EVICT_INTERVAL_SECONDS", 600))
+    EMBED_CACHE_ENABLED = os.environ.get("EMBED_CACHE_ENABLED", "true").lower() == "true"
+    EMBED_BATCH_SIZE = int(os.environ.get("EMBED_BATCH_SIZE", 100))
+    EMBED_MAX_WORKERS = int(os.environ.get("EMBED_MAX_WORKERS", 4))
+    GEMINI_KEY_COOLDOWN = float(os.environ.get("GEMINI_KEY_COOLDOWN", 10))
+    GEMINI_KEY_MAX_WAIT = float(os.environ.get("GEMINI_KEY_MAX_WAIT", 60))
+    CHUNK_MAX_TOKENS = int(os.environ.get("CHUNK_MAX_TOKENS", 250))
+    CHUNK_OVERLAP_TOKENS = int(os.environ.get("CHUNK_OVERLAP_TOKENS", 50))
+    SUMMARY_SECTION_CHARS = int(os.environ.get("SUMMARY_SECTION_CHARS", 20000))
+    SUMMARY_SECTION_MAX_CHARS = int(os.environ.get("SUMMARY_SECTION_MAX_CHARS", 3000))
+    SUMMARY_MAX_WORKERS = int(os.environ.get("SUMMARY_MAX_WORKERS", 4))
+    TELEMETRY_ENABLED = os.environ.get("TELEMETRY_ENABLED", "true").lower() == "true"
+    TELEMETRY_FILE = os.environ.get(
+        "TELEMETRY_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "ingestion_spans.jsonl")
+    )
+    CHUNK_DEDUP_MODE = os.environ.get("CHUNK_DEDUP_MODE", "link").lower()  # link, skip or off
+    CHUNK_DEDUP_THRESHOLD = float(os.environ.get("CHUNK_DEDUP_THRESHOLD", 0.85))  # 0.85 of 64 bits: up to 9 differing bits
+    PIPELINE_CHECKPOINTS = os.environ.get("PIPELINE_CHECKPOINTS", "true").lower() == "true"
+    METADATA_SINGLE_CALL = os.environ.get("METADATA_SINGLE_CALL", "true").lower() == "true"
+    METADATA_CONTEXT_CHARS = int(os.environ.get("METADATA_CONTEXT_CHARS", 12000))
+    CANONICAL_SYNONYMS_FILE = os.environ.get(
+        "CANONICAL_SYNONYMS_FILE",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "Extract_Strore", "synonyms.json"),
+    )
+    CANONICAL_MATCH_THRESHOLD = float(os.environ.get("CANONICAL_MATCH_THRESHOLD", 0.6))
+    CANONICAL_MIN_FUZZY_LENGTH = int(os.environ.get("CANONICAL_MIN_FUZZY_LENGTH", 4))
+    CANONICAL_REFRESH_SECONDS = int(os.environ.get("CANONICAL_REFRESH_SECONDS", 300))
+    CANONICAL_LLM_FALLBACK = os.environ.get("CANONICAL_LLM_FALLBACK", "true").lower() == "true"
+    BULK_PARSE_WORKERS = int(os.environ.get("BULK_PARSE_WORKERS", os.cpu_count() or 1))
+    BULK_LLM_WORKERS = int(os.environ.get("BULK_LLM_WORKERS", 4))
+    BULK_INSERT_WORKERS = int(os.environ.get("BULK_INSERT_WORKERS", 2)) 
\ No newline at end of file